@@ -1,13 +1,102 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 class Settings(BaseSettings):
     database_url: str
+    database_async_url: Optional[str] = None  # default: database_url with an async driver
+    
+    # Connection pools (each of the sync and async engines gets one)
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 10.0  # seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # seconds before a connection is replaced
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 500  # asyncpg prepared statements per connection; 0 behind pgbouncer
     github_token: str
     github_webhook_secret: str
     api_port: int = 8000
     cors_origins: str = "http://65.0.107.153:3000"
     
+    # GitHub API client
+    github_api_url: str = "https://api.github.com"
+    github_http2: bool = True
+    github_max_connections: int = 20
+    github_timeout: float = 30.0
+    github_etag_cache_bytes: int = 32_000_000  # response bodies kept for ETag revalidation
+    github_page_concurrency: int = 5
+    github_low_priority_reserve: int = 500  # requests kept back for instructor actions
+    github_post_concurrency: int = 4  # concurrent comment posts per bulk decision batch
+    
+    # Patch analysis
+    analysis_executor: str = "process"  # process, thread or inline
+    analysis_workers: int = 0  # 0 = one per CPU
+    analysis_parallel_min_bytes: int = 2_000_000  # smaller PRs are analyzed in one thread
+    analysis_chunk_bytes: int = 500_000
+    analysis_cache_enabled: bool = True
+    analysis_cache_max_entries: int = 200_000
+    analysis_cache_ttl_days: int = 30
+    analysis_cache_prune_interval: float = 600.0  # seconds between evictions
+    
+    # Diff ingestion
+    review_ingestion: str = "files"  # files (per-file patches API) or stream (raw .diff within budgets)
+    diff_max_file_bytes: int = 500_000
+    diff_max_file_lines: int = 10_000
+    diff_max_pr_bytes: int = 10_000_000
+    diff_max_pr_lines: int = 200_000
+    diff_ignore_globs: str = (
+        "package-lock.json,yarn.lock,pnpm-lock.yaml,poetry.lock,Pipfile.lock,composer.lock,"
+        "*.min.js,*.min.css,*.map,dist/,build/,vendor/,node_modules/"
+    )
+    
+    # Branch rules
+    branch_rules_check_interval: float = 5.0  # seconds a process uses its compiled rules before checking for changes
+    
+    # Background job queue
+    run_worker_in_process: bool = True
+    worker_concurrency: int = 4
+    worker_post_slots: int = 1  # extra workers that only post approved reviews
+    worker_poll_interval: float = 1.0
+    job_max_attempts: int = 5
+    job_retry_backoff: float = 10.0  # seconds, doubled on every attempt
+    job_retry_max_delay: float = 600.0
+    job_lock_timeout: float = 900.0  # running jobs not renewed for this long are reclaimed
+    review_debounce_seconds: float = 5.0  # wait for more pushes before analyzing
+    job_retention_hours: int = 72  # finished jobs, and the delivery ids they dedupe, are kept this long
+    job_prune_interval: float = 3600.0  # seconds between prune runs of the worker
+    
+    # Webhook ingress
+    webhook_seen_deliveries: int = 10_000  # delivery ids remembered in memory
+    
+    # Review API responses
+    fast_serialization: bool = False  # build list/detail responses from column tuples, encoded with orjson
+    
+    # Review retention
+    review_retention_days: int = 0  # posted, rejected and superseded reviews older than this are archived; 0 = never
+    review_archive_dir: str = "archive"  # shared by the API (reads) and the worker (writes)
+    review_archive_interval: float = 3600.0  # seconds between archive runs of the worker
+    
+    # Review search
+    search_max_hits: int = 1_000  # newest matches a search ranks and counts
+    search_cache_ttl: float = 30.0  # seconds the ranked hits and counts of a search are reused while paging
+    
+    # Dashboard statistics
+    stats_cache_ttl: float = 10.0  # seconds
+    
+    # Live review feed (SSE)
+    events_poll_interval: float = 1.0  # seconds between review_events reads
+    events_buffer_size: int = 1000  # recent events kept in memory for resuming clients
+    events_subscriber_queue_size: int = 500  # slow clients past this are disconnected
+    events_heartbeat_interval: float = 15.0
+    events_retention_hours: int = 24
+    
+    # Observability
+    metrics_enabled: bool = True  # /metrics and per-request timings
+    worker_metrics_port: int = 0  # standalone worker serves /metrics on this port; 0 = off
+    trace_export_file: Optional[str] = None  # append spans as OTLP/JSON lines
+    trace_export_url: Optional[str] = None  # OTLP/HTTP collector, e.g. http://localhost:4318/v1/traces
+    trace_sample_ratio: float = 1.0  # share of traces exported
+    
     class Config:
         env_file = ".env"
 
@@ -1,18 +1,192 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Dict, Any, Optional
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import Engine, make_url, URL
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from .config import get_settings
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from .config import Settings, get_settings
 
-settings = get_settings()
+class PoolWaitStats:
+    """How long requests waited for a pooled connection"""
 
-engine = create_engine(settings.database_url)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    def __init__(self):
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    def record(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.timeouts += timed_out
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else None,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "timeouts": self.timeouts
+        }
+
+class _TimedPool:
+    """Pool mixin recording the wait for each connection checkout"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.wait_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - start)
+        return connection
+
+class TimedQueuePool(_TimedPool, QueuePool):
+    pass
+
+class TimedAsyncAdaptedQueuePool(_TimedPool, AsyncAdaptedQueuePool):
+    pass
+
+# Async drivers used when DATABASE_ASYNC_URL is not set
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def async_database_url(settings: Settings) -> URL:
+    if settings.database_async_url:
+        return make_url(settings.database_async_url)
+    url = make_url(settings.database_url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername))
+
+def engine_options(settings: Settings, url: URL, poolclass) -> Dict[str, Any]:
+    """Pool configuration; SQLite keeps SQLAlchemy's default pool"""
+    if url.get_backend_name() == "sqlite":
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+class _BindOnFirstUse:
+    """Session factory that asks for its engine when the first session is made"""
+
+    def __init__(self, get_bind, **kw):
+        super().__init__(**kw)
+        self._get_bind = get_bind
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=self._get_bind())
+        return super().__call__(**local_kw)
+
+class LazySessionmaker(_BindOnFirstUse, sessionmaker):
+    pass
+
+class LazyAsyncSessionmaker(_BindOnFirstUse, async_sessionmaker):
+    pass
+
+# Engines are built on first use, or by init_db() from the app factory,
+# so importing this module reads no settings and opens nothing
+_engine: Optional[Engine] = None
+_async_engine: Optional[AsyncEngine] = None
+
+def init_db(settings: Optional[Settings] = None):
+    """Build both engines from settings and bind the session factories to them"""
+    global _engine, _async_engine
+    settings = settings or get_settings()
+
+    # Sync engine: background workers and the event poller
+    sync_url = make_url(settings.database_url)
+    _engine = create_engine(sync_url, **engine_options(settings, sync_url, TimedQueuePool))
+    SessionLocal.configure(bind=_engine)
+
+    # Async engine: request handlers
+    async_url = async_database_url(settings)
+    if async_url.drivername == "postgresql+asyncpg":
+        async_url = async_url.update_query_dict(
+            {"prepared_statement_cache_size": str(settings.db_statement_cache_size)}
+        )
+    _async_engine = create_async_engine(async_url, **engine_options(settings, async_url, TimedAsyncAdaptedQueuePool))
+    AsyncSessionLocal.configure(bind=_async_engine)
+
+def get_engine() -> Engine:
+    if _engine is None:
+        init_db()
+    return _engine
+
+def get_async_engine() -> AsyncEngine:
+    if _async_engine is None:
+        init_db()
+    return _async_engine
+
+def active_engines() -> Dict[str, Engine]:
+    """Engines built so far in this process, by role"""
+    engines = {}
+    if _async_engine is not None:
+        engines["async"] = _async_engine.sync_engine
+    if _engine is not None:
+        engines["sync"] = _engine
+    return engines
+
+async def dispose_db():
+    """Close pooled connections of both engines"""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    if _engine is not None:
+        _engine.dispose()
+
+SessionLocal = LazySessionmaker(get_engine, autocommit=False, autoflush=False)
+AsyncSessionLocal = LazyAsyncSessionmaker(get_async_engine, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
+def dialect_insert(db: Session, model):
+    """INSERT for the session's dialect, with ON CONFLICT support"""
+    if db.get_bind().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(model)
+
+def pool_status(db_engine: Engine) -> Dict[str, Any]:
+    """Connection pool occupancy and checkout wait times"""
+    pool = db_engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "idle": pool.checkedin()
+        })
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats:
+        status["wait"] = wait_stats.snapshot()
+    return status
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,41 +1,93 @@
+from contextlib import asynccontextmanager
+from typing import Optional
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base
-from .routes import webhook, reviews, instructor
-from .config import get_settings
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
-settings = get_settings()
-
-app = FastAPI(
-    title="PR Review System",
-    description="Automated GitHub PR Review System with Instructor Approval",
-    version="1.0.0"
-)
-
-# CORS Configuration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.cors_origins.split(","),
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(webhook.router, tags=["Webhook"])
-app.include_router(reviews.router, prefix="/api", tags=["Reviews"])
-app.include_router(instructor.router, prefix="/api", tags=["Instructor"])
-
-@app.get("/")
-def root():
-    return {
-        "message": "PR Review System API",
-        "version": "1.0.0",
-        "status": "running"
-    }
-
-@app.get("/health")
-def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+from .database import init_db, dispose_db
+from .routes import webhook, reviews, instructor, system, metrics
+from .config import Settings, get_settings
+from .services.review_events import close_review_event_broker
+from .services.metrics import MetricsMiddleware
+from .services.tracing import shutdown_tracer
+
+# The schema is managed by Alembic (python -m app.migrate), not at startup
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = app.state.settings
+    init_db(settings)
+
+    worker = None
+    if settings.run_worker_in_process:
+        # Imported here: the worker brings the GitHub client and the
+        # analysis stack, which an API-only process never loads
+        from .services.job_worker import JobWorker
+        worker = JobWorker()
+        await worker.start()
+    app.state.worker = worker
+
+    try:
+        yield
+    finally:
+        if worker:
+            from .services.github_client import close_github_client
+            from .services.analysis_pool import shutdown_analysis_executor
+            await worker.stop()
+            await close_github_client()
+            shutdown_analysis_executor()
+        await close_review_event_broker()
+        shutdown_tracer()
+        await dispose_db()
+
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    """
+    Build the API application.
+
+    Nothing touches the database until the lifespan starts. Run with
+    `uvicorn app.main:create_app --factory`.
+    """
+    settings = settings or get_settings()
+
+    app = FastAPI(
+        title="PR Review System",
+        description="Automated GitHub PR Review System with Instructor Approval",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+    app.state.settings = settings
+
+    # CORS Configuration
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.cors_origins.split(","),
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag"],
+    )
+
+    # Request timings and DB query counts for /metrics
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
+
+    # Include routers
+    app.include_router(webhook.router, tags=["Webhook"])
+    app.include_router(reviews.router, prefix="/api", tags=["Reviews"])
+    app.include_router(instructor.router, prefix="/api", tags=["Instructor"])
+    app.include_router(system.router, prefix="/api", tags=["System"])
+    if settings.metrics_enabled:
+        app.include_router(metrics.router, tags=["System"])
+
+    @app.get("/")
+    def root():
+        return {
+            "message": "PR Review System API",
+            "version": "1.0.0",
+            "status": "running"
+        }
+
+    @app.get("/health")
+    def health_check():
+        return {"status": "healthy"}
+
+    return app
@@ -0,0 +1,55 @@
+"""
+Bring the database schema up to date.
+
+Run with `python -m app.migrate` before starting the API or the worker;
+neither creates or alters tables itself. Databases created by earlier
+versions, which ran create_all() at startup, are stamped at the
+baseline revision first; 0001a then adds whatever their create_all()
+left out, and they are upgraded like any other.
+"""
+import logging
+import os
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect
+
+from .config import Settings, get_settings
+
+BASELINE_REVISION = "0001"
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+logger = logging.getLogger(__name__)
+
+def alembic_config() -> Config:
+    config = Config(ALEMBIC_INI)
+    # Paths in alembic.ini are relative to it, not to the working directory
+    config.set_main_option("script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "migrations"))
+    return config
+
+def upgrade_database(settings: Optional[Settings] = None, revision: str = "head"):
+    """Stamp pre-Alembic databases at the baseline, then upgrade to revision"""
+    settings = settings or get_settings()
+    config = alembic_config()
+    config.attributes["configure_logging"] = False
+
+    # A connection of its own, so the app's pools are not built for this
+    engine = create_engine(settings.database_url)
+    try:
+        with engine.begin() as connection:
+            config.attributes["connection"] = connection
+            tables = set(inspect(connection).get_table_names())
+            if "pr_reviews" in tables and "alembic_version" not in tables:
+                logger.info("Existing schema without migration history; stamping %s", BASELINE_REVISION)
+                command.stamp(config, BASELINE_REVISION)
+            command.upgrade(config, revision)
+    finally:
+        engine.dispose()
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    upgrade_database()
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,39 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, JSON
+from sqlalchemy import (
+    Column, Integer, BigInteger, SmallInteger, String, Text, Date, DateTime, Enum, JSON, Index,
+    ForeignKey, UniqueConstraint, event, select
+)
+from sqlalchemy.orm import relationship, selectinload, Session
 from sqlalchemy.sql import func
+from datetime import datetime, timezone
+from typing import Dict, Any, List
 import enum
-from .database import Base
+import hashlib
+import json
+from .database import Base, dialect_insert
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+def content_hash(value: Any) -> str:
+    """Stable SHA-1 of a JSON-compatible value"""
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha1(canonical.encode()).hexdigest()
 
 class ReviewStatus(str, enum.Enum):
     PENDING = "pending"
     APPROVED = "approved"
     REJECTED = "rejected"
     POSTED = "posted"
+    POSTING = "posting"  # Approved, comment queued for GitHub
+    POST_FAILED = "post_failed"  # Approved, but posting gave up after retries
+    SUPERSEDED = "superseded"  # A newer commit on the same PR was reviewed
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    DEAD = "dead"  # Retries exhausted, kept for inspection
+    SUPERSEDED = "superseded"  # Replaced by a newer job with the same coalesce key
 
 class PRReview(Base):
     __tablename__ = "pr_reviews"
@@ -20,23 +46,210 @@ class PRReview(Base):
     pr_title = Column(String, nullable=False)
     pr_author = Column(String, nullable=False)
     
-    # Review content
-    review_feedback = Column(JSON, nullable=False)  # Structured feedback
+    # Review content. Feedback lives in review_feedback_items and the
+    # expectations in a shared rule snapshot; the two JSON columns only
+    # hold data of reviews stored before that (see the properties below).
+    legacy_review_feedback = Column("review_feedback", JSON, nullable=True)
     review_summary = Column(Text, nullable=False)
-    expectations_applied = Column(JSON, nullable=False)  # Branch-based rules
+    legacy_expectations_applied = Column("expectations_applied", JSON, nullable=True)
+    rule_snapshot_hash = Column(String(40), ForeignKey("rule_snapshots.hash"), nullable=True)
+    feedback_hash = Column(String(40), nullable=True)  # Unchanged feedback is not rewritten
+    error_count = Column(Integer, nullable=False, default=0, server_default="0")
+    warning_count = Column(Integer, nullable=False, default=0, server_default="0")
+    
+    # Loaded on access, or up front with review_content_options() where
+    # review_feedback and expectations_applied are read
+    rule_snapshot = relationship("RuleSnapshot", lazy="select")
+    feedback_entries = relationship(
+        "ReviewFeedbackEntry",
+        order_by="ReviewFeedbackEntry.position",
+        cascade="all, delete-orphan",
+        lazy="select"
+    )
     
     # Status tracking
     status = Column(Enum(ReviewStatus), default=ReviewStatus.PENDING)
     instructor_notes = Column(Text, nullable=True)
     
-    # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Timestamps. Set client-side too: SQLite's CURRENT_TIMESTAMP has no
+    # fractional seconds and would not compare equal to bound cursor values.
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), default=utcnow)
     reviewed_at = Column(DateTime(timezone=True), nullable=True)
     posted_at = Column(DateTime(timezone=True), nullable=True)
     
     # GitHub data
     pr_url = Column(String, nullable=False)
     commit_sha = Column(String, nullable=False)
+    github_comment_id = Column(BigInteger, nullable=True)  # Set once the review is posted
+    
+    # Bumped by the ORM on every update of the row; the detail endpoint's
+    # ETag is derived from it
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    
+    # Listing filters paginate by (created_at, id), newest first
+    __table_args__ = (
+        Index("ix_pr_reviews_created_at_id", "created_at", "id"),
+        Index("ix_pr_reviews_status_created_at", "status", "created_at", "id"),
+        Index("ix_pr_reviews_repo_created_at", "repo_full_name", "created_at", "id"),
+        Index("ix_pr_reviews_author_created_at", "pr_author", "created_at", "id"),
+        Index("ix_pr_reviews_branch_type_created_at", "branch_type", "created_at", "id"),
+        # One review per commit; also serves lookups by (repo, PR)
+        UniqueConstraint("repo_full_name", "pr_number", "commit_sha", name="uq_pr_reviews_repo_pr_commit"),
+    )
+    __mapper_args__ = {"version_id_col": version}
+    
+    @property
+    def review_feedback(self) -> List[Dict[str, Any]]:
+        """Structured feedback items"""
+        pending = self.__dict__.get("_pending_feedback")
+        if pending is not None:
+            return pending
+        if self.feedback_hash is None:
+            return self.legacy_review_feedback or []
+        return [entry.to_dict() for entry in self.feedback_entries]
+    
+    @review_feedback.setter
+    def review_feedback(self, items: List[Dict[str, Any]]):
+        # Stored on flush, once the message templates are interned
+        digest = content_hash(items)
+        if digest != self.feedback_hash:
+            self._pending_feedback = list(items)
+            self.feedback_hash = digest
+            self.legacy_review_feedback = None
+    
+    @property
+    def expectations_applied(self) -> Dict[str, Any]:
+        """Branch-based rules the review was made with"""
+        pending = self.__dict__.get("_pending_expectations")
+        if pending is not None:
+            return pending
+        if self.rule_snapshot_hash is None:
+            return self.legacy_expectations_applied or {}
+        return self.rule_snapshot.expectations
+    
+    @expectations_applied.setter
+    def expectations_applied(self, expectations: Dict[str, Any]):
+        # The snapshot row is written on flush if it does not exist yet
+        digest = content_hash(expectations)
+        if digest != self.rule_snapshot_hash:
+            self._pending_expectations = dict(expectations)
+            self.rule_snapshot_hash = digest
+            self.legacy_expectations_applied = None
+
+def review_content_options():
+    """Loader options for the relationships behind a review's content properties"""
+    return (selectinload(PRReview.rule_snapshot), selectinload(PRReview.feedback_entries))
+
+# Full-text search structures that only exist on PostgreSQL: the generated
+# pr_reviews.search_vector column and the GIN indexes of migration 0004.
+# They are not declared on the models, and Alembic skips them when comparing.
+POSTGRES_SEARCH_SCHEMA = frozenset({
+    "search_vector",
+    "ix_pr_reviews_search_vector",
+    "ix_pr_reviews_author_trgm",
+    "ix_pr_reviews_branch_trgm",
+    "ix_feedback_templates_message_search",
+})
+
+class RuleSnapshot(Base):
+    __tablename__ = "rule_snapshots"
+    
+    # Immutable copy of a branch rule's expectations, addressed by content
+    # hash and shared by every review made under it
+    hash = Column(String(40), primary_key=True)
+    expectations = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class FeedbackTemplate(Base):
+    __tablename__ = "feedback_templates"
+    
+    # Interned (category, severity, message) triple
+    id = Column(Integer, primary_key=True)
+    hash = Column(String(40), unique=True, nullable=False)
+    category = Column(String, nullable=False)
+    severity = Column(String, nullable=False)
+    message = Column(Text, nullable=False)
+
+class ReviewFeedbackEntry(Base):
+    __tablename__ = "review_feedback_items"
+    
+    review_id = Column(Integer, ForeignKey("pr_reviews.id", ondelete="CASCADE"), primary_key=True)
+    position = Column(SmallInteger, primary_key=True)
+    template_id = Column(Integer, ForeignKey("feedback_templates.id"), nullable=False)
+    line_number = Column(Integer, nullable=True)
+    file_path = Column(String, nullable=True)
+    
+    template = relationship(FeedbackTemplate, lazy="joined", innerjoin=True)
+    
+    # Reviews with a given finding, for search and its category filters
+    __table_args__ = (
+        Index("ix_review_feedback_items_template_review", "template_id", "review_id"),
+    )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "category": self.template.category,
+            "severity": self.template.severity,
+            "message": self.template.message,
+            "line_number": self.line_number,
+            "file_path": self.file_path
+        }
+
+def _template_hash(item: Dict[str, Any]) -> str:
+    return content_hash([item["category"], item["severity"], item["message"]])
+
+@event.listens_for(Session, "before_flush")
+def _store_review_content(session: Session, flush_context, instances):
+    """Write rule snapshots and interned feedback for reviews set since the last flush"""
+    reviews = [
+        obj for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, PRReview)
+        and ("_pending_feedback" in obj.__dict__ or "_pending_expectations" in obj.__dict__)
+    ]
+    if not reviews:
+        return
+    connection = session.connection()
+    
+    snapshots = {
+        review.rule_snapshot_hash: review.__dict__.pop("_pending_expectations")
+        for review in reviews if "_pending_expectations" in review.__dict__
+    }
+    if snapshots:
+        connection.execute(dialect_insert(session, RuleSnapshot).values([
+            {"hash": digest, "expectations": expectations} for digest, expectations in snapshots.items()
+        ]).on_conflict_do_nothing(index_elements=["hash"]))
+    
+    feedback = [
+        (review, review.__dict__.pop("_pending_feedback"))
+        for review in reviews if "_pending_feedback" in review.__dict__
+    ]
+    templates = {}
+    for _, items in feedback:
+        for item in items:
+            templates.setdefault(_template_hash(item), item)
+    if not templates:
+        for review, _ in feedback:
+            review.feedback_entries = []
+        return
+    
+    connection.execute(dialect_insert(session, FeedbackTemplate).values([
+        {"hash": digest, "category": item["category"], "severity": item["severity"], "message": item["message"]}
+        for digest, item in templates.items()
+    ]).on_conflict_do_nothing(index_elements=["hash"]))
+    template_ids = dict(connection.execute(
+        select(FeedbackTemplate.hash, FeedbackTemplate.id).where(FeedbackTemplate.hash.in_(templates.keys()))
+    ).all())
+    
+    for review, items in feedback:
+        review.feedback_entries = [
+            ReviewFeedbackEntry(
+                position=position,
+                template_id=template_ids[_template_hash(item)],
+                line_number=item.get("line_number"),
+                file_path=item.get("file_path")
+            )
+            for position, item in enumerate(items)
+        ]
 
 class BranchRule(Base):
     __tablename__ = "branch_rules"
@@ -46,4 +259,87 @@ class BranchRule(Base):
     description = Column(String, nullable=False)
     expectations = Column(JSON, nullable=False)  # Rules for this branch type
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class BranchRulesVersion(Base):
+    __tablename__ = "branch_rules_version"
+    
+    # Single row, bumped in the transaction of every change to branch_rules
+    # so each process can tell when its compiled matcher is stale
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+class BackgroundJob(Base):
+    __tablename__ = "background_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # e.g., "analyze_pr"
+    payload = Column(JSON, nullable=False)
+    coalesce_key = Column(String, nullable=True, index=True)  # e.g., "owner/repo#12"
+    delivery_id = Column(String(64), nullable=True, unique=True)  # X-GitHub-Delivery that queued the job
+    
+    # Scheduling and retries
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.QUEUED)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_after = Column(DateTime(timezone=True), nullable=False)
+    last_error = Column(Text, nullable=True)
+    
+    # Lease held by the worker currently running the job
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        Index("ix_background_jobs_status_run_after", "status", "run_after"),
+    )
+
+class FileAnalysisCache(Base):
+    __tablename__ = "file_analysis_cache"
+    
+    # Content address: the file's blob SHA plus the patch rule-set version
+    blob_sha = Column(String, primary_key=True)
+    rules_version = Column(String, primary_key=True)
+    
+    feedback = Column(JSON, nullable=False)  # Feedback items without file_path
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    last_used_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+class ReviewStat(Base):
+    __tablename__ = "review_stats"
+    
+    # Number of reviews per (repo, branch type, creation day, status),
+    # maintained on every flush that creates, changes or deletes a review
+    repo_full_name = Column(String, primary_key=True)
+    branch_type = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    status = Column(Enum(ReviewStatus), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class ReviewEvent(Base):
+    __tablename__ = "review_events"
+    
+    # Ordered change feed of reviews, written in the transaction that made
+    # the change; the id doubles as the SSE event id
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    review_id = Column(Integer, nullable=False)
+    event_type = Column(String, nullable=False)  # review_created, review_updated, status_changed
+    payload = Column(JSON, nullable=False)  # List projection of the review
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+class ArchivedReview(Base):
+    __tablename__ = "archived_reviews"
+    
+    # Index of reviews moved out of pr_reviews into archive files; the
+    # review keeps its id. The counted columns let review_stats be rebuilt.
+    review_id = Column(Integer, primary_key=True, autoincrement=False)
+    archive_file = Column(String, nullable=False)  # e.g. "reviews-2025-09.ndjson.gz", under REVIEW_ARCHIVE_DIR
+    member_offset = Column(BigInteger, nullable=False)  # start of the gzip member holding the review
+    version = Column(Integer, nullable=False)  # row version when archived, for the ETag
+    repo_full_name = Column(String, nullable=False)
+    branch_type = Column(String, nullable=False)
+    status = Column(Enum(ReviewStatus), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    archived_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
@@ -1,91 +1,136 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from collections import defaultdict
+from typing import Dict, List, Optional
 
-from ..database import get_db
-from ..models import PRReview, ReviewStatus
-from ..schemas import InstructorDecision, PRReviewResponse
-from ..services.github_service import GitHubService
-from ..config import get_settings
+from ..database import get_async_db
+from ..models import PRReview, ReviewStatus, utcnow, review_content_options
+from ..schemas import InstructorDecision, PRReviewResponse, BulkDecisionRequest, BulkDecisionResult
+from ..services.job_queue import JobQueue, POST_REVIEW, POST_REVIEWS
+from ..services.review_stats import ReviewStatsService
 
 router = APIRouter()
-settings = get_settings()
+
+# A failed post can be approved again (retried) or rejected
+DECIDABLE_STATUSES = (ReviewStatus.PENDING, ReviewStatus.POST_FAILED)
+
+def apply_decision(review: PRReview, decision: str, notes: Optional[str]):
+    """Validate and record a decision on a review; ValueError if it is not allowed"""
+    if review.status not in DECIDABLE_STATUSES:
+        raise ValueError(f"Review is not pending (current status: {review.status.value})")
+    
+    if decision == "approve":
+        review.status = ReviewStatus.POSTING
+    elif decision == "reject":
+        review.status = ReviewStatus.REJECTED
+    else:
+        raise ValueError("Invalid decision")
+    
+    review.instructor_notes = notes
+    review.reviewed_at = utcnow()
 
 @router.post("/reviews/{review_id}/decide", response_model=PRReviewResponse)
-def instructor_decision(
+async def instructor_decision(
     review_id: int,
     decision: InstructorDecision,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Instructor approves or rejects a review"""
+    """
+    Instructor approves or rejects a review.
+
+    Approval does not wait for GitHub: the review moves to "posting" and a
+    post_review job, committed in the same transaction, posts the comment
+    and then marks it "posted" (or "post_failed" once retries run out).
+    """
     
-    review = db.query(PRReview).filter(PRReview.id == review_id).first()
+    review = await db.get(PRReview, review_id, options=review_content_options())
     
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
     
-    if review.status != ReviewStatus.PENDING:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Review is not pending (current status: {review.status})"
-        )
+    reposting = review.status == ReviewStatus.POST_FAILED
+    try:
+        apply_decision(review, decision.decision, decision.notes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    if decision.decision == "approve":
-        # Post the review to GitHub
-        github_service = GitHubService(settings.github_token)
-        
-        comment_body = review.review_summary
-        
-        if decision.notes:
-            comment_body += f"\n\n---\n**Instructor Notes:**\n{decision.notes}"
-        
-        success = github_service.post_review_comment(
-            review.repo_full_name,
-            review.pr_number,
-            comment_body,
-            review.commit_sha
-        )
-        
-        if success:
-            review.status = ReviewStatus.POSTED
-            review.posted_at = datetime.utcnow()
-        else:
-            raise HTTPException(status_code=500, detail="Failed to post to GitHub")
+    if review.status == ReviewStatus.POSTING:
+        payload = {"review_id": review.id, "reposted_ids": [review.id] if reposting else []}
+        await db.run_sync(lambda session: JobQueue(session).enqueue(POST_REVIEW, payload, commit=False))
     
-    elif decision.decision == "reject":
-        review.status = ReviewStatus.REJECTED
+    await db.commit()
     
-    else:
-        raise HTTPException(status_code=400, detail="Invalid decision")
+    return review
+
+@router.post("/reviews/decisions", response_model=List[BulkDecisionResult])
+async def bulk_instructor_decision(request: BulkDecisionRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Approve or reject many reviews in one transaction.
+
+    Each item is validated on its own and reported in the results; invalid
+    items do not block the others. Approved reviews are posted by one
+    post_reviews job per repository, which posts them concurrently.
+    """
+    ids = {item.review_id for item in request.decisions}
+    result = await db.execute(select(PRReview).where(PRReview.id.in_(ids)).with_for_update())
+    reviews = {review.id: review for review in result.scalars()}
     
-    review.instructor_notes = decision.notes
-    review.reviewed_at = datetime.utcnow()
+    results = []
+    approved_by_repo: Dict[str, List[int]] = defaultdict(list)
+    reposted = set()
     
-    db.commit()
-    db.refresh(review)
+    for item in request.decisions:
+        review = reviews.get(item.review_id)
+        if review is None:
+            results.append(BulkDecisionResult(review_id=item.review_id, ok=False, error="Review not found"))
+            continue
+        
+        previous_status = review.status
+        try:
+            apply_decision(review, item.decision, item.notes)
+        except ValueError as e:
+            results.append(BulkDecisionResult(
+                review_id=item.review_id, ok=False, status=review.status, error=str(e)
+            ))
+            continue
+        
+        if review.status == ReviewStatus.POSTING:
+            approved_by_repo[review.repo_full_name].append(review.id)
+            if previous_status == ReviewStatus.POST_FAILED:
+                reposted.add(review.id)
+        results.append(BulkDecisionResult(review_id=item.review_id, ok=True, status=review.status))
     
-    return review
+    def enqueue_posts(session):
+        queue = JobQueue(session)
+        for review_ids in approved_by_repo.values():
+            queue.enqueue(POST_REVIEWS, {
+                "review_ids": review_ids,
+                "reposted_ids": [review_id for review_id in review_ids if review_id in reposted]
+            }, commit=False)
+    
+    await db.run_sync(enqueue_posts)
+    await db.commit()
+    return results
 
 @router.get("/reviews/stats/summary")
-def get_stats(db: Session = Depends(get_db)):
+async def get_stats(db: AsyncSession = Depends(get_async_db)):
     """Get review statistics"""
-    
-    total = db.query(PRReview).count()
-    pending = db.query(PRReview).filter(PRReview.status == ReviewStatus.PENDING).count()
-    approved = db.query(PRReview).filter(PRReview.status == ReviewStatus.POSTED).count()
-    rejected = db.query(PRReview).filter(PRReview.status == ReviewStatus.REJECTED).count()
-    
-    return {
-        "total": total,
-        "pending": pending,
-        "approved": approved,
-        "rejected": rejected
-    }
-
-
-
-
-
-
-
+    return await db.run_sync(lambda session: ReviewStatsService(session).get_summary())
 
+@router.get("/reviews/stats/breakdown")
+async def get_stats_breakdown(
+    group_by: str = Query("repo", description="repo, branch_type, day, week or month"),
+    repo: Optional[str] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get review statistics per repo, branch type or time bucket"""
+    try:
+        return await db.run_sync(
+            lambda session: ReviewStatsService(session).get_breakdown(group_by, repo=repo, since=since, until=until)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_async_db
+from ..services.job_queue import JobQueue
+from ..services.metrics import JOB_QUEUE_DEPTH
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics(db: AsyncSession = Depends(get_async_db)):
+    """Prometheus metrics of this process, plus the shared job queue depth"""
+    depth = await db.run_sync(lambda session: JobQueue(session).depth())
+    for status, count in depth.items():
+        JOB_QUEUE_DEPTH.labels(status).set(count)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,37 +1,383 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+import asyncio
+from collections import defaultdict
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, Header
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, List, Optional, Sequence, Union
+from datetime import datetime
 
-from ..database import get_db
-from ..models import PRReview, ReviewStatus
-from ..schemas import PRReviewResponse
+from ..database import get_async_db
+from ..models import (
+    PRReview, ReviewStatus, RuleSnapshot, FeedbackTemplate, ReviewFeedbackEntry, ArchivedReview, content_hash,
+    review_content_options
+)
+from ..schemas import PRReviewResponse, PRReviewListItem, ReviewSearchResponse
+from ..utils.pagination import encode_cursor, decode_cursor
+from ..utils.serialization import FastJSONResponse
+from ..services.review_events import get_review_event_broker, format_sse
+from ..services.review_archive import read_archived_review
+from ..services.review_search import ReviewSearchService
+from ..config import get_settings
 
 router = APIRouter()
 
-@router.get("/reviews", response_model=List[PRReviewResponse])
-def get_all_reviews(
-    status: str = None,
-    db: Session = Depends(get_db)
+# Columns of the list projection (everything except the large JSON columns)
+LIST_COLUMNS = [getattr(PRReview, name) for name in PRReviewListItem.model_fields]
+
+# Fields the detail endpoint can return; feedback_total comes with review_feedback
+DETAIL_FIELDS = [name for name in PRReviewResponse.model_fields if name != "feedback_total"]
+STORED_CONTENT_FIELDS = ("review_feedback", "expectations_applied")
+
+# Columns of include_details pages in fast serialization mode: the list
+# projection plus what the stored feedback and expectations are read from
+DETAIL_PAGE_COLUMNS = LIST_COLUMNS + [
+    PRReview.review_summary, PRReview.github_comment_id,
+    PRReview.feedback_hash, PRReview.rule_snapshot_hash,
+    PRReview.legacy_review_feedback, PRReview.legacy_expectations_applied
+]
+
+@router.get("/reviews", response_model=List[Union[PRReviewResponse, PRReviewListItem]])
+async def get_all_reviews(
+    response: Response,
+    status: Optional[str] = None,
+    repo: Optional[str] = None,
+    author: Optional[str] = None,
+    branch_type: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    include_details: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all reviews, optionally filtered by status"""
-    query = db.query(PRReview)
+    """
+    List reviews, newest first, one page at a time.
+
+    Pages are keyset-paginated on (created_at, id): pass the X-Next-Cursor
+    header of a response as `cursor` to get the next page. The feedback,
+    summary and expectations columns are only loaded with include_details.
+    With FAST_SERIALIZATION the page is built from column tuples and
+    encoded with orjson, without validating each row.
+    """
+    fast = get_settings().fast_serialization
+    if include_details:
+        query = select(*DETAIL_PAGE_COLUMNS) if fast else select(PRReview).options(*review_content_options())
+    else:
+        query = select(*LIST_COLUMNS)
     
     if status:
         try:
             status_enum = ReviewStatus(status)
-            query = query.filter(PRReview.status == status_enum)
+            query = query.where(PRReview.status == status_enum)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid status")
     
-    reviews = query.order_by(PRReview.created_at.desc()).all()
-    return reviews
+    if repo:
+        query = query.where(PRReview.repo_full_name == repo)
+    if author:
+        query = query.where(PRReview.pr_author == author)
+    if branch_type:
+        query = query.where(PRReview.branch_type == branch_type)
+    if created_after:
+        query = query.where(PRReview.created_at >= created_after)
+    if created_before:
+        query = query.where(PRReview.created_at < created_before)
+    
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(
+            tuple_(PRReview.created_at, PRReview.id) < tuple_(cursor_created_at, cursor_id)
+        )
+    
+    # One extra row tells us whether there is a next page
+    result = await db.execute(query.order_by(
+        PRReview.created_at.desc(), PRReview.id.desc()
+    ).limit(limit + 1))
+    reviews = result.scalars().all() if include_details and not fast else result.all()
+    
+    headers = {}
+    if len(reviews) > limit:
+        reviews = reviews[:limit]
+        last = reviews[-1]
+        headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+    
+    if not fast:
+        response.headers.update(headers)
+        return reviews
+    
+    if include_details:
+        content = await _detail_page(db, reviews)
+    else:
+        content = [row._asdict() for row in reviews]
+    return FastJSONResponse(content, headers=headers)
+
+@router.get("/reviews/search", response_model=ReviewSearchResponse)
+async def search_reviews(
+    q: Optional[str] = None,
+    repo: Optional[str] = None,
+    branch_type: Optional[str] = None,
+    author: Optional[str] = None,
+    branch: Optional[str] = None,
+    category: Optional[str] = None,
+    severity: Optional[str] = None,
+    status: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Search reviews by title, summary and finding messages.
+
+    `q` uses web search syntax ("quoted phrase", OR, -word). Hits are
+    ranked, title matches above summary and finding matches, and paged
+    with limit/offset. author and branch match substrings; category and
+    severity keep reviews with such a finding. The response includes the
+    total and facet counts by category, severity, repo and branch_type,
+    taken over the newest SEARCH_MAX_HITS matches.
+    """
+    status_enum = None
+    if status:
+        try:
+            status_enum = ReviewStatus(status)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid status")
+    
+    content = await db.run_sync(lambda session: ReviewSearchService(session).search(
+        q, repo=repo, branch_type=branch_type, author=author, branch=branch, category=category,
+        severity=severity, status=status_enum, created_after=created_after, created_before=created_before,
+        limit=limit, offset=offset
+    ))
+    if get_settings().fast_serialization:
+        return FastJSONResponse(content)
+    return content
+
+@router.get("/reviews/events")
+async def stream_review_events(
+    request: Request,
+    last_event_id: Optional[int] = None,
+    last_event_id_header: Optional[int] = Header(None, alias="Last-Event-ID")
+):
+    """
+    Server-Sent Events feed of review changes.
+
+    Sends review_created, review_updated, status_changed and review_deleted
+    events carrying the review's list projection. Reconnecting clients are
+    resumed from Last-Event-ID; a "reset" event means the gap could not be
+    replayed and the client should reload the list.
+    """
+    broker = get_review_event_broker()
+    subscription = await broker.subscribe(
+        last_event_id_header if last_event_id_header is not None else last_event_id
+    )
+    heartbeat = get_settings().events_heartbeat_interval
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            if subscription.reset:
+                yield "event: reset\ndata: {}\n\n"
+            for event in subscription.replay:
+                yield format_sse(event)
+
+            while not subscription.overflowed:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": heartbeat\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/reviews/{review_id}", response_model=PRReviewResponse)
-def get_review(review_id: int, db: Session = Depends(get_db)):
-    """Get a specific review"""
-    review = db.query(PRReview).filter(PRReview.id == review_id).first()
+async def get_review(
+    review_id: int,
+    fields: Optional[str] = None,
+    feedback_offset: int = Query(0, ge=0),
+    feedback_limit: Optional[int] = Query(None, ge=1, le=1000),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get a specific review.
+
+    `fields` is a comma-separated subset of the response fields; only the
+    requested ones are loaded. review_feedback can be paged with
+    feedback_offset/feedback_limit, feedback_total giving the item count.
+    Responses carry an ETag derived from the review's row version, and an
+    If-None-Match hit returns 304 before any review content is read.
+    Archived reviews are read from their archive file.
+    """
+    if fields:
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested - set(DETAIL_FIELDS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        requested.add("id")
+    else:
+        requested = set(DETAIL_FIELDS)
+    
+    row = (await db.execute(
+        select(PRReview.version, PRReview.feedback_hash, PRReview.rule_snapshot_hash).where(PRReview.id == review_id)
+    )).first()
+    if not row:
+        return await _archived_review(db, review_id, requested, feedback_offset, feedback_limit, if_none_match)
+    
+    headers = _detail_headers(review_id, row.version, requested, feedback_offset, feedback_limit)
+    if if_none_match and _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    
+    columns = [getattr(PRReview, name) for name in DETAIL_FIELDS if name in requested and name not in STORED_CONTENT_FIELDS]
+    # Reviews stored before rule snapshots and feedback items keep inline JSON
+    if "review_feedback" in requested and row.feedback_hash is None:
+        columns.append(PRReview.legacy_review_feedback)
+    if "expectations_applied" in requested and row.rule_snapshot_hash is None:
+        columns.append(PRReview.legacy_expectations_applied)
+    values = (await db.execute(select(*columns).where(PRReview.id == review_id))).first()
+    if not values:
+        raise HTTPException(status_code=404, detail="Review not found")
+    values = values._asdict()
+    
+    if "review_feedback" in requested:
+        end = feedback_offset + feedback_limit if feedback_limit else None
+        if row.feedback_hash is None:
+            items = values.pop("legacy_review_feedback") or []
+            values["review_feedback"] = items[feedback_offset:end]
+            values["feedback_total"] = len(items)
+        else:
+            values["review_feedback"], values["feedback_total"] = await _feedback_page(
+                db, review_id, feedback_offset, end
+            )
+    
+    if "expectations_applied" in requested:
+        if row.rule_snapshot_hash is None:
+            values["expectations_applied"] = values.pop("legacy_expectations_applied") or {}
+        else:
+            values["expectations_applied"] = await db.scalar(
+                select(RuleSnapshot.expectations).where(RuleSnapshot.hash == row.rule_snapshot_hash)
+            )
+    
+    if get_settings().fast_serialization:
+        return FastJSONResponse(values, headers=headers)
+    return JSONResponse(jsonable_encoder(values), headers=headers)
+
+def _detail_headers(
+    review_id: int, version: int, requested: set, feedback_offset: int, feedback_limit: Optional[int]
+) -> Dict[str, str]:
+    # The same version can be served as different field sets and pages
+    variant = content_hash([sorted(requested), feedback_offset, feedback_limit])[:8]
+    return {"ETag": f'"{review_id}-{version}-{variant}"', "Cache-Control": "private, no-cache"}
+
+async def _archived_review(
+    db: AsyncSession,
+    review_id: int,
+    requested: set,
+    feedback_offset: int,
+    feedback_limit: Optional[int],
+    if_none_match: Optional[str]
+):
+    """Detail response of a review moved out of pr_reviews, or 404"""
+    entry = await db.get(ArchivedReview, review_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Review not found")
     
-    if not review:
+    headers = _detail_headers(review_id, entry.version, requested, feedback_offset, feedback_limit)
+    if if_none_match and _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    
+    record = await asyncio.to_thread(read_archived_review, entry)
+    if record is None:
         raise HTTPException(status_code=404, detail="Review not found")
     
-    return review
\ No newline at end of file
+    values = {name: record[name] for name in DETAIL_FIELDS if name in requested}
+    if "review_feedback" in requested:
+        end = feedback_offset + feedback_limit if feedback_limit else None
+        values["review_feedback"] = record["review_feedback"][feedback_offset:end]
+        values["feedback_total"] = len(record["review_feedback"])
+    
+    if get_settings().fast_serialization:
+        return FastJSONResponse(values, headers=headers)
+    return JSONResponse(values, headers=headers)
+
+async def _detail_page(db: AsyncSession, rows: Sequence) -> List[Dict[str, Any]]:
+    """
+    include_details items for rows of DETAIL_PAGE_COLUMNS, in the order of
+    PRReviewResponse. Feedback and rule snapshots are read for the whole
+    page in one query each.
+    """
+    feedback_ids = [row.id for row in rows if row.feedback_hash is not None]
+    snapshot_hashes = {row.rule_snapshot_hash for row in rows if row.rule_snapshot_hash is not None}
+    
+    feedback = defaultdict(list)
+    if feedback_ids:
+        result = await db.execute(select(
+            ReviewFeedbackEntry.review_id, FeedbackTemplate.category, FeedbackTemplate.severity,
+            FeedbackTemplate.message, ReviewFeedbackEntry.line_number, ReviewFeedbackEntry.file_path
+        ).join(ReviewFeedbackEntry.template).where(
+            ReviewFeedbackEntry.review_id.in_(feedback_ids)
+        ).order_by(ReviewFeedbackEntry.review_id, ReviewFeedbackEntry.position))
+        for review_id, category, severity, message, line_number, file_path in result:
+            feedback[review_id].append({
+                "category": category, "severity": severity, "message": message,
+                "line_number": line_number, "file_path": file_path
+            })
+    
+    snapshots = {}
+    if snapshot_hashes:
+        snapshots = dict((await db.execute(
+            select(RuleSnapshot.hash, RuleSnapshot.expectations).where(RuleSnapshot.hash.in_(snapshot_hashes))
+        )).all())
+    
+    items = []
+    for row in rows:
+        values = row._asdict()
+        if row.feedback_hash is None:
+            values["review_feedback"] = row.legacy_review_feedback or []
+        else:
+            values["review_feedback"] = feedback[row.id]
+        if row.rule_snapshot_hash is None:
+            values["expectations_applied"] = row.legacy_expectations_applied or {}
+        else:
+            values["expectations_applied"] = snapshots[row.rule_snapshot_hash]
+        items.append({name: values.get(name) for name in PRReviewResponse.model_fields})
+    return items
+
+async def _feedback_page(db: AsyncSession, review_id: int, start: int, end: Optional[int]):
+    """Feedback items [start, end) of a review plus its item count"""
+    # Positions are contiguous from 0, so a page is a primary-key range scan
+    query = select(
+        FeedbackTemplate.category, FeedbackTemplate.severity, FeedbackTemplate.message,
+        ReviewFeedbackEntry.line_number, ReviewFeedbackEntry.file_path
+    ).join(ReviewFeedbackEntry.template).where(
+        ReviewFeedbackEntry.review_id == review_id,
+        ReviewFeedbackEntry.position >= start
+    ).order_by(ReviewFeedbackEntry.position)
+    if end is not None:
+        query = query.where(ReviewFeedbackEntry.position < end)
+    
+    items = [item._asdict() for item in (await db.execute(query)).all()]
+    total = await db.scalar(
+        select(func.count()).select_from(ReviewFeedbackEntry).where(ReviewFeedbackEntry.review_id == review_id)
+    )
+    return items, total
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
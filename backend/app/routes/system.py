@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_async_db, get_engine, get_async_engine, pool_status
+from ..services.job_queue import JobQueue
+from ..services.rate_limiter import get_rate_limit_scheduler
+from ..services.analysis_cache import cache_stats
+
+router = APIRouter()
+
+@router.get("/system/status")
+async def get_system_status(db: AsyncSession = Depends(get_async_db)):
+    """GitHub rate-limit budget, background queue depth, cache efficiency and DB pools"""
+    return {
+        "github_rate_limit": get_rate_limit_scheduler().snapshot(),
+        "job_queue": await db.run_sync(lambda session: JobQueue(session).depth()),
+        "analysis_cache": cache_stats.snapshot(),
+        "database_pools": {
+            "async": pool_status(get_async_engine().sync_engine),
+            "sync": pool_status(get_engine())
+        }
+    }
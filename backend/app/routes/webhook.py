@@ -1,17 +1,27 @@
 from fastapi import APIRouter, Request, Depends, HTTPException, Header
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 import hmac
 import hashlib
-from typing import Optional
+import re
+import orjson
+from typing import Dict, Any, Optional
 
-from ..database import get_db
+from ..database import get_async_db
 from ..config import get_settings
-from ..models import PRReview, ReviewStatus
-from ..services.review_engine import ReviewEngine
-from ..services.branch_rules import BranchRulesService
+from ..services.job_queue import JobQueue, ANALYZE_PR, pr_coalesce_key
+from ..services.metrics import stage
+from ..services.webhook_deliveries import get_seen_deliveries
 
 router = APIRouter()
-settings = get_settings()
+
+# Only new PRs and new commits are reviewed
+REVIEWED_ACTIONS = {"opened", "synchronize"}
+
+# GitHub serializes "action" first, so ignored actions can be told apart
+# without parsing the payload
+LEADING_ACTION = re.compile(rb'\s*\{\s*"action"\s*:\s*"([a-z_]+)"')
 
 def verify_signature(payload: bytes, signature: str) -> bool:
     """Verify GitHub webhook signature"""
@@ -23,101 +33,105 @@ def verify_signature(payload: bytes, signature: str) -> bool:
         return False
     
     mac = hmac.new(
-        settings.github_webhook_secret.encode(),
+        get_settings().github_webhook_secret.encode(),
         msg=payload,
         digestmod=hashlib.sha256
     )
     
     return hmac.compare_digest(mac.hexdigest(), github_signature)
 
-@router.post("/webhook/github")
+def queue_review(db: Session, pr_info: Dict[str, Any], delivery_id: Optional[str]) -> Optional[int]:
+    """Queue the analysis of a delivery; None if the delivery was queued before"""
+    # Pushes landing within the debounce window replace each other, so
+    # only the newest commit of a PR is analyzed
+    try:
+        job = JobQueue(db).enqueue(
+            ANALYZE_PR,
+            pr_info,
+            delay=get_settings().review_debounce_seconds,
+            coalesce_key=pr_coalesce_key(pr_info["repo_full_name"], pr_info["pr_number"]),
+            delivery_id=delivery_id
+        )
+    except IntegrityError:
+        # A redelivery: the unique delivery id rolls back its supersede too
+        db.rollback()
+        return None
+    
+    if delivery_id:
+        get_seen_deliveries().add(delivery_id)
+    return job.id
+
+@router.post("/webhook/github", status_code=202)
 async def github_webhook(
     request: Request,
-    db: Session = Depends(get_db),
-    x_hub_signature_256: Optional[str] = Header(None)
+    db: AsyncSession = Depends(get_async_db),
+    x_hub_signature_256: Optional[str] = Header(None),
+    x_github_event: Optional[str] = Header(None),
+    x_github_delivery: Optional[str] = Header(None)
 ):
-    """Receive GitHub webhook events"""
+    """Receive GitHub webhook events and queue them for review"""
+    
+    # Other events are acknowledged without reading the body
+    if x_github_event is not None and x_github_event != "pull_request":
+        return {"message": "Event ignored"}
     
     # Get raw body for signature verification
     body = await request.body()
     
     # Verify signature
-    if not verify_signature(body, x_hub_signature_256 or ""):
+    with stage("webhook", "verify_signature"):
+        verified = verify_signature(body, x_hub_signature_256 or "")
+    if not verified:
         raise HTTPException(status_code=401, detail="Invalid signature")
     
-    # Parse JSON
-    payload = await request.json()
+    # Redeliveries reuse the delivery id
+    if x_github_delivery and x_github_delivery in get_seen_deliveries():
+        return {"message": "Duplicate delivery ignored"}
+    
+    leading_action = LEADING_ACTION.match(body)
+    if leading_action and leading_action.group(1).decode() not in REVIEWED_ACTIONS:
+        return {"message": "Action ignored"}
+    
+    # Parse JSON, once
+    with stage("webhook", "parse_payload"):
+        try:
+            payload = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="Invalid JSON payload")
     
     # Only process pull_request events
-    if "pull_request" not in payload:
+    if not isinstance(payload, dict) or "pull_request" not in payload:
         return {"message": "Event ignored"}
     
     action = payload.get("action")
     
     # Only process opened and synchronize (new commits) events
-    if action not in ["opened", "synchronize"]:
+    if action not in REVIEWED_ACTIONS:
         return {"message": "Action ignored"}
     
     pr_data = payload["pull_request"]
     repo_data = payload["repository"]
     
-    # Extract PR information
-    pr_number = pr_data["number"]
-    repo_full_name = repo_data["full_name"]
-    branch_name = pr_data["head"]["ref"]
-    pr_title = pr_data["title"]
-    pr_author = pr_data["user"]["login"]
-    pr_url = pr_data["html_url"]
-    commit_sha = pr_data["head"]["sha"]
-    
-    # Get branch-based expectations
-    branch_service = BranchRulesService(db)
-    expectations = branch_service.get_expectations_for_branch(branch_name)
-    branch_type = branch_service.extract_branch_type(branch_name)
-    
-    # Run automated review
-    review_engine = ReviewEngine(settings.github_token)
-    review_result = review_engine.analyze_pr(
-        repo_full_name,
-        pr_number,
-        expectations
-    )
+    pr_info = {
+        "pr_number": pr_data["number"],
+        "repo_full_name": repo_data["full_name"],
+        "branch_name": pr_data["head"]["ref"],
+        "pr_title": pr_data["title"],
+        "pr_author": pr_data["user"]["login"],
+        "pr_url": pr_data["html_url"],
+        "commit_sha": pr_data["head"]["sha"],
+        "action": action
+    }
     
-    # Check if review already exists
-    existing_review = db.query(PRReview).filter(
-        PRReview.pr_number == pr_number,
-        PRReview.repo_full_name == repo_full_name,
-        PRReview.commit_sha == commit_sha
-    ).first()
-    
-    if existing_review:
-        # Update existing review
-        existing_review.review_feedback = review_result["feedback_items"]
-        existing_review.review_summary = review_result["summary"]
-        existing_review.expectations_applied = expectations
-        existing_review.status = ReviewStatus.PENDING
-    else:
-        # Create new review
-        pr_review = PRReview(
-            pr_number=pr_number,
-            repo_full_name=repo_full_name,
-            branch_name=branch_name,
-            branch_type=branch_type,
-            pr_title=pr_title,
-            pr_author=pr_author,
-            review_feedback=review_result["feedback_items"],
-            review_summary=review_result["summary"],
-            expectations_applied=expectations,
-            status=ReviewStatus.PENDING,
-            pr_url=pr_url,
-            commit_sha=commit_sha
-        )
-        db.add(pr_review)
+    # Queue the review; the analysis runs in a background worker
+    with stage("webhook", "enqueue"):
+        job_id = await db.run_sync(lambda session: queue_review(session, pr_info, x_github_delivery))
     
-    db.commit()
+    if job_id is None:
+        return {"message": "Duplicate delivery ignored"}
     
     return {
-        "message": "PR review created and pending instructor approval",
-        "pr_number": pr_number,
-        "branch_type": branch_type
-    }
\ No newline at end of file
+        "message": "PR review queued",
+        "pr_number": pr_data["number"],
+        "job_id": job_id
+    }
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from .models import ReviewStatus
@@ -19,7 +19,8 @@ class PRReviewCreate(BaseModel):
     pr_url: str
     commit_sha: str
 
-class PRReviewResponse(BaseModel):
+class PRReviewListItem(BaseModel):
+    """Review without the large feedback and expectations columns"""
     id: int
     pr_number: int
     repo_full_name: str
@@ -27,9 +28,8 @@ class PRReviewResponse(BaseModel):
     branch_type: str
     pr_title: str
     pr_author: str
-    review_feedback: List[Dict[str, Any]]
-    review_summary: str
-    expectations_applied: Dict[str, Any]
+    error_count: int
+    warning_count: int
     status: ReviewStatus
     instructor_notes: Optional[str]
     created_at: datetime
@@ -38,9 +38,41 @@ class PRReviewResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class PRReviewResponse(PRReviewListItem):
+    review_feedback: List[Dict[str, Any]]
+    feedback_total: Optional[int] = None  # review_feedback may be one page of this many items
+    review_summary: str
+    expectations_applied: Dict[str, Any]
+    github_comment_id: Optional[int] = None
+
+class SearchFacetValue(BaseModel):
+    value: str
+    count: int  # matching reviews
+
+class ReviewSearchHit(PRReviewListItem):
+    rank: Optional[float] = None  # None when the search has no query text
+
+class ReviewSearchResponse(BaseModel):
+    total: int
+    total_capped: bool  # more reviews match than the SEARCH_MAX_HITS counted
+    items: List[ReviewSearchHit]
+    facets: Dict[str, List[SearchFacetValue]]  # category, severity, repo and branch_type
+
 class InstructorDecision(BaseModel):
     decision: str  # "approve" or "reject"
     notes: Optional[str] = None
+
+class BulkDecisionItem(InstructorDecision):
+    review_id: int
+
+class BulkDecisionRequest(BaseModel):
+    decisions: List[BulkDecisionItem] = Field(..., min_length=1, max_length=500)
+
+class BulkDecisionResult(BaseModel):
+    review_id: int
+    ok: bool
+    status: Optional[ReviewStatus] = None  # Review status after the decision
+    error: Optional[str] = None
     
 
 class BranchRuleCreate(BaseModel):
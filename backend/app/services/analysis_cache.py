@@ -0,0 +1,117 @@
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Any, List, Iterable
+
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..database import dialect_insert
+from ..models import FileAnalysisCache, utcnow
+
+class CacheStats:
+    """Process-wide hit/miss counters for the analysis cache"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, hits: int, misses: int):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def snapshot(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None
+        }
+
+cache_stats = CacheStats()
+_last_prune = 0.0
+
+class AnalysisCache:
+    """
+    Persistent per-file analysis results, addressed by blob SHA.
+
+    A file whose blob did not change between pushes keeps its findings, so
+    re-reviews only analyze changed files. Entries are keyed by the patch
+    rule-set version too, so changing the rules invalidates them. Eviction
+    drops entries unused for analysis_cache_ttl_days and, past
+    analysis_cache_max_entries, the least recently used ones.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.settings = get_settings()
+
+    def get_many(self, blob_shas: Iterable[str], rules_version: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Cached feedback items by blob SHA (without file_path)"""
+        keys = set(blob_shas)
+        if not keys:
+            return {}
+
+        rows = self.db.query(FileAnalysisCache.blob_sha, FileAnalysisCache.feedback).filter(
+            FileAnalysisCache.rules_version == rules_version,
+            FileAnalysisCache.blob_sha.in_(keys)
+        ).all()
+        found = {blob_sha: feedback for blob_sha, feedback in rows}
+
+        if found:
+            self.db.query(FileAnalysisCache).filter(
+                FileAnalysisCache.rules_version == rules_version,
+                FileAnalysisCache.blob_sha.in_(found.keys())
+            ).update({FileAnalysisCache.last_used_at: utcnow()}, synchronize_session=False)
+            self.db.commit()
+
+        cache_stats.record(len(found), len(keys) - len(found))
+        return found
+
+    def put_many(self, entries: Dict[str, List[Dict[str, Any]]], rules_version: str):
+        """Store feedback items for newly analyzed blobs"""
+        if entries:
+            now = utcnow()
+            statement = dialect_insert(self.db, FileAnalysisCache).values([
+                {
+                    "blob_sha": blob_sha,
+                    "rules_version": rules_version,
+                    "feedback": feedback,
+                    "created_at": now,
+                    "last_used_at": now
+                }
+                for blob_sha, feedback in entries.items()
+            ]).on_conflict_do_nothing(index_elements=["blob_sha", "rules_version"])
+            self.db.execute(statement)
+            self.db.commit()
+
+        self._maybe_prune()
+
+    def prune(self) -> int:
+        """Apply the TTL and size cap, returning the number of evicted entries"""
+        expired_before = utcnow() - timedelta(days=self.settings.analysis_cache_ttl_days)
+        evicted = self.db.query(FileAnalysisCache).filter(
+            FileAnalysisCache.last_used_at < expired_before
+        ).delete(synchronize_session=False)
+
+        # Oldest last_used_at still inside the size cap
+        cutoff = self.db.query(FileAnalysisCache.last_used_at).order_by(
+            FileAnalysisCache.last_used_at.desc()
+        ).offset(self.settings.analysis_cache_max_entries).limit(1).scalar()
+
+        if cutoff is not None:
+            evicted += self.db.query(FileAnalysisCache).filter(
+                FileAnalysisCache.last_used_at <= cutoff
+            ).delete(synchronize_session=False)
+
+        self.db.commit()
+        return evicted
+
+    def _maybe_prune(self):
+        global _last_prune
+        now = time.monotonic()
+        if now - _last_prune >= self.settings.analysis_cache_prune_interval:
+            _last_prune = now
+            self.prune()
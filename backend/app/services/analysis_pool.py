@@ -0,0 +1,89 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from ..config import get_settings
+from .patch_rules import PatchAnalyzer
+
+# (filename, patch) pairs, the unit of work sent to the pool
+FileChunk = List[Tuple[str, Optional[str]]]
+
+def analyze_chunk(analyzer: PatchAnalyzer, files: FileChunk) -> List[List[Dict[str, Any]]]:
+    """Feedback items for each file of a chunk, in the same order"""
+    return [analyzer.analyze(filename, patch) for filename, patch in files]
+
+def chunk_files(files: Sequence[Tuple[str, Optional[str]]], chunk_bytes: int) -> List[FileChunk]:
+    """Split files into consecutive chunks of roughly chunk_bytes of patch each"""
+    chunks = []
+    current: FileChunk = []
+    size = 0
+
+    for filename, patch in files:
+        current.append((filename, patch))
+        size += len(patch or "")
+        if size >= chunk_bytes:
+            chunks.append(current)
+            current, size = [], 0
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+_executor: Optional[Executor] = None
+
+def get_analysis_executor() -> Executor:
+    """Process-wide pool for CPU-bound patch analysis"""
+    global _executor
+    if _executor is None:
+        settings = get_settings()
+        workers = settings.analysis_workers or os.cpu_count() or 1
+
+        if settings.analysis_executor == "thread":
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis")
+        else:
+            # Spawned children do not inherit the API's threads and sockets
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+    return _executor
+
+def shutdown_analysis_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+async def analyze_files(
+    analyzer: PatchAnalyzer,
+    files: Sequence[Tuple[str, Optional[str]]]
+) -> List[List[Dict[str, Any]]]:
+    """
+    Run the patch analyzer over every file of a PR.
+
+    Small PRs are analyzed in one go, in a thread so the event loop keeps
+    serving. Once the total patch size reaches analysis_parallel_min_bytes
+    the files are split into chunks that fan out across the analysis pool;
+    results are merged back in file order so feedback stays deterministic.
+    """
+    settings = get_settings()
+    total_bytes = sum(len(patch or "") for _, patch in files)
+
+    if settings.analysis_executor == "inline" or total_bytes < settings.analysis_parallel_min_bytes:
+        return await asyncio.to_thread(analyze_chunk, analyzer, list(files))
+
+    loop = asyncio.get_running_loop()
+    executor = get_analysis_executor()
+    chunks = chunk_files(files, settings.analysis_chunk_bytes)
+
+    results = await asyncio.gather(*(
+        loop.run_in_executor(executor, analyze_chunk, analyzer, chunk)
+        for chunk in chunks
+    ))
+
+    merged = []
+    for chunk_result in results:
+        merged.extend(chunk_result)
+    return merged
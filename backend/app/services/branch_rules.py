@@ -1,11 +1,106 @@
 import re
-from typing import Dict, Any, Optional
+import threading
+import time
+from typing import Dict, Any, Optional, Iterable
 from sqlalchemy.orm import Session
-from ..models import BranchRule
+from ..config import get_settings
+from ..models import BranchRule, BranchRulesVersion
+
+class BranchRuleMatcher:
+    """
+    Compiled branch rule lookup.
+
+    Exact patterns are a dict lookup. Wildcard patterns are stored in a
+    trie under their literal prefix (the text before the first "*"), so a
+    lookup walks the branch name once and only tests the patterns whose
+    prefix matches. Precedence is deterministic: exact match, then the
+    wildcard pattern with the most literal characters (ties broken by
+    pattern), then the "default" rule.
+    """
+
+    _RULES = object()  # Trie key holding the patterns of a prefix node
+
+    def __init__(self, rules: Iterable[BranchRule]):
+        self._exact: Dict[str, Dict[str, Any]] = {}
+        self._trie: Dict[Any, Any] = {}
+        self.default: Optional[Dict[str, Any]] = None
+
+        for rule in rules:
+            pattern = rule.branch_pattern
+            result = {
+                "branch_type": pattern,
+                "description": rule.description,
+                **rule.expectations
+            }
+
+            if pattern == "default":
+                self.default = result
+                continue
+            if "*" not in pattern:
+                self._exact[pattern] = result
+                continue
+
+            prefix = pattern[:pattern.index("*")]
+            if pattern == prefix + "*":
+                regex = None  # Plain prefix pattern, the trie walk is the match
+            else:
+                regex = re.compile(".*".join(re.escape(part) for part in pattern.split("*")))
+
+            node = self._trie
+            for char in prefix:
+                node = node.setdefault(char, {})
+            rank = (-(len(pattern) - pattern.count("*")), pattern)
+            node.setdefault(self._RULES, []).append((rank, regex, result))
+
+    def match(self, branch_name: str) -> Optional[Dict[str, Any]]:
+        """Rule for a branch name, or None if only the default would apply"""
+        result = self._exact.get(branch_name)
+        if result is not None:
+            return result
+
+        best = None
+        node = self._trie
+        depth = 0
+        while node is not None:
+            for rank, regex, candidate in node.get(self._RULES, ()):
+                if best is not None and rank >= best[0]:
+                    continue
+                if regex is None or regex.fullmatch(branch_name):
+                    best = (rank, candidate)
+
+            if depth == len(branch_name):
+                break
+            node = node.get(branch_name[depth])
+            depth += 1
+
+        return best[1] if best else None
+
+# Process-wide compiled matcher, rebuilt when the stored rule version changes.
+# The version is read at most once per branch_rules_check_interval.
+_matcher: Optional[BranchRuleMatcher] = None
+_matcher_version: Optional[int] = None
+_matcher_checked_at = float("-inf")
+_matcher_lock = threading.Lock()
+
+def invalidate_branch_rules(db: Session):
+    """
+    Bump the stored rule version in the caller's transaction.
+
+    Every process compares it with the version of its matcher once its
+    check interval has passed, so a change made by one API process or
+    worker reaches all. This process checks on its next lookup.
+    """
+    global _matcher_checked_at
+
+    db.query(BranchRulesVersion).filter(BranchRulesVersion.id == 1).update(
+        {BranchRulesVersion.version: BranchRulesVersion.version + 1}, synchronize_session=False
+    )
+    _matcher_checked_at = float("-inf")
 
 class BranchRulesService:
     
-    # Default rules for common branch patterns
+    # Default rules for common branch patterns. Migration 0002 seeds a copy;
+    # changing them here needs a migration to change stored rules too.
     DEFAULT_RULES = {
         "main": {
             "description": "Main production branch - highest standards",
@@ -149,60 +244,43 @@ class BranchRulesService:
     
     def __init__(self, db: Session):
         self.db = db
-        self._ensure_default_rules()
-    
-    def _ensure_default_rules(self):
-        """Ensure default rules exist in database"""
-        for pattern, data in self.DEFAULT_RULES.items():
-            existing = self.db.query(BranchRule).filter(
-                BranchRule.branch_pattern == pattern
-            ).first()
-            
-            if not existing:
-                rule = BranchRule(
-                    branch_pattern=pattern,
-                    description=data["description"],
-                    expectations=data["expectations"]
-                )
-                self.db.add(rule)
-        
-        self.db.commit()
     
+    def _get_matcher(self) -> BranchRuleMatcher:
+        """
+        Compiled matcher for the current rules.
+
+        Nothing is read while the last version check is recent; after that
+        the version row is, and the rules only when they changed.
+        """
+        global _matcher, _matcher_version, _matcher_checked_at
+
+        matcher = _matcher
+        now = time.monotonic()
+        if matcher is not None and now - _matcher_checked_at < get_settings().branch_rules_check_interval:
+            return matcher
+
+        version = self.db.query(BranchRulesVersion.version).filter(BranchRulesVersion.id == 1).scalar()
+        with _matcher_lock:
+            if _matcher is None or _matcher_version != version:
+                _matcher = BranchRuleMatcher(self.db.query(BranchRule).all())
+                _matcher_version = version
+            _matcher_checked_at = now
+            return _matcher
+
     def get_expectations_for_branch(self, branch_name: str) -> Dict[str, Any]:
         """Get expectations based on branch name"""
-        rules = self.db.query(BranchRule).all()
-        
-        # Check for exact match first (main, develop)
-        for rule in rules:
-            if rule.branch_pattern == branch_name:
-                return {
-                    "branch_type": rule.branch_pattern,
-                    "description": rule.description,
-                    **rule.expectations
-                }
+        matcher = self._get_matcher()
         
-        # Then check pattern matches (feature/*, bugfix/*, etc.)
-        for rule in rules:
-            if '*' in rule.branch_pattern:
-                pattern = rule.branch_pattern.replace("*", ".*")
-                if re.match(f"^{pattern}$", branch_name):
-                    return {
-                        "branch_type": rule.branch_pattern,
-                        "description": rule.description,
-                        **rule.expectations
-                    }
-        
-        # Default if no pattern matches
-        default_rule = next((r for r in rules if r.branch_pattern == "default"), None)
-        if default_rule:
-            return {
-                "branch_type": "default",
-                "description": default_rule.description,
-                **default_rule.expectations
-            }
+        result = matcher.match(branch_name) or matcher.default
+        if result:
+            return dict(result)
         
         # Fallback
-        return self.DEFAULT_RULES["default"]["expectations"]
+        return {
+            "branch_type": "default",
+            "description": self.DEFAULT_RULES["default"]["description"],
+            **self.DEFAULT_RULES["default"]["expectations"]
+        }
     
     def extract_branch_type(self, branch_name: str) -> str:
         """Extract branch type from branch name"""
@@ -221,6 +299,7 @@ class BranchRulesService:
             expectations=expectations
         )
         self.db.add(rule)
+        invalidate_branch_rules(self.db)
         self.db.commit()
         return rule
     
@@ -233,6 +312,7 @@ class BranchRulesService:
         if rule:
             rule.description = description
             rule.expectations = expectations
+            invalidate_branch_rules(self.db)
             self.db.commit()
         
         return rule
\ No newline at end of file
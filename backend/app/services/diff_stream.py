@@ -0,0 +1,195 @@
+import fnmatch
+from typing import AsyncIterator, List, Optional, Sequence
+
+from ..config import get_settings
+
+# Why a file was not (fully) analyzed
+IGNORED = "ignored"  # Matches an ignore glob
+FILE_BUDGET = "file_budget"  # Its diff is larger than the per-file budget
+PR_BUDGET = "pr_budget"  # The PR's budget was spent before or during it
+
+class DiffBudget:
+    """
+    Size limits for analyzing one PR, plus the paths that are never analyzed.
+
+    Ignore globs without a slash match the file name (`package-lock.json`,
+    `*.min.js`), globs ending in a slash match a directory anywhere in the
+    path (`dist/`), and other globs match the whole path. Budgets count the
+    characters and lines of hunks that are kept for analysis.
+    """
+
+    def __init__(
+        self,
+        max_file_bytes: int,
+        max_file_lines: int,
+        max_pr_bytes: int,
+        max_pr_lines: int,
+        ignore_globs: Sequence[str] = ()
+    ):
+        self.max_file_bytes = max_file_bytes
+        self.max_file_lines = max_file_lines
+        self.max_pr_bytes = max_pr_bytes
+        self.max_pr_lines = max_pr_lines
+        self.ignore_globs = [glob.strip() for glob in ignore_globs if glob.strip()]
+        self.pr_bytes = 0
+        self.pr_lines = 0
+
+    @classmethod
+    def from_settings(cls) -> "DiffBudget":
+        settings = get_settings()
+        return cls(
+            settings.diff_max_file_bytes,
+            settings.diff_max_file_lines,
+            settings.diff_max_pr_bytes,
+            settings.diff_max_pr_lines,
+            settings.diff_ignore_globs.split(",")
+        )
+
+    def is_ignored(self, filename: str) -> bool:
+        parts = filename.split("/")
+        for glob in self.ignore_globs:
+            if glob.endswith("/"):
+                if any(fnmatch.fnmatchcase(part, glob[:-1]) for part in parts[:-1]):
+                    return True
+            elif "/" in glob:
+                if fnmatch.fnmatchcase(filename, glob):
+                    return True
+            elif fnmatch.fnmatchcase(parts[-1], glob):
+                return True
+        return False
+
+    @property
+    def pr_exhausted(self) -> bool:
+        return self.pr_bytes >= self.max_pr_bytes or self.pr_lines >= self.max_pr_lines
+
+class DiffFile:
+    """
+    One file of a PR diff.
+
+    `patch` holds the kept hunks in the format of the files API's patch
+    field, or None when nothing was analyzed. `skipped` names the reason
+    when some or all of the file was left out.
+    """
+
+    def __init__(self, filename: str, budget: DiffBudget):
+        self.filename = filename
+        self.skipped: Optional[str] = None
+        self._budget = budget
+        self._lines: List[str] = []
+        self._bytes = 0
+        self._started = False
+
+    def add(self, line: str):
+        """Append a hunk line, unless a budget or the ignore globs say otherwise"""
+        if not self._started:
+            self._started = True
+            if self._budget.is_ignored(self.filename):
+                self.skipped = IGNORED
+            elif self._budget.pr_exhausted:
+                self.skipped = PR_BUDGET
+        if self.skipped:
+            return
+
+        size = len(line) + 1
+        budget = self._budget
+        if self._bytes + size > budget.max_file_bytes or len(self._lines) >= budget.max_file_lines:
+            self.skipped = FILE_BUDGET
+        elif budget.pr_bytes + size > budget.max_pr_bytes or budget.pr_lines >= budget.max_pr_lines:
+            self.skipped = PR_BUDGET
+        else:
+            self._lines.append(line)
+            self._bytes += size
+            budget.pr_bytes += size
+            budget.pr_lines += 1
+
+    @property
+    def patch(self) -> Optional[str]:
+        return "\n".join(self._lines) if self._lines else None
+
+    @classmethod
+    def from_patch(cls, filename: str, patch: Optional[str], budget: DiffBudget) -> "DiffFile":
+        """Apply the budget to a patch that is already in memory"""
+        file = cls(filename, budget)
+        if patch:
+            for line in patch.split("\n"):
+                file.add(line)
+                if file.skipped:
+                    break
+        return file
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[str]:
+    """
+    Split a byte stream into lines without the line endings.
+
+    Lines longer than max_line_bytes (minified bundles, for instance) are
+    cut at that length and the rest is dropped unread, so no line is ever
+    held in full.
+    """
+    buffer = bytearray()
+    overlong = False
+
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end == -1:
+                if not overlong:
+                    buffer += chunk[start:start + max_line_bytes - len(buffer)]
+                    overlong = len(buffer) >= max_line_bytes
+                break
+            if not overlong:
+                buffer += chunk[start:min(end, start + max_line_bytes - len(buffer))]
+            yield buffer.decode("utf-8", errors="replace").rstrip("\r")
+            buffer.clear()
+            overlong = False
+            start = end + 1
+
+    if buffer:
+        yield buffer.decode("utf-8", errors="replace").rstrip("\r")
+
+def _unquote(path: str) -> str:
+    if len(path) >= 2 and path[0] == path[-1] == '"':
+        return path[1:-1]
+    return path
+
+def _header_filename(line: str) -> str:
+    """File name of a `diff --git a/<name> b/<name>` line"""
+    rest = _unquote(line[len("diff --git "):])
+    if rest.startswith(("a/", '"a/')):
+        # Both names are equal unless the file was renamed, which a later
+        # "rename to" line reports
+        middle = (len(rest) - 1) // 2
+        if rest[middle:].startswith(" b/"):
+            return rest[2:middle]
+    return rest.rsplit(" b/", 1)[-1]
+
+async def iter_diff_files(lines: AsyncIterator[str], budget: DiffBudget) -> AsyncIterator[DiffFile]:
+    """
+    Parse a unified git diff into files, one at a time.
+
+    Only the hunks of the current file are in memory, and only as far as
+    the budget allows; lines past it are read and dropped. Binary and
+    mode-only changes come through with no patch.
+    """
+    file: Optional[DiffFile] = None
+    in_hunks = False
+
+    async for line in lines:
+        if line.startswith("diff --git "):
+            if file:
+                yield file
+            file = DiffFile(_header_filename(line), budget)
+            in_hunks = False
+        elif file is None:
+            continue
+        elif in_hunks or line.startswith("@@"):
+            in_hunks = True
+            file.add(line)
+        elif line.startswith("+++ ") and line != "+++ /dev/null":
+            name = _unquote(line[4:])
+            file.filename = name[2:] if name.startswith("b/") else name
+        elif line.startswith("rename to "):
+            file.filename = line[len("rename to "):]
+
+    if file:
+        yield file
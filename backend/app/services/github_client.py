@@ -0,0 +1,316 @@
+import asyncio
+import re
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+
+import httpx
+
+from ..config import get_settings
+from .rate_limiter import RateLimitScheduler, Priority, get_rate_limit_scheduler
+from .metrics import record_github_request
+from .tracing import get_tracer
+
+class GitHubAPIError(Exception):
+    """Non-success response from the GitHub API"""
+
+    def __init__(self, status_code: int, message: str, response: Optional[httpx.Response] = None):
+        super().__init__(f"GitHub API error {status_code}: {message}")
+        self.status_code = status_code
+        self.message = message
+        self.response = response
+
+class GitHubClient:
+    """
+    Async GitHub REST client shared by the whole process.
+
+    One pooled httpx client is reused for every call (keep-alive, HTTP/2).
+    GET responses are cached by URL with their ETag and revalidated with
+    If-None-Match, so unchanged resources come back as 304s which do not
+    count against the rate limit. The cache is bounded by the total size
+    of the response bodies it holds, least recently used first out. Every
+    request first takes a slot from the rate-limit scheduler in its
+    priority lane.
+    """
+
+    _LAST_PAGE = re.compile(r'[?&]page=(\d+)[^>]*>;\s*rel="last"')
+
+    def __init__(
+        self,
+        token: str,
+        base_url: str = "https://api.github.com",
+        http2: bool = True,
+        max_connections: int = 20,
+        timeout: float = 30.0,
+        etag_cache_bytes: int = 32_000_000,
+        page_concurrency: int = 5,
+        scheduler: Optional[RateLimitScheduler] = None,
+        max_rate_limit_retries: int = 3,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+                "User-Agent": "pr-review-system",
+            },
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+            timeout=timeout,
+            transport=transport
+        )
+        # URL -> (ETag, parsed body, Link header, body size)
+        self._etags: "OrderedDict[str, Tuple[str, Any, str, int]]" = OrderedDict()
+        self._etag_cache_bytes = etag_cache_bytes
+        self._etag_cached_bytes = 0
+        self._page_concurrency = page_concurrency
+        self.scheduler = scheduler or RateLimitScheduler()
+        self.token_key = RateLimitScheduler.token_key(token)
+        self._max_rate_limit_retries = max_rate_limit_retries
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        priority: Priority = Priority.LOW,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Send a request and raise GitHubAPIError on failure.
+
+        Requests rejected for exceeding the rate limit are retried once the
+        scheduler says the budget has reset, rather than failing.
+        """
+        for _ in range(self._max_rate_limit_retries + 1):
+            await self.scheduler.acquire(self.token_key, priority)
+            response = None
+            try:
+                with get_tracer().span("github.request", **{"http.method": method, "http.target": path}):
+                    response = await self._client.request(method, path, **kwargs)
+            finally:
+                rate_limited = self.scheduler.release(self.token_key, response)
+                record_github_request(method, response, priority.name.lower())
+
+            if not rate_limited:
+                break
+
+        self._raise_for_status(response)
+        return response
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        method: str,
+        path: str,
+        priority: Priority = Priority.LOW,
+        **kwargs
+    ) -> AsyncIterator[httpx.Response]:
+        """Like request(), but the body is left unread for the caller to iterate"""
+        attempts = self._max_rate_limit_retries + 1
+        for attempt in range(attempts):
+            await self.scheduler.acquire(self.token_key, priority)
+            response = None
+            try:
+                request = self._client.build_request(method, path, **kwargs)
+                with get_tracer().span("github.request", **{"http.method": method, "http.target": path}):
+                    response = await self._client.send(request, stream=True)
+            finally:
+                rate_limited = self.scheduler.release(self.token_key, response)
+                record_github_request(method, response, priority.name.lower())
+
+            if not rate_limited or attempt == attempts - 1:
+                break
+            # Only a response that is retried is closed unread
+            await response.aclose()
+
+        try:
+            if response.status_code >= 400:
+                await response.aread()
+                self._raise_for_status(response)
+            yield response
+        finally:
+            await response.aclose()
+
+    @staticmethod
+    def _raise_for_status(response: httpx.Response):
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("message", response.text)
+            except ValueError:
+                message = response.text
+            raise GitHubAPIError(response.status_code, message, response)
+
+    async def get_json(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        priority: Priority = Priority.LOW
+    ) -> Any:
+        """GET a resource, revalidating any cached copy with its ETag"""
+        data, _ = await self._get_with_link(path, params, priority)
+        return data
+
+    async def _get_with_link(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        priority: Priority = Priority.LOW
+    ) -> Tuple[Any, str]:
+        """GET a resource and its Link header, which a 304 may not repeat"""
+        key = str(self._client.build_request("GET", path, params=params).url)
+        cached = self._etags.get(key)
+
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        response = await self.request("GET", path, priority, params=params, headers=headers)
+
+        if response.status_code == 304 and cached:
+            self._etags.move_to_end(key)
+            return cached[1], response.headers.get("Link", cached[2])
+
+        data = response.json()
+        link = response.headers.get("Link", "")
+        etag = response.headers.get("ETag")
+        if etag:
+            self._cache_response(key, (etag, data, link, len(response.content)))
+
+        return data, link
+
+    def _cache_response(self, key: str, entry: Tuple[str, Any, str, int]):
+        previous = self._etags.pop(key, None)
+        if previous:
+            self._etag_cached_bytes -= previous[3]
+
+        # A body over a quarter of the budget would evict most of the cache
+        size = entry[3]
+        if size > self._etag_cache_bytes // 4:
+            return
+
+        self._etags[key] = entry
+        self._etag_cached_bytes += size
+        while self._etag_cached_bytes > self._etag_cache_bytes:
+            _, evicted = self._etags.popitem(last=False)
+            self._etag_cached_bytes -= evicted[3]
+
+    async def get_pull(
+        self,
+        repo_full_name: str,
+        pr_number: int,
+        priority: Priority = Priority.LOW
+    ) -> Dict[str, Any]:
+        """Get a pull request"""
+        return await self.get_json(f"/repos/{repo_full_name}/pulls/{pr_number}", priority=priority)
+
+    async def get_pull_files(
+        self,
+        repo_full_name: str,
+        pr_number: int,
+        priority: Priority = Priority.LOW
+    ) -> List[Dict[str, Any]]:
+        """Get every file changed by a pull request"""
+        return await self.get_all_pages(f"/repos/{repo_full_name}/pulls/{pr_number}/files", priority)
+
+    async def stream_pull_diff(
+        self,
+        repo_full_name: str,
+        pr_number: int,
+        priority: Priority = Priority.LOW
+    ) -> AsyncIterator[bytes]:
+        """Raw unified diff of a pull request, yielded as it arrives"""
+        async with self.stream(
+            "GET",
+            f"/repos/{repo_full_name}/pulls/{pr_number}",
+            priority,
+            headers={"Accept": "application/vnd.github.diff"}
+        ) as response:
+            async for chunk in response.aiter_bytes():
+                yield chunk
+
+    async def get_issue_comments(
+        self,
+        repo_full_name: str,
+        pr_number: int,
+        priority: Priority = Priority.LOW
+    ) -> List[Dict[str, Any]]:
+        """Get every comment on a pull request's conversation"""
+        return await self.get_all_pages(f"/repos/{repo_full_name}/issues/{pr_number}/comments", priority)
+
+    async def get_all_pages(self, path: str, priority: Priority = Priority.LOW) -> List[Dict[str, Any]]:
+        """
+        Get every item of a paginated list.
+
+        The first page tells us how many pages there are (Link header);
+        the remaining pages are fetched concurrently and returned in order.
+        """
+        first_page, link = await self._get_with_link(path, {"per_page": 100, "page": 1}, priority)
+
+        match = self._LAST_PAGE.search(link)
+        last_page = int(match.group(1)) if match else 1
+        if last_page <= 1:
+            return first_page
+
+        semaphore = asyncio.Semaphore(self._page_concurrency)
+
+        async def fetch(page: int):
+            async with semaphore:
+                return await self.get_json(path, {"per_page": 100, "page": page}, priority)
+
+        pages = await asyncio.gather(*(fetch(page) for page in range(2, last_page + 1)))
+
+        items = list(first_page)
+        for page in pages:
+            items.extend(page)
+        return items
+
+    async def create_issue_comment(
+        self,
+        repo_full_name: str,
+        pr_number: int,
+        body: str,
+        priority: Priority = Priority.HIGH
+    ) -> Dict[str, Any]:
+        """Post a comment on a pull request's conversation"""
+        response = await self.request(
+            "POST",
+            f"/repos/{repo_full_name}/issues/{pr_number}/comments",
+            priority,
+            json={"body": body}
+        )
+        return response.json()
+
+    async def aclose(self):
+        await self._client.aclose()
+
+_client: Optional[GitHubClient] = None
+
+def get_github_client() -> GitHubClient:
+    """
+    Shared client for this process.
+
+    The underlying connection pool belongs to the event loop that first uses
+    it, so the API and in-process workers share it through the app's loop.
+    """
+    global _client
+    if _client is None:
+        settings = get_settings()
+        _client = GitHubClient(
+            settings.github_token,
+            base_url=settings.github_api_url,
+            http2=settings.github_http2,
+            max_connections=settings.github_max_connections,
+            timeout=settings.github_timeout,
+            etag_cache_bytes=settings.github_etag_cache_bytes,
+            page_concurrency=settings.github_page_concurrency,
+            scheduler=get_rate_limit_scheduler()
+        )
+    return _client
+
+async def close_github_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -1,41 +1,37 @@
-from github import Github
+from typing import Optional, Dict, Any, List
 
-from typing import Optional
+from .github_client import GitHubClient, get_github_client
+from .rate_limiter import Priority
 
 class GitHubService:
-    
-    def __init__(self, token: str):
-        self.github = Github(token)
-    
-    def post_review_comment(
-        self, 
-        repo_full_name: str, 
-        pr_number: int, 
+
+    def __init__(self, github: Optional[GitHubClient] = None):
+        self.github = github or get_github_client()
+
+    async def post_review_comment(
+        self,
+        repo_full_name: str,
+        pr_number: int,
         comment_body: str,
         commit_sha: str
-    ) -> bool:
-        """Post a review comment to a PR"""
-        try:
-            repo = self.github.get_repo(repo_full_name)
-            pr = repo.get_pull(pr_number)  
-            
-            # Post as a review comment
-            pr.create_issue_comment(comment_body)
-            
-            return True
-        except Exception as e:
-            print(f"Error posting comment: {e}")
-            return False
-    
-    def get_pr_info(self, repo_full_name: str, pr_number: int):
+    ) -> Dict[str, Any]:
+        """
+        Post a review comment to a PR.
+
+        Instructor posts use the high-priority lane, so they are delayed only
+        when the token's budget is fully spent. Errors are raised to the caller.
+        """
+        return await self.github.create_issue_comment(
+            repo_full_name,
+            pr_number,
+            comment_body,
+            priority=Priority.HIGH
+        )
+
+    async def get_pr_comments(self, repo_full_name: str, pr_number: int) -> List[Dict[str, Any]]:
+        """Get the comments on a PR's conversation"""
+        return await self.github.get_issue_comments(repo_full_name, pr_number, priority=Priority.HIGH)
+
+    async def get_pr_info(self, repo_full_name: str, pr_number: int) -> Dict[str, Any]:
         """Get PR information"""
-        repo = self.github.get_repo(repo_full_name)
-        pr = repo.get_pull(pr_number)  
-        return pr
-
-
-
-
-
-
-
+        return await self.github.get_pull(repo_full_name, pr_number)
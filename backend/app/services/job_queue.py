@@ -0,0 +1,211 @@
+from datetime import timedelta
+from typing import Dict, Any, Optional, Sequence
+from sqlalchemy import or_, and_, func
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..models import BackgroundJob, JobStatus, utcnow
+
+# Job kinds
+ANALYZE_PR = "analyze_pr"
+POST_REVIEW = "post_review"
+POST_REVIEWS = "post_reviews"  # Batch of approved reviews in one repository
+POSTING_KINDS = (POST_REVIEW, POST_REVIEWS)
+
+UNFINISHED_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING)
+FINISHED_STATUSES = (JobStatus.DONE, JobStatus.DEAD, JobStatus.SUPERSEDED)
+
+class JobSuperseded(Exception):
+    """Raised inside a handler when its job was replaced by a newer one"""
+    pass
+
+def pr_coalesce_key(repo_full_name: str, pr_number: int) -> str:
+    """Coalesce key shared by all review jobs of one pull request"""
+    return f"{repo_full_name}#{pr_number}"
+
+class ClaimedJob:
+    """Plain snapshot of a job handed to a worker, safe to use outside the session"""
+
+    def __init__(self, job: BackgroundJob):
+        self.id = job.id
+        self.kind = job.kind
+        self.payload = dict(job.payload)
+        self.attempts = job.attempts
+        self.max_attempts = job.max_attempts
+        self.locked_by = job.locked_by
+
+class JobQueue:
+    """Durable job queue stored in the application database"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.settings = get_settings()
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        delay: float = 0,
+        coalesce_key: Optional[str] = None,
+        commit: bool = True,
+        delivery_id: Optional[str] = None
+    ) -> BackgroundJob:
+        """
+        Add a job to the queue.
+
+        When a coalesce key is given, queued and running jobs with the same
+        key are marked superseded: queued ones are never started and running
+        ones stop at their next checkpoint. A delivery id that queued a job
+        before makes the flush fail with IntegrityError.
+        """
+        if coalesce_key:
+            self.db.query(BackgroundJob).filter(
+                BackgroundJob.coalesce_key == coalesce_key,
+                BackgroundJob.status.in_(UNFINISHED_STATUSES)
+            ).update({
+                BackgroundJob.status: JobStatus.SUPERSEDED,
+                BackgroundJob.finished_at: utcnow()
+            }, synchronize_session=False)
+
+        job = BackgroundJob(
+            kind=kind,
+            payload=payload,
+            coalesce_key=coalesce_key,
+            delivery_id=delivery_id,
+            status=JobStatus.QUEUED,
+            attempts=0,
+            max_attempts=self.settings.job_max_attempts,
+            run_after=utcnow() + timedelta(seconds=delay)
+        )
+        self.db.add(job)
+
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
+
+        return job
+
+    def claim(self, worker_id: str, kinds: Optional[Sequence[str]] = None) -> Optional[ClaimedJob]:
+        """
+        Lock the next runnable job for a worker, of the given kinds if any.
+
+        Running jobs whose lease expired (worker crashed mid-job) are
+        picked up again, and count as a new attempt. A worker keeps the
+        lease of a long job with renew().
+        """
+        now = utcnow()
+        stale_before = now - timedelta(seconds=self.settings.job_lock_timeout)
+
+        query = self.db.query(BackgroundJob)
+        if kinds:
+            query = query.filter(BackgroundJob.kind.in_(kinds))
+
+        job = query.filter(
+            or_(
+                and_(
+                    BackgroundJob.status == JobStatus.QUEUED,
+                    BackgroundJob.run_after <= now
+                ),
+                and_(
+                    BackgroundJob.status == JobStatus.RUNNING,
+                    BackgroundJob.locked_at < stale_before
+                )
+            )
+        ).order_by(
+            BackgroundJob.run_after, BackgroundJob.id
+        ).with_for_update(skip_locked=True).first()
+
+        if not job:
+            self.db.rollback()
+            return None
+
+        job.status = JobStatus.RUNNING
+        job.attempts += 1
+        job.locked_by = worker_id
+        job.locked_at = now
+
+        claimed = ClaimedJob(job)
+        self.db.commit()
+        return claimed
+
+    def renew(self, job_id: int, worker_id: str) -> bool:
+        """Extend the lease of a running job; False once the worker no longer holds it"""
+        renewed = self.db.query(BackgroundJob).filter(
+            BackgroundJob.id == job_id,
+            BackgroundJob.status == JobStatus.RUNNING,
+            BackgroundJob.locked_by == worker_id
+        ).update({BackgroundJob.locked_at: utcnow()}, synchronize_session=False)
+        self.db.commit()
+        return renewed > 0
+
+    def ensure_current(self, job_id: int):
+        """Raise JobSuperseded if the job has been replaced by a newer one"""
+        status = self.db.query(BackgroundJob.status).filter(
+            BackgroundJob.id == job_id
+        ).scalar()
+
+        if status == JobStatus.SUPERSEDED:
+            raise JobSuperseded(f"Job {job_id} was superseded")
+
+    def complete(self, job_id: int):
+        """Mark a job as done"""
+        job = self.db.get(BackgroundJob, job_id)
+        if job and job.status == JobStatus.RUNNING:
+            job.status = JobStatus.DONE
+            job.locked_by = None
+            job.locked_at = None
+            job.finished_at = utcnow()
+            self.db.commit()
+
+    def fail(self, job_id: int, error: str) -> Optional[JobStatus]:
+        """Schedule a retry with exponential backoff, or dead-letter the job"""
+        job = self.db.get(BackgroundJob, job_id)
+        if not job or job.status != JobStatus.RUNNING:
+            return job.status if job else None
+
+        job.last_error = error
+        job.locked_by = None
+        job.locked_at = None
+
+        if job.attempts >= job.max_attempts:
+            job.status = JobStatus.DEAD
+            job.finished_at = utcnow()
+        else:
+            delay = min(
+                self.settings.job_retry_backoff * (2 ** (job.attempts - 1)),
+                self.settings.job_retry_max_delay
+            )
+            job.status = JobStatus.QUEUED
+            job.run_after = utcnow() + timedelta(seconds=delay)
+
+        self.db.commit()
+        return job.status
+
+    def depth(self) -> Dict[str, int]:
+        """Number of queued and running jobs; finished ones are not counted"""
+        rows = self.db.query(
+            BackgroundJob.status, func.count(BackgroundJob.id)
+        ).filter(
+            BackgroundJob.status.in_(UNFINISHED_STATUSES)
+        ).group_by(BackgroundJob.status).all()
+
+        counts = {status.value: 0 for status in UNFINISHED_STATUSES}
+        for status, count in rows:
+            counts[status.value] = count
+        return counts
+
+    def prune(self) -> int:
+        """
+        Delete jobs finished more than job_retention_hours ago.
+
+        Their delivery ids go with them, so the retention must cover the
+        redeliveries to catch; GitHub redelivers for up to three days.
+        """
+        cutoff = utcnow() - timedelta(hours=self.settings.job_retention_hours)
+        deleted = self.db.query(BackgroundJob).filter(
+            BackgroundJob.status.in_(FINISHED_STATUSES),
+            BackgroundJob.finished_at < cutoff
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return deleted
@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import Optional, Sequence
+
+from ..config import get_settings
+from ..database import SessionLocal
+from ..models import JobStatus
+from .job_queue import JobQueue, ClaimedJob, JobSuperseded, ANALYZE_PR, POST_REVIEW, POST_REVIEWS, POSTING_KINDS
+from .review_processor import ReviewProcessor
+from .review_poster import ReviewPoster
+from .review_archive import archive_expired_reviews
+from .metrics import JOB_SECONDS, JOB_DB_QUERIES, JOB_DB_SECONDS, track_queries
+from .tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+class JobWorker:
+    """
+    Pool of workers that take jobs off the queue and run them.
+
+    Each worker slot is an asyncio task. GitHub calls go through the shared
+    async client and blocking database work runs in threads, so the event
+    loop stays responsive when the pool is started inside the API process.
+
+    Posting slots only take posting jobs. Analysis jobs wait in the rate
+    limiter's low-priority lane when the budget runs low and can hold
+    every general slot; approved reviews are still posted meanwhile.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, poll_interval: Optional[float] = None):
+        settings = get_settings()
+        self.settings = settings
+        self.concurrency = concurrency or settings.worker_concurrency
+        self.post_slots = settings.worker_post_slots
+        self.poll_interval = poll_interval or settings.worker_poll_interval
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+
+        self.handlers = {
+            ANALYZE_PR: self._handle_analyze_pr,
+            POST_REVIEW: self._handle_post_review,
+            POST_REVIEWS: self._handle_post_reviews,
+        }
+        # Called once a job of that kind has exhausted its retries
+        self.dead_letter_handlers = {
+            POST_REVIEW: self._post_review_failed,
+            POST_REVIEWS: self._post_reviews_failed,
+        }
+
+        self._tasks = []
+        self._stopping = False
+
+    async def start(self):
+        """Start the worker slots in the running event loop"""
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(self._run(f"{self.name}:{slot}"))
+            for slot in range(self.concurrency)
+        ]
+        self._tasks += [
+            asyncio.create_task(self._run(f"{self.name}:post{slot}", POSTING_KINDS))
+            for slot in range(self.post_slots)
+        ]
+        self._tasks.append(asyncio.create_task(
+            self._run_periodically(self._prune_jobs, self.settings.job_prune_interval, "prune jobs")
+        ))
+        if self.settings.review_retention_days > 0:
+            self._tasks.append(asyncio.create_task(
+                self._run_periodically(archive_expired_reviews, self.settings.review_archive_interval, "archive reviews")
+            ))
+        logger.info("Started %d job workers and %d posting workers", self.concurrency, self.post_slots)
+
+    async def stop(self, timeout: float = 30.0):
+        """Stop taking new jobs and wait for running ones to finish"""
+        self._stopping = True
+        if not self._tasks:
+            return
+
+        done, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        self._tasks = []
+
+    async def run_forever(self):
+        """Run until cancelled (used by the standalone worker entry point)"""
+        await self.start()
+        try:
+            await asyncio.gather(*self._tasks)
+        finally:
+            await self.stop()
+
+    async def _run(self, worker_id: str, kinds: Optional[Sequence[str]] = None):
+        while not self._stopping:
+            try:
+                job = await asyncio.to_thread(self._claim, worker_id, kinds)
+            except Exception:
+                logger.exception("Failed to claim job")
+                job = None
+
+            if job is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            try:
+                await self._execute(job)
+            except Exception:
+                # The job stays running and is reclaimed once its lease expires
+                logger.exception("Failed to run job %s (%s)", job.id, job.kind)
+
+    async def _run_periodically(self, task, interval: float, description: str):
+        """Run blocking housekeeping (archiving reviews, pruning jobs) every interval seconds"""
+        while not self._stopping:
+            try:
+                await asyncio.to_thread(task)
+            except Exception:
+                logger.exception("Failed to %s", description)
+
+            next_run = time.monotonic() + interval
+            while not self._stopping and time.monotonic() < next_run:
+                await asyncio.sleep(self.poll_interval)
+
+    async def _execute(self, job: ClaimedJob):
+        started = time.perf_counter()
+        heartbeat = asyncio.create_task(self._renew_lease(job))
+        outcome = "error"
+        with track_queries() as queries:
+            try:
+                with get_tracer().span(f"job.{job.kind}", **{"job.id": job.id, "job.attempt": job.attempts}):
+                    outcome = await self._run_handler(job)
+            finally:
+                heartbeat.cancel()
+                JOB_SECONDS.labels(job.kind, outcome).observe(time.perf_counter() - started)
+                JOB_DB_QUERIES.labels(job.kind).observe(queries.count)
+                JOB_DB_SECONDS.labels(job.kind).observe(queries.seconds)
+
+    async def _renew_lease(self, job: ClaimedJob):
+        """Keep a running job's lease fresh so it is not reclaimed while it makes progress"""
+        interval = self.settings.job_lock_timeout / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                held = await asyncio.to_thread(self._renew, job.id, job.locked_by)
+            except Exception:
+                logger.exception("Failed to renew the lease of job %s", job.id)
+                continue
+            if not held:
+                logger.warning("Job %s (%s) lost its lease", job.id, job.kind)
+                return
+
+    async def _run_handler(self, job: ClaimedJob) -> str:
+        """Run a job's handler and record the result in the queue; returns the outcome"""
+        handler = self.handlers.get(job.kind)
+
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown job kind: {job.kind}")
+            await handler(job)
+        except JobSuperseded:
+            logger.info("Job %s (%s) superseded by a newer job", job.id, job.kind)
+            return "superseded"
+        except Exception as e:
+            status = await asyncio.to_thread(self._fail, job.id, repr(e))
+            if status == JobStatus.DEAD:
+                logger.error("Job %s (%s) dead-lettered after %d attempts: %r", job.id, job.kind, job.attempts, e)
+                on_dead = self.dead_letter_handlers.get(job.kind)
+                if on_dead:
+                    await asyncio.to_thread(on_dead, job)
+                return "dead"
+            logger.warning("Job %s (%s) failed on attempt %d, will retry: %r", job.id, job.kind, job.attempts, e)
+            return "retry"
+        else:
+            await asyncio.to_thread(self._complete, job.id)
+            return "done"
+
+    # Queue operations, each on its own short-lived session
+
+    def _claim(self, worker_id: str, kinds: Optional[Sequence[str]] = None) -> Optional[ClaimedJob]:
+        with SessionLocal() as db:
+            return JobQueue(db).claim(worker_id, kinds)
+
+    def _renew(self, job_id: int, worker_id: str) -> bool:
+        with SessionLocal() as db:
+            return JobQueue(db).renew(job_id, worker_id)
+
+    def _prune_jobs(self):
+        with SessionLocal() as db:
+            deleted = JobQueue(db).prune()
+        if deleted:
+            logger.info("Pruned %d finished jobs", deleted)
+
+    def _complete(self, job_id: int):
+        with SessionLocal() as db:
+            JobQueue(db).complete(job_id)
+
+    def _fail(self, job_id: int, error: str) -> Optional[JobStatus]:
+        with SessionLocal() as db:
+            return JobQueue(db).fail(job_id, error)
+
+    # Job handlers
+
+    async def _handle_analyze_pr(self, job: ClaimedJob):
+        with SessionLocal() as db:
+            await ReviewProcessor(db).process(job.payload, job_id=job.id)
+
+    async def _handle_post_review(self, job: ClaimedJob):
+        with SessionLocal() as db:
+            await ReviewPoster(db).post(
+                job.payload["review_id"], attempt=job.attempts, reposted_ids=job.payload.get("reposted_ids", ())
+            )
+
+    def _post_review_failed(self, job: ClaimedJob):
+        with SessionLocal() as db:
+            ReviewPoster(db).mark_failed([job.payload["review_id"]])
+
+    async def _handle_post_reviews(self, job: ClaimedJob):
+        with SessionLocal() as db:
+            await ReviewPoster(db).post_many(
+                job.payload["review_ids"], attempt=job.attempts, reposted_ids=job.payload.get("reposted_ids", ())
+            )
+
+    def _post_reviews_failed(self, job: ClaimedJob):
+        with SessionLocal() as db:
+            ReviewPoster(db).mark_failed(job.payload["review_ids"])
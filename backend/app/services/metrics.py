@@ -0,0 +1,225 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, TYPE_CHECKING
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, REGISTRY
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .tracing import get_tracer
+
+if TYPE_CHECKING:
+    import httpx
+
+# Stage timings of the webhook handler and the analyze_pr job
+STAGE_SECONDS = Histogram(
+    "pr_review_stage_seconds",
+    "Time spent in each stage of the review pipeline",
+    ["pipeline", "stage"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "pr_review_http_request_seconds",
+    "API request duration by route handler",
+    ["method", "handler", "status"]
+)
+DB_QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+HTTP_DB_QUERIES = Histogram(
+    "pr_review_http_db_queries",
+    "Database queries per API request",
+    ["handler"],
+    buckets=DB_QUERY_BUCKETS
+)
+HTTP_DB_SECONDS = Histogram(
+    "pr_review_http_db_seconds",
+    "Time spent in database queries per API request",
+    ["handler"]
+)
+
+JOB_SECONDS = Histogram(
+    "pr_review_job_seconds",
+    "Background job duration by kind and outcome",
+    ["kind", "outcome"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+)
+JOB_DB_QUERIES = Histogram(
+    "pr_review_job_db_queries",
+    "Database queries per background job",
+    ["kind"],
+    buckets=DB_QUERY_BUCKETS
+)
+JOB_DB_SECONDS = Histogram(
+    "pr_review_job_db_seconds",
+    "Time spent in database queries per background job",
+    ["kind"]
+)
+JOB_QUEUE_DEPTH = Gauge(
+    "pr_review_job_queue_jobs",
+    "Jobs in the background queue by status, as of the last scrape",
+    ["status"]
+)
+
+DB_QUERY_SECONDS = Histogram(
+    "pr_review_db_query_seconds",
+    "Duration of each database query",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+)
+
+GITHUB_REQUESTS = Counter(
+    "pr_review_github_requests",
+    "GitHub API calls by method, response status and priority lane",
+    ["method", "status", "priority"]
+)
+
+class QueryStats:
+    """Queries run on behalf of one API request or job"""
+
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+@contextmanager
+def track_queries():
+    """Count the queries of everything run in this context, threads started from it included"""
+    stats = QueryStats()
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started"] = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("query_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    DB_QUERY_SECONDS.observe(elapsed)
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+
+@contextmanager
+def stage(pipeline: str, name: str, **attributes):
+    """Time a pipeline stage into STAGE_SECONDS, and as a span when tracing is on"""
+    start = time.perf_counter()
+    try:
+        with get_tracer().span(f"{pipeline}.{name}", **attributes):
+            yield
+    finally:
+        STAGE_SECONDS.labels(pipeline, name).observe(time.perf_counter() - start)
+
+def observe_stage(pipeline: str, name: str, seconds: float):
+    """Record a stage timed by the caller, for stages that interleave with others"""
+    STAGE_SECONDS.labels(pipeline, name).observe(seconds)
+
+def record_github_request(method: str, response: Optional["httpx.Response"], priority: str):
+    GITHUB_REQUESTS.labels(method, str(response.status_code) if response is not None else "error", priority).inc()
+
+class MetricsMiddleware:
+    """
+    Times every API request and counts its database queries, labelled by
+    the route handler's name so path parameters do not multiply series.
+    Long-lived streams and the scrape itself are left out.
+    """
+
+    untimed_paths = ("/metrics", "/api/reviews/events")
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.untimed_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        with track_queries() as queries:
+            try:
+                with get_tracer().span(f"{scope['method']} {scope['path']}", **{"http.method": scope["method"]}) as span:
+                    await self.app(scope, receive, send_with_status)
+                    if span is not None:
+                        span.set_attribute("http.status_code", status)
+            finally:
+                # The router stores the matched endpoint in the scope
+                handler = getattr(scope.get("endpoint"), "__name__", "unmatched")
+                HTTP_REQUEST_SECONDS.labels(scope["method"], handler, str(status)).observe(time.perf_counter() - start)
+                HTTP_DB_QUERIES.labels(handler).observe(queries.count)
+                HTTP_DB_SECONDS.labels(handler).observe(queries.seconds)
+
+class _RuntimeCollector:
+    """Reads in-process state when scraped: rate-limit budgets, analysis cache and DB pools"""
+
+    def describe(self):
+        # Nothing to check against other collectors, and collect() must not
+        # run at registration
+        return []
+
+    def collect(self):
+        # Imported here: the database module needs settings, which are not
+        # required just to time a stage
+        from ..database import active_engines, pool_status
+        from .rate_limiter import get_rate_limit_scheduler
+        from .analysis_cache import cache_stats
+
+        remaining = GaugeMetricFamily(
+            "pr_review_github_rate_limit_remaining",
+            "Requests left in the current GitHub rate-limit window",
+            labels=["token"]
+        )
+        limit = GaugeMetricFamily(
+            "pr_review_github_rate_limit_limit",
+            "GitHub rate limit per window",
+            labels=["token"]
+        )
+        for key, budget in get_rate_limit_scheduler().snapshot()["tokens"].items():
+            if budget["remaining"] is not None:
+                remaining.add_metric([key], budget["remaining"])
+            if budget["limit"] is not None:
+                limit.add_metric([key], budget["limit"])
+        yield remaining
+        yield limit
+
+        cache = cache_stats.snapshot()
+        lookups = CounterMetricFamily(
+            "pr_review_analysis_cache_lookups",
+            "Analysis cache lookups by result",
+            labels=["result"]
+        )
+        lookups.add_metric(["hit"], cache["hits"])
+        lookups.add_metric(["miss"], cache["misses"])
+        yield lookups
+
+        connections = GaugeMetricFamily(
+            "pr_review_db_pool_connections",
+            "Database pool connections by state",
+            labels=["engine", "state"]
+        )
+        for name, db_engine in active_engines().items():
+            status = pool_status(db_engine)
+            for state in ("checked_out", "idle", "overflow"):
+                if state in status:
+                    connections.add_metric([name, state], status[state])
+        yield connections
+
+REGISTRY.register(_RuntimeCollector())
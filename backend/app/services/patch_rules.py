@@ -0,0 +1,185 @@
+import hashlib
+import re
+from typing import Dict, Any, List, Optional, Sequence
+
+class PatchRule:
+    """
+    A check run against the lines a PR adds.
+
+    Rules declare literal keywords rather than free-form regexes so every
+    rule can share one keyword index. The rule fires when any of its
+    keywords appears on an added line, unless one of its `unless` keywords
+    also appears on an added line of the same file. It is reported once per
+    file, at the first matching line.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        category: str,
+        severity: str,
+        message: str,
+        keywords: Sequence[str],
+        unless: Sequence[str] = (),
+        ignore_case: bool = False,
+        whole_word: bool = False
+    ):
+        self.name = name
+        self.category = category
+        self.severity = severity
+        self.message = message
+        self.keywords = list(keywords)
+        self.unless = list(unless)
+        self.ignore_case = ignore_case
+        self.whole_word = whole_word
+
+    def signature(self) -> str:
+        return repr((
+            self.name, self.category, self.severity, self.message,
+            self.keywords, self.unless, self.ignore_case, self.whole_word
+        ))
+
+DEFAULT_PATCH_RULES = [
+    PatchRule(
+        name="console_log",
+        category="Code Quality",
+        severity="warning",
+        message="Found console.log statement. Remove debug code before merging.",
+        keywords=["console.log"]
+    ),
+    PatchRule(
+        name="todo_comment",
+        category="Code Quality",
+        severity="info",
+        message="Found TODO/FIXME comment. Consider addressing before merge.",
+        keywords=["TODO", "FIXME"]
+    ),
+    PatchRule(
+        name="unhandled_try",
+        category="Error Handling",
+        severity="error",
+        message="Try block without proper error handling.",
+        keywords=["try"],
+        unless=["except", "catch"],
+        ignore_case=True,
+        whole_word=True
+    ),
+]
+
+class PatchAnalyzer:
+    """
+    Runs every patch rule in one scan per distinct keyword.
+
+    Rules are compiled into a keyword index (keyword -> rules waiting on
+    it). Each keyword is located with str.find, which is much faster in
+    CPython than a combined regex or a pure-Python Aho-Corasick automaton,
+    and a keyword stops being searched as soon as every rule waiting on it
+    is decided. Case-insensitive keywords share a single lowercased copy of
+    the patch. Hits are kept only on added ("+") lines; line numbers are
+    derived from the hunk headers and refer to the new file.
+    """
+
+    _HUNK_HEADER = re.compile(r"@@ -\d+(?:,\d+)? \+(\d+)(?:,\d+)? @@")
+
+    def __init__(self, rules: Sequence[PatchRule]):
+        self.rules = list(rules)
+        self.version = hashlib.sha1(
+            "\n".join(rule.signature() for rule in self.rules).encode()
+        ).hexdigest()[:12]
+
+        # (keyword, ignore_case, whole_word) -> [(rule index, is an "unless" keyword)]
+        self._index: Dict[tuple, List[tuple]] = {}
+        for index, rule in enumerate(self.rules):
+            for is_unless, keywords in ((False, rule.keywords), (True, rule.unless)):
+                for keyword in keywords:
+                    if rule.ignore_case:
+                        keyword = keyword.lower()
+                    key = (keyword, rule.ignore_case, rule.whole_word)
+                    self._index.setdefault(key, []).append((index, is_unless))
+
+        self._word_regexes = {
+            key: re.compile(r"\b" + re.escape(key[0]) + r"\b")
+            for key in self._index if key[2]
+        }
+        self._needs_lowercase = any(rule.ignore_case for rule in self.rules)
+
+    def analyze(self, filename: str, patch: Optional[str]) -> List[Dict[str, Any]]:
+        """Feedback items for one file's patch, in rule order"""
+        if not patch or not self._index:
+            return []
+
+        lowered = patch.lower() if self._needs_lowercase else None
+        first_line: Dict[int, int] = {}
+        suppressed = set()
+
+        for key, targets in self._index.items():
+            keyword, ignore_case, whole_word = key
+            text = lowered if ignore_case else patch
+            word_regex = self._word_regexes.get(key)
+
+            position = text.find(keyword)
+            while position != -1:
+                pending = [
+                    (index, is_unless) for index, is_unless in targets
+                    if index not in suppressed and (is_unless or index not in first_line)
+                ]
+                if not pending:
+                    break
+
+                line_start = text.rfind("\n", 0, position) + 1
+                if text.startswith("+", line_start) and (
+                    word_regex is None or word_regex.match(text, position)
+                ):
+                    for index, is_unless in pending:
+                        if is_unless:
+                            suppressed.add(index)
+                        else:
+                            first_line[index] = self._line_number(patch, line_start)
+
+                position = text.find(keyword, position + 1)
+
+        items = []
+        for index, rule in enumerate(self.rules):
+            if index in first_line and index not in suppressed:
+                items.append({
+                    "category": rule.category,
+                    "severity": rule.severity,
+                    "message": rule.message,
+                    "line_number": first_line[index],
+                    "file_path": filename
+                })
+        return items
+
+    def _line_number(self, patch: str, line_start: int) -> int:
+        """New-file line number of the added line starting at line_start"""
+        # Hunk headers are the only lines starting with "@@"; content lines
+        # always start with "+", "-", " " or "\\"
+        header_start = patch.rfind("\n@@", 0, line_start) + 1
+        header = self._HUNK_HEADER.match(patch, header_start)
+        if header:
+            first_line = int(header.group(1))
+            body_start = patch.find("\n", header_start) + 1
+        else:
+            first_line, body_start = 1, 0
+
+        # Every line between the hunk header and this one advances the new
+        # file, except removed lines and "\\ No newline" markers
+        preceding = "\n" + patch[body_start:line_start]
+        lines = preceding.count("\n") - 1
+        return first_line + lines - preceding.count("\n-") - preceding.count("\n\\")
+
+_rules: List[PatchRule] = list(DEFAULT_PATCH_RULES)
+_analyzer: Optional[PatchAnalyzer] = None
+
+def register_patch_rule(rule: PatchRule):
+    """Add a rule to the shared analyzer (recompiled on next use)"""
+    global _analyzer
+    _rules.append(rule)
+    _analyzer = None
+
+def get_patch_analyzer() -> PatchAnalyzer:
+    """Shared analyzer compiled from the registered rules"""
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = PatchAnalyzer(_rules)
+    return _analyzer
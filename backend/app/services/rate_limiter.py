@@ -0,0 +1,153 @@
+import asyncio
+import enum
+import hashlib
+import time
+from typing import Dict, Any, Optional, TYPE_CHECKING
+
+from ..config import get_settings
+
+if TYPE_CHECKING:
+    import httpx
+
+class Priority(enum.IntEnum):
+    HIGH = 0  # Instructor-triggered work, e.g. posting an approved review
+    LOW = 1   # Bulk webhook analyses
+
+class TokenBudget:
+    """Last known GitHub rate limit for one token"""
+
+    def __init__(self):
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None  # epoch seconds
+        self.in_flight = 0
+
+    def available(self, now: float) -> Optional[int]:
+        """Requests we may still send before the reset, None if unknown"""
+        if self.remaining is None:
+            return None
+        if self.reset_at is not None and now >= self.reset_at:
+            # Window rolled over; trust the old limit until GitHub tells us otherwise
+            self.remaining = self.limit if self.limit is not None else None
+            self.reset_at = None
+            if self.remaining is None:
+                return None
+        return self.remaining - self.in_flight
+
+class RateLimitScheduler:
+    """
+    Shares GitHub's per-token request budget between priority lanes.
+
+    Budgets are updated from the X-RateLimit-* headers of every response.
+    Low-priority requests leave a reserve for high-priority ones and wait
+    for the window to reset instead of failing; high-priority requests also
+    go first whenever both lanes are waiting.
+    """
+
+    def __init__(self, low_priority_reserve: int = 500, poll_interval: float = 1.0):
+        self.low_priority_reserve = low_priority_reserve
+        self.poll_interval = poll_interval
+        self._budgets: Dict[str, TokenBudget] = {}
+        self._waiting = {priority: 0 for priority in Priority}
+
+    @staticmethod
+    def token_key(token: str) -> str:
+        """Stable identifier for a token that is safe to expose"""
+        return hashlib.sha256(token.encode()).hexdigest()[:12]
+
+    def _budget(self, key: str) -> TokenBudget:
+        if key not in self._budgets:
+            self._budgets[key] = TokenBudget()
+        return self._budgets[key]
+
+    def _can_send(self, budget: TokenBudget, priority: Priority, now: float) -> bool:
+        available = budget.available(now)
+
+        if priority == Priority.LOW and self._waiting[Priority.HIGH] > 0:
+            return False
+        if available is None:
+            return True
+        if priority == Priority.LOW:
+            return available > self.low_priority_reserve
+        return available > 0
+
+    def _wait_time(self, budget: TokenBudget, now: float) -> float:
+        if budget.reset_at is None:
+            return self.poll_interval
+        return max(min(budget.reset_at - now, self.poll_interval), 0.01)
+
+    async def acquire(self, key: str, priority: Priority = Priority.LOW):
+        """Wait until a request may be sent with this token"""
+        budget = self._budget(key)
+
+        if not self._can_send(budget, priority, time.time()):
+            self._waiting[priority] += 1
+            try:
+                while not self._can_send(budget, priority, time.time()):
+                    await asyncio.sleep(self._wait_time(budget, time.time()))
+            finally:
+                self._waiting[priority] -= 1
+
+        budget.in_flight += 1
+
+    def release(self, key: str, response: Optional["httpx.Response"] = None) -> bool:
+        """
+        Record the outcome of a request sent after acquire().
+
+        Returns True if GitHub rejected it for exceeding the rate limit, in
+        which case the budget is exhausted until the reset time.
+        """
+        budget = self._budget(key)
+        budget.in_flight = max(budget.in_flight - 1, 0)
+
+        if response is None:
+            return False
+
+        headers = response.headers
+        if "X-RateLimit-Remaining" in headers:
+            budget.remaining = int(headers["X-RateLimit-Remaining"])
+        if "X-RateLimit-Limit" in headers:
+            budget.limit = int(headers["X-RateLimit-Limit"])
+        if "X-RateLimit-Reset" in headers:
+            budget.reset_at = float(headers["X-RateLimit-Reset"])
+
+        rate_limited = response.status_code in (403, 429) and (
+            budget.remaining == 0 or "Retry-After" in headers
+        )
+        if rate_limited and "Retry-After" in headers:
+            # Secondary rate limit: pause this token for the given time
+            budget.remaining = 0
+            budget.reset_at = time.time() + float(headers["Retry-After"])
+
+        return rate_limited
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Budget state and queue depth for monitoring"""
+        now = time.time()
+        tokens = {}
+        for key, budget in self._budgets.items():
+            tokens[key] = {
+                "limit": budget.limit,
+                "remaining": budget.remaining,
+                "in_flight": budget.in_flight,
+                "reset_at": budget.reset_at,
+                "seconds_until_reset": max(budget.reset_at - now, 0) if budget.reset_at else None,
+            }
+
+        return {
+            "low_priority_reserve": self.low_priority_reserve,
+            "tokens": tokens,
+            "waiting": {priority.name.lower(): count for priority, count in self._waiting.items()},
+        }
+
+_scheduler: Optional[RateLimitScheduler] = None
+
+def get_rate_limit_scheduler() -> RateLimitScheduler:
+    """Process-wide scheduler shared by every GitHub client"""
+    global _scheduler
+    if _scheduler is None:
+        settings = get_settings()
+        _scheduler = RateLimitScheduler(
+            low_priority_reserve=settings.github_low_priority_reserve
+        )
+    return _scheduler
@@ -0,0 +1,229 @@
+"""
+Move old reviews out of pr_reviews into compressed archive files.
+
+Reviews in a final status (posted, rejected, superseded) created more
+than REVIEW_RETENTION_DAYS ago are written to gzip'd NDJSON files under
+REVIEW_ARCHIVE_DIR, one file per month of creation, and deleted from
+pr_reviews. Listings, filters and stats queries then only scan recent
+reviews; an archived review is still served by GET /api/reviews/{id}
+through the archived_reviews index.
+
+Reviews are appended in gzip members of MEMBER_SIZE, and the index
+records where each member starts, so fetching a review decompresses at
+most MEMBER_SIZE reviews. The worker runs this every REVIEW_ARCHIVE_INTERVAL
+seconds when retention is set; run it by hand with
+`python -m app.services.review_archive [--days N]`.
+"""
+import argparse
+import fcntl
+import logging
+import os
+import zlib
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterator, List, Optional
+
+import orjson
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..database import SessionLocal
+from ..models import PRReview, ReviewStatus, RuleSnapshot, FeedbackTemplate, ReviewFeedbackEntry, ArchivedReview, utcnow
+from ..schemas import PRReviewResponse
+
+ARCHIVED_STATUSES = (ReviewStatus.POSTED, ReviewStatus.REJECTED, ReviewStatus.SUPERSEDED)
+
+# Reviews per gzip member: what one archived fetch decompresses at most
+MEMBER_SIZE = 100
+# Reviews moved per transaction
+BATCH_SIZE = 1000
+
+# Stored as the detail endpoint returns them
+ARCHIVED_FIELDS = [name for name in PRReviewResponse.model_fields if name != "feedback_total"]
+STORED_CONTENT_FIELDS = ("review_feedback", "expectations_applied")
+
+# What a batch is read from: the plain fields, plus what the stored
+# feedback and expectations are looked up with
+REVIEW_COLUMNS = [getattr(PRReview, name) for name in ARCHIVED_FIELDS if name not in STORED_CONTENT_FIELDS] + [
+    PRReview.version, PRReview.feedback_hash, PRReview.rule_snapshot_hash,
+    PRReview.legacy_review_feedback, PRReview.legacy_expectations_applied
+]
+
+logger = logging.getLogger(__name__)
+
+def archive_file_name(created_at: datetime) -> str:
+    return f"reviews-{created_at:%Y-%m}.ndjson.gz"
+
+@contextmanager
+def _archive_lock(directory: str) -> Iterator[bool]:
+    """Exclusive lock on the archive directory; yields False if another run holds it"""
+    with open(os.path.join(directory, ".lock"), "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+class ReviewArchiver:
+    def __init__(self, db: Session, directory: Optional[str] = None):
+        self.db = db
+        self.directory = directory or get_settings().review_archive_dir
+
+    def archive(self, created_before: datetime) -> int:
+        """Archive every review in a final status created before the cutoff; returns how many"""
+        os.makedirs(self.directory, exist_ok=True)
+        archived = 0
+        with _archive_lock(self.directory) as locked:
+            if not locked:
+                logger.info("Another archive run is in progress")
+                return 0
+            while True:
+                rows = self.db.execute(select(*REVIEW_COLUMNS).where(
+                    PRReview.status.in_(ARCHIVED_STATUSES),
+                    PRReview.created_at < created_before
+                ).order_by(PRReview.created_at, PRReview.id).limit(BATCH_SIZE)).all()
+                if not rows:
+                    return archived
+                self._archive_batch(rows)
+                archived += len(rows)
+                logger.info("Archived %d reviews", archived)
+
+    def _archive_batch(self, rows: List):
+        records = self._records(rows)
+        by_file = defaultdict(list)
+        for row in rows:
+            by_file[archive_file_name(row.created_at)].append(row)
+
+        index = []
+        archived_at = utcnow()
+        for file_name, group in by_file.items():
+            for start in range(0, len(group), MEMBER_SIZE):
+                chunk = group[start:start + MEMBER_SIZE]
+                offset = self._append(file_name, [records[row.id] for row in chunk])
+                index.extend({
+                    "review_id": row.id,
+                    "archive_file": file_name,
+                    "member_offset": offset,
+                    "version": row.version,
+                    "repo_full_name": row.repo_full_name,
+                    "branch_type": row.branch_type,
+                    "status": row.status,
+                    "created_at": row.created_at,
+                    "archived_at": archived_at
+                } for row in chunk)
+
+        # Core statements: the reviews stay counted in review_stats and
+        # leave no events in the live feed
+        review_ids = [row.id for row in rows]
+        self.db.execute(insert(ArchivedReview), index)
+        self.db.execute(
+            delete(ReviewFeedbackEntry).where(ReviewFeedbackEntry.review_id.in_(review_ids)),
+            execution_options={"synchronize_session": False}
+        )
+        self.db.execute(
+            delete(PRReview).where(PRReview.id.in_(review_ids)),
+            execution_options={"synchronize_session": False}
+        )
+        self.db.commit()
+
+    def _records(self, rows: List) -> Dict[int, Dict[str, Any]]:
+        """Detail records of a batch; feedback and rule snapshots are read in one query each"""
+        feedback = defaultdict(list)
+        feedback_ids = [row.id for row in rows if row.feedback_hash is not None]
+        if feedback_ids:
+            result = self.db.execute(select(
+                ReviewFeedbackEntry.review_id, FeedbackTemplate.category, FeedbackTemplate.severity,
+                FeedbackTemplate.message, ReviewFeedbackEntry.line_number, ReviewFeedbackEntry.file_path
+            ).join(ReviewFeedbackEntry.template).where(
+                ReviewFeedbackEntry.review_id.in_(feedback_ids)
+            ).order_by(ReviewFeedbackEntry.review_id, ReviewFeedbackEntry.position))
+            for review_id, category, severity, message, line_number, file_path in result:
+                feedback[review_id].append({
+                    "category": category, "severity": severity, "message": message,
+                    "line_number": line_number, "file_path": file_path
+                })
+
+        snapshot_hashes = {row.rule_snapshot_hash for row in rows if row.rule_snapshot_hash is not None}
+        snapshots = {}
+        if snapshot_hashes:
+            snapshots = dict(self.db.execute(
+                select(RuleSnapshot.hash, RuleSnapshot.expectations).where(RuleSnapshot.hash.in_(snapshot_hashes))
+            ).all())
+
+        records = {}
+        for row in rows:
+            values = row._asdict()
+            # Reviews stored before rule snapshots and feedback items keep inline JSON
+            if row.feedback_hash is None:
+                values["review_feedback"] = row.legacy_review_feedback or []
+            else:
+                values["review_feedback"] = feedback[row.id]
+            if row.rule_snapshot_hash is None:
+                values["expectations_applied"] = row.legacy_expectations_applied or {}
+            else:
+                values["expectations_applied"] = snapshots[row.rule_snapshot_hash]
+            records[row.id] = {name: values[name] for name in ARCHIVED_FIELDS}
+        return records
+
+    def _append(self, file_name: str, records: List[Dict[str, Any]]) -> int:
+        """
+        Append records as one gzip member; returns its offset.
+
+        The member is on disk before the index rows are committed. If the
+        commit fails, the reviews stay in pr_reviews and the member is
+        never referenced; the next run writes them again.
+        """
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        body = b"".join(orjson.dumps(record) + b"\n" for record in records)
+        member = compressor.compress(body) + compressor.flush()
+        with open(os.path.join(self.directory, file_name), "ab") as f:
+            offset = f.tell()
+            f.write(member)
+            f.flush()
+            os.fsync(f.fileno())
+        return offset
+
+def read_archived_review(entry: ArchivedReview, directory: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """The stored detail of an archived review, read from its gzip member"""
+    path = os.path.join(directory or get_settings().review_archive_dir, entry.archive_file)
+    decompressor = zlib.decompressobj(31)
+    data = b""
+    with open(path, "rb") as f:
+        f.seek(entry.member_offset)
+        while not decompressor.eof:
+            chunk = f.read(65536)
+            if not chunk:
+                break
+            data += decompressor.decompress(chunk)
+
+    # Records start with their id, so only the matching line is parsed
+    prefix = b'{"id":%d,' % entry.review_id
+    for line in data.splitlines():
+        if line.startswith(prefix):
+            return orjson.loads(line)
+    return None
+
+def archive_expired_reviews(days: Optional[int] = None) -> int:
+    """Archive reviews past the retention period; does nothing when it is 0"""
+    days = get_settings().review_retention_days if days is None else days
+    if days <= 0:
+        return 0
+    with SessionLocal() as db:
+        return ReviewArchiver(db).archive(utcnow() - timedelta(days=days))
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive reviews past the retention period")
+    parser.add_argument("--days", type=int, default=None, help="Override REVIEW_RETENTION_DAYS")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    archive_expired_reviews(args.days)
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,41 @@
-from typing import Dict, Any, List
-from github import Github
-import re
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+
+from ..config import get_settings
+from .github_client import GitHubClient, GitHubAPIError, get_github_client
+from .patch_rules import PatchAnalyzer, get_patch_analyzer
+from .analysis_pool import analyze_files
+from .analysis_cache import AnalysisCache
+from .metrics import stage, observe_stage
+from .diff_stream import DiffBudget, DiffFile, IGNORED, FILE_BUDGET, PR_BUDGET, iter_lines, iter_diff_files
+
+logger = logging.getLogger(__name__)
+
+SKIP_REASONS = {
+    IGNORED: "the file matches an ignored path pattern",
+    FILE_BUDGET: "the file's diff exceeds the per-file size limit",
+    PR_BUDGET: "the PR's diff exceeds the review size limit",
+}
+MAX_SKIPPED_ITEMS = 20  # Further skipped files are counted in one item
 
 class ReviewEngine:
     
-    def __init__(self, github_token: str):
-        self.github = Github(github_token)
+    def __init__(
+        self,
+        github: Optional[GitHubClient] = None,
+        patch_analyzer: Optional[PatchAnalyzer] = None,
+        analysis_cache: Optional[AnalysisCache] = None,
+        ingestion: Optional[str] = None
+    ):
+        self.github = github or get_github_client()
+        self.patch_analyzer = patch_analyzer or get_patch_analyzer()
+        self.analysis_cache = analysis_cache
+        self.ingestion = ingestion or get_settings().review_ingestion
     
-    def analyze_pr(
+    async def analyze_pr(
         self, 
         repo_full_name: str, 
         pr_number: int,
@@ -16,13 +44,26 @@ class ReviewEngine:
         """
         Analyze a PR and generate structured feedback
         """
-        repo = self.github.get_repo(repo_full_name)
-        pr = repo.get_pull(pr_number)  # ← CHANGED: get_pull_request() to get_pull()
+        if self.ingestion == "stream":
+            # Fetching and scanning overlap here; _analyze_diff times them
+            pr, (filenames, code_issues, skipped_items) = await asyncio.gather(
+                self.github.get_pull(repo_full_name, pr_number),
+                self._analyze_diff(repo_full_name, pr_number)
+            )
+        else:
+            with stage("analysis", "github_fetch"):
+                pr, files = await asyncio.gather(
+                    self.github.get_pull(repo_full_name, pr_number),
+                    self.github.get_pull_files(repo_full_name, pr_number)
+                )
+            filenames = [file["filename"] for file in files]
+            with stage("analysis", "patch_scan", files=len(files)):
+                code_issues, skipped_items = await self._analyze_patches(files), []
         
         feedback_items = []
         
         # Check PR description length
-        description_length = len(pr.body or "")
+        description_length = len(pr.get("body") or "")
         min_length = expectations.get("min_description_length", 30)
         
         if description_length < min_length:
@@ -43,7 +84,7 @@ class ReviewEngine:
             })
         
         # Check number of files changed
-        files_changed = pr.changed_files
+        files_changed = pr["changed_files"]
         max_files = expectations.get("max_files_changed", 30)
         
         if files_changed > max_files:
@@ -56,15 +97,10 @@ class ReviewEngine:
             })
         
         # Analyze changed files
-        files = pr.get_files()
-        
         test_files_found = False
         doc_files_found = False
-        code_issues = []
         
-        for file in files:
-            filename = file.filename
-            
+        for filename in filenames:
             # Check for test files
             if 'test' in filename.lower() or 'spec' in filename.lower():
                 test_files_found = True
@@ -72,40 +108,10 @@ class ReviewEngine:
             # Check for documentation
             if filename.endswith('.md') or 'readme' in filename.lower():
                 doc_files_found = True
-            
-            # Analyze code content (basic checks)
-            if file.patch:
-                patch_content = file.patch
-                
-                # Check for console.log
-                if 'console.log' in patch_content:
-                    code_issues.append({
-                        "category": "Code Quality",
-                        "severity": "warning",
-                        "message": "Found console.log statement. Remove debug code before merging.",
-                        "file_path": filename
-                    })
-                
-                # Check for TODO comments
-                if 'TODO' in patch_content or 'FIXME' in patch_content:
-                    code_issues.append({
-                        "category": "Code Quality",
-                        "severity": "info",
-                        "message": "Found TODO/FIXME comment. Consider addressing before merge.",
-                        "file_path": filename
-                    })
-                
-                # Check for proper error handling (basic)
-                if 'try' in patch_content.lower():
-                    if 'except' not in patch_content.lower() and 'catch' not in patch_content.lower():
-                        code_issues.append({
-                            "category": "Error Handling",
-                            "severity": "error",
-                            "message": "Try block without proper error handling.",
-                            "file_path": filename
-                        })
         
+        # Code content findings, then files left out of the analysis
         feedback_items.extend(code_issues)
+        feedback_items.extend(skipped_items)
         
         # Check for tests if required
         if expectations.get("require_tests", False):
@@ -163,12 +169,141 @@ class ReviewEngine:
             "feedback_items": feedback_items,
             "summary": summary,
             "error_count": error_count,
-            "warning_count": warning_count
+            "warning_count": warning_count,
+            "head_sha": pr["head"]["sha"]
         }
     
+    async def _analyze_patches(self, files: List[Dict[str, Any]]) -> List[Dict]:
+        """
+        Patch findings for every file, in file order.
+
+        Files whose blob SHA is in the analysis cache reuse their stored
+        findings; the rest fan out to the analysis pool on large PRs and
+        are cached afterwards.
+        """
+        version = self.patch_analyzer.version
+        cacheable = {
+            file["sha"] for file in files
+            if self.analysis_cache and file.get("sha") and file.get("patch")
+        }
+        
+        cached = {}
+        if cacheable:
+            cached = await asyncio.to_thread(self.analysis_cache.get_many, cacheable, version)
+        
+        pending = [file for file in files if file.get("sha") not in cached]
+        analyzed = await analyze_files(
+            self.patch_analyzer,
+            [(file["filename"], file.get("patch")) for file in pending]
+        )
+        results = dict(zip((id(file) for file in pending), analyzed))
+        
+        code_issues = []
+        new_entries = {}
+        for file in files:
+            if id(file) in results:
+                issues = results[id(file)]
+                if file.get("sha") in cacheable:
+                    new_entries[file["sha"]] = [
+                        {key: value for key, value in item.items() if key != "file_path"}
+                        for item in issues
+                    ]
+            else:
+                issues = [{**item, "file_path": file["filename"]} for item in cached[file["sha"]]]
+            code_issues.extend(issues)
+        
+        if new_entries:
+            await asyncio.to_thread(self.analysis_cache.put_many, new_entries, version)
+        
+        return code_issues
+    
+    async def _analyze_diff(
+        self,
+        repo_full_name: str,
+        pr_number: int
+    ) -> Tuple[List[str], List[Dict], List[Dict]]:
+        """
+        Stream the PR's raw diff through the patch analyzer.
+
+        Files are parsed as they arrive and analyzed in chunks of about
+        analysis_chunk_bytes, so memory depends on the diff budgets rather
+        than on the size of the PR. The diff carries no full blob SHAs, so
+        cache entries are keyed by a SHA-1 of each file's analyzed hunks.
+        Returns the changed file names, the findings and the feedback on
+        skipped files.
+        """
+        budget = DiffBudget.from_settings()
+        chunk_bytes = get_settings().analysis_chunk_bytes
+        filenames, code_issues, skipped = [], [], []
+        chunk, size = [], 0
+        started, scan_seconds = time.perf_counter(), 0.0
+        
+        async def scan(files: List[Dict[str, Any]]):
+            nonlocal scan_seconds
+            scan_started = time.perf_counter()
+            code_issues.extend(await self._analyze_patches(files))
+            scan_seconds += time.perf_counter() - scan_started
+        
+        async for file in self._diff_files(repo_full_name, pr_number, budget):
+            filenames.append(file.filename)
+            patch = file.patch
+            if file.skipped:
+                skipped.append((file.filename, file.skipped, patch is not None))
+            if patch is None:
+                continue
+            
+            chunk.append({"filename": file.filename, "patch": patch, "sha": hashlib.sha1(patch.encode()).hexdigest()})
+            size += len(patch)
+            if size >= chunk_bytes:
+                await scan(chunk)
+                chunk, size = [], 0
+        
+        if chunk:
+            await scan(chunk)
+        # Downloading and parsing the diff is whatever was not scanning
+        observe_stage("analysis", "github_fetch", time.perf_counter() - started - scan_seconds)
+        observe_stage("analysis", "patch_scan", scan_seconds)
+        return filenames, code_issues, self._skipped_feedback(skipped)
+    
+    async def _diff_files(self, repo_full_name: str, pr_number: int, budget: DiffBudget) -> AsyncIterator[DiffFile]:
+        try:
+            lines = iter_lines(self.github.stream_pull_diff(repo_full_name, pr_number), budget.max_file_bytes)
+            async for file in iter_diff_files(lines, budget):
+                yield file
+        except GitHubAPIError as error:
+            # GitHub refuses diffs above its own size limits; the files API
+            # still lists them, with the largest patches left out
+            if error.status_code != 406:
+                raise
+            logger.warning("Diff of %s#%s too large for GitHub, using the files API", repo_full_name, pr_number)
+            for file in await self.github.get_pull_files(repo_full_name, pr_number):
+                yield DiffFile.from_patch(file["filename"], file.get("patch"), budget)
+    
+    def _skipped_feedback(self, skipped: List[Tuple[str, str, bool]]) -> List[Dict]:
+        """Feedback items for files that were ignored or cut by a budget"""
+        items = []
+        for filename, reason, partial in skipped[:MAX_SKIPPED_ITEMS]:
+            items.append({
+                "category": "Scope",
+                "severity": "info" if reason == IGNORED else "warning",
+                "message": f"{'Partly analyzed' if partial else 'Not analyzed'}: {SKIP_REASONS[reason]}.",
+                "line_number": None,
+                "file_path": filename
+            })
+        
+        if len(skipped) > MAX_SKIPPED_ITEMS:
+            items.append({
+                "category": "Scope",
+                "severity": "info",
+                "message": f"{len(skipped) - MAX_SKIPPED_ITEMS} more files were ignored or not fully analyzed.",
+                "line_number": None,
+                "file_path": None
+            })
+        return items
+    
     def _generate_summary(
         self, 
-        pr, 
+        pr: Dict[str, Any], 
         feedback_items: List[Dict], 
         error_count: int, 
         warning_count: int,
@@ -178,10 +313,10 @@ class ReviewEngine:
         
         summary_parts = [
             f"Automated PR Review Summary\n",
-            f"PR: {pr.title}",
+            f"PR: {pr['title']}",
             f"Branch Type: {expectations.get('branch_type', 'default')}",
-            f"Files Changed: {pr.changed_files}",
-            f"Lines Added: +{pr.additions} / Lines Removed: -{pr.deletions}\n",
+            f"Files Changed: {pr['changed_files']}",
+            f"Lines Added: +{pr['additions']} / Lines Removed: -{pr['deletions']}\n",
             f"Review Results",
             f"- ❌ Errors: {error_count}",
             f"- ⚠️ Warnings: {warning_count}",
@@ -192,7 +327,7 @@ class ReviewEngine:
             summary_parts.append(" 🔴 Critical Issues")
             for item in feedback_items:
                 if item["severity"] == "error":
-                    file_info = f" ({item['file_path']})" if item.get('file_path') else ""
+                    file_info = self._file_info(item)
                     summary_parts.append(f"- {item['message']}{file_info}")
             summary_parts.append("")
         
@@ -200,7 +335,7 @@ class ReviewEngine:
             summary_parts.append(" ⚠️ Warnings")
             for item in feedback_items:
                 if item["severity"] == "warning":
-                    file_info = f" ({item['file_path']})" if item.get('file_path') else ""
+                    file_info = self._file_info(item)
                     summary_parts.append(f"- {item['message']}{file_info}")
             summary_parts.append("")
         
@@ -212,4 +347,12 @@ class ReviewEngine:
         else:
             summary_parts.append("⏸️ Please address the errors before instructor review.")
         
-        return "\n".join(summary_parts)
\ No newline at end of file
+        return "\n".join(summary_parts)
+    
+    def _file_info(self, item: Dict) -> str:
+        """Location suffix for a summary line, e.g. " (src/app.js:12)" """
+        if not item.get('file_path'):
+            return ""
+        if item.get('line_number'):
+            return f" ({item['file_path']}:{item['line_number']})"
+        return f" ({item['file_path']})"
\ No newline at end of file
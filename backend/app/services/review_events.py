@@ -0,0 +1,204 @@
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from datetime import timedelta
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import event, func, inspect, insert, or_
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..database import SessionLocal
+from ..models import PRReview, ReviewEvent, utcnow
+from ..schemas import PRReviewListItem
+
+logger = logging.getLogger(__name__)
+
+REVIEW_CREATED = "review_created"
+REVIEW_UPDATED = "review_updated"
+STATUS_CHANGED = "status_changed"
+REVIEW_DELETED = "review_deleted"
+
+# How long an id skipped by the poller is waited for: ids are allocated at
+# flush time but become visible at commit, so they can appear out of order
+GAP_TIMEOUT = 30.0
+
+def _event_row(review: PRReview, event_type: str, previous_status=None) -> Dict[str, Any]:
+    if event_type == REVIEW_DELETED:
+        payload = {"review": {"id": review.id}}
+    else:
+        payload = {"review": PRReviewListItem.model_validate(review).model_dump(mode="json")}
+    if previous_status is not None:
+        payload["previous_status"] = getattr(previous_status, "value", previous_status)
+    return {"review_id": review.id, "event_type": event_type, "payload": payload}
+
+@event.listens_for(Session, "after_flush")
+def _record_review_events(session: Session, flush_context):
+    """Append the flush's review changes to review_events, in the same transaction"""
+    rows = []
+
+    for review in session.new:
+        if isinstance(review, PRReview):
+            rows.append(_event_row(review, REVIEW_CREATED))
+
+    for review in session.dirty:
+        if isinstance(review, PRReview) and session.is_modified(review):
+            status_history = inspect(review).attrs.status.history
+            if status_history.deleted and status_history.deleted[0] != review.status:
+                rows.append(_event_row(review, STATUS_CHANGED, status_history.deleted[0]))
+            else:
+                rows.append(_event_row(review, REVIEW_UPDATED))
+
+    for review in session.deleted:
+        if isinstance(review, PRReview):
+            rows.append(_event_row(review, REVIEW_DELETED))
+
+    if rows:
+        session.connection().execute(insert(ReviewEvent), rows)
+
+def format_sse(event: Dict[str, Any]) -> str:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+class Subscription:
+    """One connected client: its queue plus what to send before live events"""
+
+    def __init__(self, queue_size: int, replay: List[Dict[str, Any]], reset: bool):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.replay = replay
+        self.reset = reset
+        self.overflowed = False
+
+class ReviewEventBroker:
+    """
+    Fans the review change feed out to every SSE client of this process.
+
+    A single poller reads new review_events rows for all subscribers, so
+    the database sees one query per poll interval however many dashboards
+    are open. Recent events stay in a ring buffer: a client reconnecting
+    with Last-Event-ID is replayed from it, or told to reload ("reset")
+    when its last event has already left the buffer. Clients whose queue
+    fills up are disconnected and resume the same way.
+    """
+
+    def __init__(
+        self,
+        poll_interval: Optional[float] = None,
+        buffer_size: Optional[int] = None,
+        queue_size: Optional[int] = None
+    ):
+        self.settings = get_settings()
+        self.poll_interval = poll_interval or self.settings.events_poll_interval
+        self.queue_size = queue_size or self.settings.events_subscriber_queue_size
+        self._buffer: deque = deque(maxlen=buffer_size or self.settings.events_buffer_size)
+        self._subscribers: List[Subscription] = []
+        self._last_id = 0
+        self._gaps: Dict[int, float] = {}  # skipped id -> monotonic deadline
+        self._last_prune = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None:
+            self._last_id = await asyncio.to_thread(self._latest_id)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def subscribe(self, last_event_id: Optional[int] = None) -> Subscription:
+        await self.start()
+
+        replay, reset = [], False
+        if last_event_id is not None and last_event_id != self._last_id:
+            ids = [event["id"] for event in self._buffer]
+            if last_event_id in ids:
+                replay = list(self._buffer)[ids.index(last_event_id) + 1:]
+            else:
+                reset = True
+
+        subscription = Subscription(self.queue_size, replay, reset)
+        self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        if subscription in self._subscribers:
+            self._subscribers.remove(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def _run(self):
+        while True:
+            try:
+                events = await asyncio.to_thread(self._poll)
+                for event in events:
+                    self._publish(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Polling review events failed")
+            await asyncio.sleep(self.poll_interval)
+
+    def _publish(self, event: Dict[str, Any]):
+        self._buffer.append(event)
+        for subscription in list(self._subscribers):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscription.overflowed = True
+                self.unsubscribe(subscription)
+
+    def _latest_id(self) -> int:
+        with SessionLocal() as db:
+            return db.query(func.max(ReviewEvent.id)).scalar() or 0
+
+    def _poll(self) -> List[Dict[str, Any]]:
+        """New events since the last poll, plus any late commits filling gaps"""
+        now = time.monotonic()
+        self._gaps = {id: deadline for id, deadline in self._gaps.items() if deadline > now}
+
+        with SessionLocal() as db:
+            condition = ReviewEvent.id > self._last_id
+            if self._gaps:
+                condition = or_(condition, ReviewEvent.id.in_(self._gaps.keys()))
+            rows = db.query(ReviewEvent).filter(condition).order_by(ReviewEvent.id).all()
+
+            events = []
+            for row in rows:
+                self._gaps.pop(row.id, None)
+                if row.id > self._last_id:
+                    for missing in range(self._last_id + 1, row.id):
+                        self._gaps[missing] = now + GAP_TIMEOUT
+                    self._last_id = row.id
+                events.append({"id": row.id, "type": row.event_type, "data": row.payload})
+
+            if now - self._last_prune >= 3600:
+                self._last_prune = now
+                cutoff = utcnow() - timedelta(hours=self.settings.events_retention_hours)
+                db.query(ReviewEvent).filter(ReviewEvent.created_at < cutoff).delete(synchronize_session=False)
+                db.commit()
+
+        return events
+
+_broker: Optional[ReviewEventBroker] = None
+
+def get_review_event_broker() -> ReviewEventBroker:
+    """Process-wide broker shared by all SSE connections"""
+    global _broker
+    if _broker is None:
+        _broker = ReviewEventBroker()
+    return _broker
+
+async def close_review_event_broker():
+    global _broker
+    if _broker is not None:
+        await _broker.stop()
+        _broker = None
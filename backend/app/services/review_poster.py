@@ -0,0 +1,115 @@
+import asyncio
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..models import PRReview, ReviewStatus, utcnow
+from .github_service import GitHubService
+
+def comment_marker(review_id: int) -> str:
+    """Hidden tag identifying the GitHub comment of a review"""
+    return f"<!-- pr-review-system:review-{review_id} -->"
+
+def build_comment_body(review: PRReview) -> str:
+    """Comment posted to GitHub for an approved review"""
+    body = review.review_summary
+
+    if review.instructor_notes:
+        body += f"\n\n---\n**Instructor Notes:**\n{review.instructor_notes}"
+
+    return f"{body}\n\n{comment_marker(review.id)}"
+
+class ReviewPoster:
+    """
+    Posts approved reviews to GitHub from the job queue.
+
+    Approval only moves a review to POSTING and queues a job; the job's
+    retries give at-least-once delivery. The comment carries a hidden
+    marker so a retry first looks for a comment an earlier attempt may
+    have created (e.g. GitHub accepted it but the response was lost) and
+    never posts twice. Reviews approved again after a failed post are
+    retries too, though their new job starts at attempt 1; only a first
+    post skips the lookup.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        github_service: Optional[GitHubService] = None,
+        concurrency: Optional[int] = None
+    ):
+        self.db = db
+        self.github_service = github_service or GitHubService()
+        self.concurrency = concurrency or get_settings().github_post_concurrency
+
+    async def post(self, review_id: int, attempt: int = 1, reposted_ids: Sequence[int] = ()):
+        await self.post_many([review_id], attempt, reposted_ids)
+
+    async def post_many(self, review_ids: Sequence[int], attempt: int = 1, reposted_ids: Sequence[int] = ()):
+        """
+        Post a batch of reviews concurrently, bounded by github_post_concurrency.
+
+        reposted_ids are the reviews an earlier job already tried to post.
+        Reviews that were posted are marked POSTED even if others failed;
+        the first failure is then raised so the job is retried for the rest.
+        """
+        reviews = await asyncio.to_thread(self._load, review_ids)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def post_one(review: PRReview) -> Dict[str, Any]:
+            async with semaphore:
+                comment = None
+                if attempt > 1 or review.id in reposted_ids:
+                    comment = await self._find_existing_comment(review)
+                if comment is None:
+                    comment = await self.github_service.post_review_comment(
+                        review.repo_full_name,
+                        review.pr_number,
+                        build_comment_body(review),
+                        review.commit_sha
+                    )
+                return comment
+
+        results = await asyncio.gather(*(post_one(review) for review in reviews), return_exceptions=True)
+
+        posted = [
+            (review, result) for review, result in zip(reviews, results)
+            if not isinstance(result, BaseException)
+        ]
+        if posted:
+            await asyncio.to_thread(self._mark_posted, posted)
+
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            raise errors[0]
+
+    def mark_failed(self, review_ids: Sequence[int]):
+        """Give up on reviews whose posting job was dead-lettered"""
+        reviews = self.db.query(PRReview).filter(
+            PRReview.id.in_(review_ids),
+            PRReview.status == ReviewStatus.POSTING
+        ).all()
+        for review in reviews:
+            review.status = ReviewStatus.POST_FAILED
+        self.db.commit()
+
+    def _load(self, review_ids: Sequence[int]) -> List[PRReview]:
+        # Anything no longer POSTING was already posted by an earlier attempt
+        return self.db.query(PRReview).filter(
+            PRReview.id.in_(review_ids),
+            PRReview.status == ReviewStatus.POSTING
+        ).order_by(PRReview.id).all()
+
+    async def _find_existing_comment(self, review: PRReview) -> Optional[Dict[str, Any]]:
+        marker = comment_marker(review.id)
+        comments = await self.github_service.get_pr_comments(review.repo_full_name, review.pr_number)
+        return next((c for c in comments if marker in (c.get("body") or "")), None)
+
+    def _mark_posted(self, posted: List[Tuple[PRReview, Dict[str, Any]]]):
+        now = utcnow()
+        for review, comment in posted:
+            review.status = ReviewStatus.POSTED
+            review.posted_at = now
+            review.github_comment_id = comment.get("id")
+        self.db.commit()
@@ -0,0 +1,159 @@
+import asyncio
+from typing import Dict, Any, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+
+from ..config import get_settings
+from ..models import PRReview, ReviewStatus
+from .review_engine import ReviewEngine
+from .branch_rules import BranchRulesService
+from .job_queue import JobQueue
+from .analysis_cache import AnalysisCache
+from .metrics import stage
+
+# Tries at storing a review that keeps colliding with concurrent jobs
+WRITE_ATTEMPTS = 3
+
+class ReviewProcessor:
+    """Runs the automated review for a queued pull request event"""
+
+    def __init__(self, db: Session, review_engine: Optional[ReviewEngine] = None):
+        self.db = db
+        self.review_engine = review_engine or ReviewEngine(
+            analysis_cache=AnalysisCache(db) if get_settings().analysis_cache_enabled else None
+        )
+
+    async def process(self, pr: Dict[str, Any], job_id: Optional[int] = None) -> PRReview:
+        """
+        Analyze the PR described by a job payload and store the review.
+
+        If the job is superseded by a newer push while it runs, JobSuperseded
+        is raised at the next checkpoint and nothing is stored. The review is
+        stored for the PR's head commit, whose files were analyzed, which is
+        not the job's commit when an older push was delivered late. Database
+        work runs in a thread so the event loop is never blocked.
+        """
+        with stage("analysis", "load_expectations"):
+            expectations = await asyncio.to_thread(self._load_expectations, pr, job_id)
+
+        # Run automated review
+        review_result = await self.review_engine.analyze_pr(
+            pr["repo_full_name"],
+            pr["pr_number"],
+            expectations
+        )
+
+        with stage("analysis", "store_review"):
+            return await asyncio.to_thread(self._store_review, pr, expectations, review_result, job_id)
+
+    def _load_expectations(self, pr: Dict[str, Any], job_id: Optional[int]) -> Dict[str, Any]:
+        self._checkpoint(job_id)
+
+        # Get branch-based expectations
+        branch_service = BranchRulesService(self.db)
+        return branch_service.get_expectations_for_branch(pr["branch_name"])
+
+    def _store_review(
+        self,
+        pr: Dict[str, Any],
+        expectations: Dict[str, Any],
+        review_result: Dict[str, Any],
+        job_id: Optional[int]
+    ) -> PRReview:
+        if review_result["head_sha"] != pr["commit_sha"]:
+            # Delivered after a newer push: keep the head's review if it has
+            # one, so a stale job neither overwrites nor supersedes it
+            pr = {**pr, "commit_sha": review_result["head_sha"]}
+            head_review = self._commit_review(pr).one_or_none()
+            if head_review is not None:
+                return head_review
+
+        existing = False
+        for attempt in range(WRITE_ATTEMPTS):
+            self._checkpoint(job_id)
+            try:
+                return self._write_review(pr, expectations, review_result, existing)
+            except IntegrityError:
+                # The commit has a review already, from an earlier attempt
+                # of this job or from a concurrent job that got there first
+                if existing or attempt == WRITE_ATTEMPTS - 1:
+                    raise
+                existing = True
+            except StaleDataError:
+                # A concurrent job of the same PR changed these reviews first:
+                # stop if it superseded this one, otherwise write over its changes
+                if attempt == WRITE_ATTEMPTS - 1:
+                    raise
+            self.db.rollback()
+
+    def _write_review(
+        self,
+        pr: Dict[str, Any],
+        expectations: Dict[str, Any],
+        review_result: Dict[str, Any],
+        existing: bool
+    ) -> PRReview:
+        """
+        Insert the commit's review, or update it when `existing` is set.
+
+        New commits are the common case, so the insert is tried without a
+        lookup; the unique (repo, PR, commit) key turns a duplicate into an
+        IntegrityError instead of a second review.
+        """
+        branch_type = expectations.get("branch_type", "default")
+
+        if existing:
+            review = self._commit_review(pr).one()
+
+            # Update existing review
+            review.review_feedback = review_result["feedback_items"]
+            review.review_summary = review_result["summary"]
+            review.expectations_applied = expectations
+            review.error_count = review_result["error_count"]
+            review.warning_count = review_result["warning_count"]
+            review.status = ReviewStatus.PENDING
+        else:
+            # Create new review
+            review = PRReview(
+                pr_number=pr["pr_number"],
+                repo_full_name=pr["repo_full_name"],
+                branch_name=pr["branch_name"],
+                branch_type=branch_type,
+                pr_title=pr["pr_title"],
+                pr_author=pr["pr_author"],
+                review_feedback=review_result["feedback_items"],
+                review_summary=review_result["summary"],
+                expectations_applied=expectations,
+                error_count=review_result["error_count"],
+                warning_count=review_result["warning_count"],
+                status=ReviewStatus.PENDING,
+                pr_url=pr["pr_url"],
+                commit_sha=pr["commit_sha"]
+            )
+            self.db.add(review)
+
+        # Older pending reviews of this PR can no longer be approved. They are
+        # updated through the ORM so the stats counters see the transition.
+        superseded = self.db.query(PRReview).filter(
+            PRReview.pr_number == pr["pr_number"],
+            PRReview.repo_full_name == pr["repo_full_name"],
+            PRReview.commit_sha != pr["commit_sha"],
+            PRReview.status == ReviewStatus.PENDING
+        ).all()
+        for older in superseded:
+            older.status = ReviewStatus.SUPERSEDED
+
+        self.db.commit()
+        return review
+
+    def _commit_review(self, pr: Dict[str, Any]):
+        return self.db.query(PRReview).filter(
+            PRReview.pr_number == pr["pr_number"],
+            PRReview.repo_full_name == pr["repo_full_name"],
+            PRReview.commit_sha == pr["commit_sha"]
+        )
+
+    def _checkpoint(self, job_id: Optional[int]):
+        if job_id is not None:
+            JobQueue(self.db).ensure_current(job_id)
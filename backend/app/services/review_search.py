@@ -0,0 +1,293 @@
+"""
+Ranked full-text search over reviews and their findings, with facet counts.
+
+On PostgreSQL the query (websearch syntax: quoted phrases, OR, -word)
+is matched against the generated pr_reviews.search_vector column, which
+holds the title and summary and is GIN-indexed. Finding messages are
+interned, so they are matched once in feedback_templates, and the reviews
+holding a matched message are read from the (template_id, review_id)
+index. Author and branch filters are substring matches served by pg_trgm
+indexes. All of these are created by migration 0004.
+
+SQLite has no full-text index. The fallback requires every word of the
+query as a case-insensitive substring and scans the reviews; it is meant
+for development databases.
+"""
+import re
+from array import array
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import Integer, and_, any_, case, exists, func, literal, literal_column, select, text, true, union, union_all
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..models import PRReview, ReviewStatus, FeedbackTemplate, ReviewFeedbackEntry
+from ..schemas import PRReviewListItem
+from .review_stats import StatsCache
+
+# Text search configuration of search_vector and the message index
+SEARCH_CONFIG = literal_column("'english'")
+SEARCH_VECTOR = literal_column("pr_reviews.search_vector", TSVECTOR)
+MESSAGE_VECTOR = func.to_tsvector(SEARCH_CONFIG, FeedbackTemplate.message)
+
+# ts_rank's default weights: titles are A, summaries B and finding messages C
+TITLE_WEIGHT, SUMMARY_WEIGHT, FINDING_WEIGHT = 1.0, 0.4, 0.2
+
+FACET_SIZE = 20  # values per facet, most frequent first
+
+# Filtered reviews up to which each one's text is checked instead of the index
+RECHECK_LIMIT = 2_000
+
+LIST_COLUMNS = [getattr(PRReview, name) for name in PRReviewListItem.model_fields]
+
+# Ranked hits and counts by search, reused while a client pages through it
+search_cache = StatsCache(max_entries=200)
+
+def _contains(value: str) -> str:
+    """LIKE pattern matching value anywhere, with wildcards escaped"""
+    return "%" + re.sub(r"([\\%_])", r"\\\1", value) + "%"
+
+def _top(counts: Counter) -> List[Dict[str, Any]]:
+    return [{"value": value, "count": count} for value, count in counts.most_common(FACET_SIZE)]
+
+def _top_facets(counts: Dict[str, Counter]) -> Dict[str, List[Dict[str, Any]]]:
+    return {name: _top(counts.get(name, Counter())) for name in ("category", "severity", "repo", "branch_type")}
+
+class ReviewSearchService:
+    """
+    Review search for the instructor dashboard.
+
+    A search looks at the newest search_max_hits reviews that match, the
+    way search engines stop counting hits: ranking, the total and the
+    facet counts by category, severity, repo and branch type are computed
+    over those, and total_capped tells when more reviews match. Each
+    source of hits is read newest first from its index, so the cost of a
+    search is bounded however common its terms are. Without query text
+    the filtered reviews are listed newest first.
+
+    The ranked ids and counts are cached for search_cache_ttl seconds, so
+    later pages only load their rows. Archived reviews are not searched.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.settings = get_settings()
+        self.postgres = db.get_bind().dialect.name == "postgresql"
+
+    def search(
+        self,
+        q: Optional[str] = None,
+        repo: Optional[str] = None,
+        branch_type: Optional[str] = None,
+        author: Optional[str] = None,
+        branch: Optional[str] = None,
+        category: Optional[str] = None,
+        severity: Optional[str] = None,
+        status: Optional[ReviewStatus] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        """
+        One page of hits plus counts. author and branch match substrings;
+        category and severity keep reviews with a finding that has both.
+        """
+        q = (q or "").strip()
+        if self.postgres:
+            # Request sessions prepare their statements, and after a few runs
+            # PostgreSQL would reuse a generic plan blind to the words and limits
+            self.db.execute(text("SET LOCAL plan_cache_mode = force_custom_plan"))
+
+        cache_key = (q, repo, branch_type, author, branch, category, severity, status, created_after, created_before)
+        found = search_cache.get(cache_key)
+        if found is None:
+            conditions = self._conditions(
+                repo, branch_type, author, branch, category, severity, status, created_after, created_before
+            )
+            found = self._find(q, conditions)
+            search_cache.set(cache_key, found, self.settings.search_cache_ttl)
+
+        ids = found["ids"][offset:offset + limit]
+        ranks = found["ranks"][offset:offset + limit] if found["ranks"] is not None else [None] * len(ids)
+        return {
+            "total": found["total"],
+            "total_capped": found["total_capped"],
+            "facets": found["facets"],
+            "items": self._page(ids, ranks)
+        }
+
+    def _conditions(
+        self, repo, branch_type, author, branch, category, severity, status, created_after, created_before
+    ) -> List:
+        conditions = []
+        if repo:
+            conditions.append(PRReview.repo_full_name == repo)
+        if branch_type:
+            conditions.append(PRReview.branch_type == branch_type)
+        if author:
+            conditions.append(PRReview.pr_author.ilike(_contains(author), escape="\\"))
+        if branch:
+            conditions.append(PRReview.branch_name.ilike(_contains(branch), escape="\\"))
+        if status:
+            conditions.append(PRReview.status == status)
+        if created_after:
+            conditions.append(PRReview.created_at >= created_after)
+        if created_before:
+            conditions.append(PRReview.created_at < created_before)
+
+        finding = []
+        if category:
+            finding.append(FeedbackTemplate.category == category)
+        if severity:
+            finding.append(FeedbackTemplate.severity == severity)
+        if finding:
+            # The few templates are looked up first, so the planner sees how
+            # common their findings are instead of guessing
+            template_ids = self.db.scalars(select(FeedbackTemplate.id).where(*finding)).all()
+            conditions.append(exists().where(
+                ReviewFeedbackEntry.review_id == PRReview.id,
+                ReviewFeedbackEntry.template_id.in_(template_ids)
+            ).correlate(PRReview))
+        return conditions
+
+    def _find(self, q: str, conditions: List) -> Dict[str, Any]:
+        """Ranked ids, total and facet counts of a search"""
+        cap = self.settings.search_max_hits
+        if q:
+            match = self._match(q)
+            if match is None:
+                return {"ids": array("i"), "ranks": None, "total": 0, "total_capped": False, "facets": _top_facets({})}
+            hits = self._hits(conditions, match).subquery("hits")
+            rank = self._rank(match).label("rank")
+            query = select(PRReview.id, PRReview.repo_full_name, PRReview.branch_type, rank).join(
+                hits, PRReview.id == hits.c.review_id
+            ).order_by(rank.desc(), PRReview.created_at.desc(), PRReview.id.desc())
+        else:
+            query = select(PRReview.id, PRReview.repo_full_name, PRReview.branch_type).where(*conditions).order_by(
+                PRReview.created_at.desc(), PRReview.id.desc()
+            ).limit(cap)
+        rows = self.db.execute(query).all()
+
+        ids = [row.id for row in rows]
+        counts = self._finding_counts(ids)
+        counts["repo"] = Counter(row.repo_full_name for row in rows)
+        counts["branch_type"] = Counter(row.branch_type for row in rows)
+        return {
+            "ids": array("i", ids),
+            "ranks": array("d", (row.rank for row in rows)) if q else None,
+            "total": len(rows),
+            "total_capped": len(rows) >= cap,
+            "facets": _top_facets(counts)
+        }
+
+    def _match(self, q: str) -> Optional[Dict[str, Any]]:
+        """How q matches review text and finding messages; None if it has no words"""
+        if self.postgres:
+            tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+            text_match = SEARCH_VECTOR.op("@@")(tsquery)
+            # The function behind @@, which the planner does not take to the index
+            text_recheck = func.ts_match_vq(SEARCH_VECTOR, tsquery)
+            text_rank = func.ts_rank_cd(SEARCH_VECTOR, tsquery)
+            message_match = MESSAGE_VECTOR.op("@@")(tsquery)
+            message_rank = func.ts_rank_cd(func.setweight(MESSAGE_VECTOR, literal_column("'C'")), tsquery)
+        else:
+            patterns = [_contains(word) for word in re.findall(r"\w+", q)]
+            if not patterns:
+                return None
+            document = PRReview.pr_title + " " + PRReview.review_summary
+            text_match = text_recheck = and_(*(document.ilike(pattern, escape="\\") for pattern in patterns))
+            text_rank = case((text_match, sum(
+                case((PRReview.pr_title.ilike(pattern, escape="\\"), TITLE_WEIGHT), else_=SUMMARY_WEIGHT)
+                for pattern in patterns
+            )), else_=0.0)
+            message_match = and_(*(FeedbackTemplate.message.ilike(pattern, escape="\\") for pattern in patterns))
+            message_rank = literal(FINDING_WEIGHT * len(patterns))
+
+        # A few hundred distinct messages, matched once
+        templates = select(FeedbackTemplate.id, message_rank.label("rank")).where(message_match).cte("matched_templates")
+        return {"text": text_match, "text_recheck": text_recheck, "text_rank": text_rank, "templates": templates}
+
+    def _hits(self, conditions: List, match: Dict[str, Any]):
+        """Select of the newest search_max_hits matching review ids"""
+        cap = self.settings.search_max_hits
+
+        # Each source yields its newest ids: a backward scan of the primary
+        # key or, per matched message, of (template_id, review_id). When the
+        # filters leave few reviews the planner would still intersect them
+        # with the index entries of every query word, which run to hundreds
+        # of thousands for words all summaries share, so each filtered
+        # review's text is checked instead.
+        text_match = match["text"]
+        if self.postgres and conditions and self._at_most(conditions, RECHECK_LIMIT):
+            text_match = match["text_recheck"]
+        text_hits = select(PRReview.id.label("review_id")).where(text_match, *conditions).order_by(
+            PRReview.id.desc()
+        ).limit(cap).subquery()
+
+        templates = match["templates"]
+        if self.postgres:
+            finding_hits = select(ReviewFeedbackEntry.review_id).where(ReviewFeedbackEntry.template_id == templates.c.id)
+        else:
+            # SQLite has no LATERAL; the messages' entries are merged instead
+            finding_hits = select(ReviewFeedbackEntry.review_id).where(
+                ReviewFeedbackEntry.template_id.in_(select(templates.c.id))
+            ).distinct()
+        if conditions:
+            finding_hits = finding_hits.join(PRReview, PRReview.id == ReviewFeedbackEntry.review_id).where(*conditions)
+        finding_hits = finding_hits.order_by(ReviewFeedbackEntry.review_id.desc()).limit(cap)
+        if self.postgres:
+            finding_hits = finding_hits.lateral()
+            finding_hits = select(finding_hits.c.review_id).select_from(templates).join(finding_hits, true())
+        else:
+            finding_hits = select(finding_hits.subquery().c.review_id)
+
+        hits = union(select(text_hits.c.review_id), finding_hits).subquery()
+        return select(hits.c.review_id).order_by(hits.c.review_id.desc()).limit(cap)
+
+    def _at_most(self, conditions: List, count: int) -> bool:
+        """Whether the filters leave no more than count reviews"""
+        filtered = select(PRReview.id).where(*conditions).limit(count + 1).subquery()
+        return self.db.scalar(select(func.count()).select_from(filtered)) <= count
+
+    def _rank(self, match: Dict[str, Any]):
+        """Rank of a hit: its text rank plus that of each matched finding"""
+        templates = match["templates"]
+        finding_rank = select(func.sum(templates.c.rank)).where(
+            ReviewFeedbackEntry.review_id == PRReview.id,
+            ReviewFeedbackEntry.template_id == templates.c.id
+        ).scalar_subquery()
+        return match["text_rank"] + func.coalesce(finding_rank, 0.0)
+
+    def _among(self, column, ids: List[int]):
+        """column is one of ids, sent as a single array on PostgreSQL"""
+        if self.postgres:
+            return column == any_(literal(ids, ARRAY(Integer)))
+        return column.in_(ids)
+
+    def _finding_counts(self, ids: List[int]) -> Dict[str, Counter]:
+        """Category and severity counts of the hits, in one statement"""
+        counts = {"category": Counter(), "severity": Counter()}
+        if not ids:
+            return counts
+        findings = select(ReviewFeedbackEntry.review_id, FeedbackTemplate.category, FeedbackTemplate.severity).join(
+            ReviewFeedbackEntry.template
+        ).where(self._among(ReviewFeedbackEntry.review_id, ids)).cte("findings")
+        # A review counts once per category or severity, however many findings it has
+        by_finding = [
+            select(literal(name), column, func.count(findings.c.review_id.distinct())).group_by(column)
+            for name, column in (("category", findings.c.category), ("severity", findings.c.severity))
+        ]
+        for name, value, count in self.db.execute(union_all(*by_finding)):
+            counts[name][value] = count
+        return counts
+
+    def _page(self, ids, ranks) -> List[Dict[str, Any]]:
+        """List rows of ids in their ranked order; reviews deleted since are left out"""
+        if not ids:
+            return []
+        rows = {row.id: row._asdict() for row in self.db.execute(select(*LIST_COLUMNS).where(PRReview.id.in_(list(ids))))}
+        return [{**rows[review_id], "rank": rank} for review_id, rank in zip(ids, ranks) if review_id in rows]
@@ -0,0 +1,216 @@
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import event, func, inspect, insert, select, union_all
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..database import dialect_insert
+from ..models import PRReview, ReviewStat, ReviewStatus, ArchivedReview, utcnow
+
+# (repo_full_name, branch_type, day, status)
+StatKey = Tuple[str, str, date, ReviewStatus]
+
+GROUP_BY_OPTIONS = ("repo", "branch_type", "day", "week", "month")
+
+def _day_of(created_at: Optional[datetime]) -> date:
+    # New reviews get created_at from the database; it is "now" either way
+    return (created_at or utcnow()).date()
+
+def _stat_key(state, history: bool) -> StatKey:
+    """Counter key of a review, before its pending changes if history is set"""
+    values = []
+    for attribute in ("repo_full_name", "branch_type", "created_at", "status"):
+        current = state.attrs[attribute]
+        if history and current.history.deleted:
+            values.append(current.history.deleted[0])
+        else:
+            values.append(current.value)
+
+    repo_full_name, branch_type, created_at, status = values
+    return repo_full_name, branch_type, _day_of(created_at), status or ReviewStatus.PENDING
+
+@event.listens_for(Session, "before_flush")
+def _track_review_counts(session: Session, flush_context, instances):
+    """Apply the flush's review inserts, status changes and deletes to review_stats"""
+    deltas: Dict[StatKey, int] = defaultdict(int)
+
+    for review in session.new:
+        if isinstance(review, PRReview):
+            deltas[_stat_key(inspect(review), history=False)] += 1
+
+    for review in session.dirty:
+        if isinstance(review, PRReview) and session.is_modified(review):
+            state = inspect(review)
+            before, after = _stat_key(state, history=True), _stat_key(state, history=False)
+            if before != after:
+                deltas[before] -= 1
+                deltas[after] += 1
+
+    for review in session.deleted:
+        if isinstance(review, PRReview):
+            deltas[_stat_key(inspect(review), history=True)] -= 1
+
+    rows = [
+        {"repo_full_name": key[0], "branch_type": key[1], "day": key[2], "status": key[3], "count": delta}
+        for key, delta in deltas.items() if delta
+    ]
+    if not rows:
+        return
+
+    statement = dialect_insert(session, ReviewStat).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=["repo_full_name", "branch_type", "day", "status"],
+        set_={"count": ReviewStat.count + statement.excluded.count}
+    )
+    session.connection().execute(statement)
+    session.info["review_stats_changed"] = True
+
+@event.listens_for(Session, "after_commit")
+def _expire_cached_stats(session: Session):
+    if session.info.pop("review_stats_changed", False):
+        stats_cache.clear()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stats_flag(session: Session):
+    session.info.pop("review_stats_changed", None)
+
+class StatsCache:
+    """Short-lived in-process cache of aggregated stats"""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self._entries: Dict[Any, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+
+    def get(self, key) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def set(self, key, value, ttl: float):
+        now = time.monotonic()
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (now + ttl, value)
+            if self.max_entries is not None and len(self._entries) > self.max_entries:
+                # Expired entries go first, then the oldest
+                for stale in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+                    del self._entries[stale]
+                while len(self._entries) > self.max_entries:
+                    del self._entries[next(iter(self._entries))]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+stats_cache = StatsCache()
+
+def _summarize(counts: Dict[ReviewStatus, int]) -> Dict[str, int]:
+    return {
+        "total": sum(counts.values()),
+        "pending": counts.get(ReviewStatus.PENDING, 0),
+        "approved": counts.get(ReviewStatus.POSTED, 0),
+        "rejected": counts.get(ReviewStatus.REJECTED, 0),
+        "posting": counts.get(ReviewStatus.POSTING, 0),
+        "post_failed": counts.get(ReviewStatus.POST_FAILED, 0)
+    }
+
+class ReviewStatsService:
+    """
+    Dashboard statistics read from the review_stats counter table.
+
+    The counters are kept current by a flush listener, so a summary costs
+    one small aggregate over (repo, branch type, day, status) rows however
+    many reviews exist. Results are cached for stats_cache_ttl seconds and
+    dropped as soon as this process commits a change to them.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.settings = get_settings()
+
+    def get_summary(self) -> Dict[str, int]:
+        """Review counts by status over all reviews"""
+        cached = stats_cache.get("summary")
+        if cached is None:
+            rows = self.db.query(ReviewStat.status, func.sum(ReviewStat.count)).group_by(
+                ReviewStat.status
+            ).all()
+            cached = _summarize({status: int(count or 0) for status, count in rows})
+            stats_cache.set("summary", cached, self.settings.stats_cache_ttl)
+        return cached
+
+    def get_breakdown(
+        self,
+        group_by: str,
+        repo: Optional[str] = None,
+        since: Optional[date] = None,
+        until: Optional[date] = None
+    ) -> List[Dict[str, Any]]:
+        """Review counts by status for each repo, branch type or time bucket"""
+        if group_by not in GROUP_BY_OPTIONS:
+            raise ValueError(f"group_by must be one of: {', '.join(GROUP_BY_OPTIONS)}")
+
+        cache_key = ("breakdown", group_by, repo, since, until)
+        cached = stats_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        column = {
+            "repo": ReviewStat.repo_full_name,
+            "branch_type": ReviewStat.branch_type
+        }.get(group_by, ReviewStat.day)
+
+        query = self.db.query(column, ReviewStat.status, func.sum(ReviewStat.count))
+        if repo:
+            query = query.filter(ReviewStat.repo_full_name == repo)
+        if since:
+            query = query.filter(ReviewStat.day >= since)
+        if until:
+            query = query.filter(ReviewStat.day <= until)
+
+        # Weeks and months are folded from daily rows in Python, which keeps
+        # the query portable across databases
+        groups: Dict[Any, Dict[ReviewStatus, int]] = defaultdict(lambda: defaultdict(int))
+        for value, status, count in query.group_by(column, ReviewStat.status).all():
+            if group_by == "week":
+                value = value - timedelta(days=value.weekday())
+            elif group_by == "month":
+                value = value.replace(day=1)
+            groups[value][status] += int(count or 0)
+
+        breakdown = [
+            {"key": key.isoformat() if isinstance(key, date) else key, **_summarize(counts)}
+            for key, counts in sorted(groups.items())
+        ]
+        stats_cache.set(cache_key, breakdown, self.settings.stats_cache_ttl)
+        return breakdown
+
+    def rebuild(self):
+        """Recompute every counter from pr_reviews and the archive index with a single GROUP BY"""
+        reviews = union_all(*(
+            select(model.repo_full_name, model.branch_type, model.created_at, model.status)
+            for model in (PRReview, ArchivedReview)
+        )).subquery()
+        day = func.date(reviews.c.created_at)
+        self.db.query(ReviewStat).delete(synchronize_session=False)
+        self.db.execute(insert(ReviewStat).from_select(
+            ["repo_full_name", "branch_type", "day", "status", "count"],
+            select(
+                reviews.c.repo_full_name, reviews.c.branch_type, day, reviews.c.status, func.count()
+            ).group_by(reviews.c.repo_full_name, reviews.c.branch_type, day, reviews.c.status)
+        ))
+        self.db.commit()
+        stats_cache.clear()
+
+    @classmethod
+    def backfill(cls, db: Session):
+        """Build the counters for databases that predate review_stats"""
+        if db.query(ReviewStat).first() is None and db.query(PRReview.id).first() is not None:
+            cls(db).rebuild()
@@ -0,0 +1,45 @@
+"""
+Move reviews stored with inline feedback/expectations JSON into the
+compact layout (rule snapshots and interned feedback items).
+
+Run once after upgrading with `python -m app.services.review_storage`;
+reviews that were not converted keep working, they just stay larger.
+"""
+import logging
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models import PRReview, review_content_options
+
+logger = logging.getLogger(__name__)
+
+def compact_legacy_reviews(db: Session, batch_size: int = 500) -> int:
+    """Convert legacy reviews in batches, returning how many were converted"""
+    converted = 0
+    while True:
+        reviews = db.query(PRReview).options(*review_content_options()).filter(
+            or_(PRReview.feedback_hash.is_(None), PRReview.rule_snapshot_hash.is_(None))
+        ).order_by(PRReview.id).limit(batch_size).all()
+        if not reviews:
+            return converted
+
+        for review in reviews:
+            # Reassigning through the properties stores the compact form
+            # and clears the legacy column
+            feedback, expectations = review.review_feedback, review.expectations_applied
+            review.review_feedback = feedback
+            review.expectations_applied = expectations
+
+        db.commit()
+        converted += len(reviews)
+        logger.info("Compacted %d reviews", converted)
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    with SessionLocal() as db:
+        compact_legacy_reviews(db)
+
+if __name__ == "__main__":
+    main()
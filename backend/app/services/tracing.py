@@ -0,0 +1,204 @@
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+class Span:
+    """One timed operation of a trace"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+# Current span of this task or thread; _UNSAMPLED marks a trace that was
+# not sampled, so its children are skipped too
+_UNSAMPLED = object()
+_current: ContextVar[Any] = ContextVar("current_span", default=None)
+
+def _attribute_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+class SpanExporter:
+    """
+    Writes finished spans in the OpenTelemetry OTLP/JSON format.
+
+    Spans are batched by a background thread and appended to a file (one
+    export request per line) and/or posted to a collector's OTLP/HTTP
+    endpoint. Recording a span only puts it on a bounded queue; when the
+    exporter falls behind, new spans are dropped rather than slowing the
+    request down.
+    """
+
+    def __init__(
+        self,
+        file_path: Optional[str] = None,
+        url: Optional[str] = None,
+        service_name: str = "pr-review-system",
+        batch_size: int = 512,
+        interval: float = 2.0,
+        queue_size: int = 20_000
+    ):
+        self.file_path = file_path
+        self.url = url
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def submit(self, span: Span):
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def shutdown(self, timeout: float = 5.0):
+        """Export what is queued and stop the thread"""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch: List[Span] = []
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.batch_size:
+                try:
+                    span = self._queue.get(timeout=max(deadline - time.monotonic(), 0.001))
+                except queue.Empty:
+                    break
+                if span is None:
+                    stopping = True
+                    break
+                batch.append(span)
+
+            if batch:
+                try:
+                    self._export(batch)
+                except Exception:
+                    logger.exception("Exporting %d spans failed", len(batch))
+
+    def _export(self, spans: List[Span]):
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": self.service_name}}
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": "app.services.tracing"},
+                    "spans": [self._otlp_span(span) for span in spans]
+                }]
+            }]
+        }
+        if self.file_path:
+            with open(self.file_path, "a") as f:
+                f.write(json.dumps(request, separators=(",", ":")) + "\n")
+        if self.url:
+            import httpx  # only needed when exporting over HTTP
+            httpx.post(self.url, json=request, timeout=5.0).raise_for_status()
+
+    @staticmethod
+    def _otlp_span(span: Span) -> Dict[str, Any]:
+        otlp = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [{"key": key, "value": _attribute_value(value)} for key, value in span.attributes.items()],
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+        }
+        if span.parent_id:
+            otlp["parentSpanId"] = span.parent_id
+        return otlp
+
+class Tracer:
+    """
+    Records nested spans through a context variable, so spans opened in
+    asyncio tasks and to_thread calls attach to the span that started them.
+    Without an exporter every span is a no-op.
+    """
+
+    def __init__(self, exporter: Optional[SpanExporter] = None, sample_ratio: float = 1.0):
+        self.exporter = exporter
+        self.sample_ratio = sample_ratio
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        if self.exporter is None:
+            yield None
+            return
+
+        parent = _current.get()
+        if parent is _UNSAMPLED or (parent is None and random.random() >= self.sample_ratio):
+            token = _current.set(_UNSAMPLED)
+            try:
+                yield None
+            finally:
+                _current.reset(token)
+            return
+
+        if parent is None:
+            span = Span(name, os.urandom(16).hex(), None, attributes)
+        else:
+            span = Span(name, parent.trace_id, parent.span_id, attributes)
+
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = repr(e)
+            raise
+        finally:
+            _current.reset(token)
+            span.end_ns = time.time_ns()
+            self.exporter.submit(span)
+
+_tracer: Optional[Tracer] = None
+
+def get_tracer() -> Tracer:
+    """Process-wide tracer, exporting only when TRACE_EXPORT_FILE or TRACE_EXPORT_URL is set"""
+    global _tracer
+    if _tracer is None:
+        settings = get_settings()
+        exporter = None
+        if settings.trace_export_file or settings.trace_export_url:
+            exporter = SpanExporter(settings.trace_export_file, settings.trace_export_url)
+        _tracer = Tracer(exporter, settings.trace_sample_ratio)
+    return _tracer
+
+def shutdown_tracer():
+    global _tracer
+    if _tracer is not None and _tracer.exporter is not None:
+        _tracer.exporter.shutdown()
+    _tracer = None
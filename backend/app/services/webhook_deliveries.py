@@ -0,0 +1,39 @@
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from ..config import get_settings
+
+class SeenDeliveries:
+    """
+    Bounded in-process set of recently queued X-GitHub-Delivery ids.
+
+    GitHub redeliveries reuse the original id. Recent ones are answered
+    from here; older ones, and those queued by other API processes, are
+    caught by the unique index on background_jobs.delivery_id.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._ids: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, delivery_id: str) -> bool:
+        with self._lock:
+            return delivery_id in self._ids
+
+    def add(self, delivery_id: str):
+        with self._lock:
+            self._ids[delivery_id] = None
+            self._ids.move_to_end(delivery_id)
+            while len(self._ids) > self.max_size:
+                self._ids.popitem(last=False)
+
+_seen_deliveries: Optional[SeenDeliveries] = None
+
+def get_seen_deliveries() -> SeenDeliveries:
+    """Process-wide set shared by every webhook request"""
+    global _seen_deliveries
+    if _seen_deliveries is None:
+        _seen_deliveries = SeenDeliveries(get_settings().webhook_seen_deliveries)
+    return _seen_deliveries
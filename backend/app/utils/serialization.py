@@ -0,0 +1,16 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded with orjson, for content built from database rows.
+
+    Datetimes, enums and nested dicts are encoded natively, with no
+    jsonable_encoder pass. UTC timestamps end in "Z", as in Pydantic's
+    output, so responses match the validated path.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
@@ -0,0 +1,44 @@
+"""
+Standalone job worker.
+
+Run with `python -m app.worker` to process queued jobs outside the API
+process (set RUN_WORKER_IN_PROCESS=false on the API in that case). The
+schema must be up to date; run `python -m app.migrate` first.
+"""
+import asyncio
+import logging
+
+from prometheus_client import start_http_server
+
+from .config import get_settings
+from .database import init_db, dispose_db
+from .services.job_worker import JobWorker
+from .services import review_events  # noqa: F401 - records review changes for the live feed
+from .services.github_client import close_github_client
+from .services.analysis_pool import shutdown_analysis_executor
+from .services.tracing import shutdown_tracer
+
+async def run():
+    try:
+        await JobWorker().run_forever()
+    finally:
+        await close_github_client()
+        shutdown_analysis_executor()
+        shutdown_tracer()
+        await dispose_db()
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    settings = get_settings()
+    if settings.worker_metrics_port:
+        # Job and stage metrics; queue depth is reported by the API's /metrics
+        start_http_server(settings.worker_metrics_port)
+    init_db(settings)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Micro-benchmark for branch rule lookup.
+
+Compares the compiled BranchRuleMatcher with the previous approach (scan
+every rule and build a regex per rule on each call).
+
+    cd backend && python -m benchmarks.bench_branch_rules --rules 5000
+"""
+import argparse
+import random
+import re
+import time
+from types import SimpleNamespace
+
+from app.services.branch_rules import BranchRuleMatcher
+
+def make_rules(count: int):
+    rules = [
+        SimpleNamespace(branch_pattern="main", description="main", expectations={}),
+        SimpleNamespace(branch_pattern="develop", description="develop", expectations={}),
+        SimpleNamespace(branch_pattern="default", description="default", expectations={}),
+    ]
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            pattern = f"team{i}/*"
+        elif kind == 1:
+            pattern = f"release-{i}"
+        else:
+            pattern = f"lab{i}/*/final"
+        rules.append(SimpleNamespace(branch_pattern=pattern, description=pattern, expectations={"n": i}))
+    return rules
+
+def make_branches(count: int, rule_count: int):
+    branches = []
+    for _ in range(count):
+        i = random.randrange(rule_count)
+        kind = i % 3
+        if kind == 0:
+            branches.append(f"team{i}/add-login-form")
+        elif kind == 1:
+            branches.append(f"release-{i}")
+        else:
+            branches.append(f"lab{i}/student/final")
+    branches.append("some-unmatched-branch")
+    return branches
+
+def legacy_lookup(rules, branch_name):
+    for rule in rules:
+        if rule.branch_pattern == branch_name:
+            return rule.branch_pattern
+    for rule in rules:
+        if '*' in rule.branch_pattern:
+            pattern = rule.branch_pattern.replace("*", ".*")
+            if re.match(f"^{pattern}$", branch_name):
+                return rule.branch_pattern
+    return "default"
+
+def timed(fn, branches):
+    start = time.perf_counter()
+    for branch in branches:
+        fn(branch)
+    return (time.perf_counter() - start) / len(branches)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rules", type=int, default=5000)
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(42)
+    rules = make_rules(args.rules)
+    branches = make_branches(args.lookups, args.rules)
+
+    start = time.perf_counter()
+    matcher = BranchRuleMatcher(rules)
+    build_time = time.perf_counter() - start
+
+    compiled = timed(lambda b: matcher.match(b) or matcher.default, branches)
+    legacy = timed(lambda b: legacy_lookup(rules, b), branches)
+
+    print(f"rules: {len(rules)}, lookups: {len(branches)}")
+    print(f"matcher build:   {build_time * 1000:10.2f} ms (once per rule version)")
+    print(f"legacy lookup:   {legacy * 1e6:10.1f} us/lookup")
+    print(f"compiled lookup: {compiled * 1e6:10.1f} us/lookup")
+    print(f"speedup:         {legacy / compiled:10.1f}x")
+
+if __name__ == "__main__":
+    main()
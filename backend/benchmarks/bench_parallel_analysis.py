@@ -0,0 +1,82 @@
+"""
+Benchmark for parallel per-file patch analysis.
+
+Times inline analysis against the chunked process pool for PRs of
+increasing size, to pick ANALYSIS_PARALLEL_MIN_BYTES (the crossover point).
+
+    cd backend && python -m benchmarks.bench_parallel_analysis --workers 4
+"""
+import argparse
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from app.services.analysis_pool import analyze_chunk, chunk_files
+from app.services.patch_rules import get_patch_analyzer
+
+def make_file_patch(lines: int) -> str:
+    out = [f"@@ -1,{lines} +1,{lines} @@"]
+    for i in range(lines):
+        if random.random() < 0.5:
+            out.append(f"+  const item{i} = await fetchItem(id{i}); // retry handled upstream")
+        else:
+            out.append(f"   render(item{i});")
+    out.append("+  // TODO: cache the response")
+    return "\n".join(out)
+
+def make_pr(total_bytes: int, file_bytes: int = 40_000):
+    files = []
+    size = 0
+    while size < total_bytes:
+        patch = make_file_patch(file_bytes // 60)
+        files.append((f"src/module{len(files)}.js", patch))
+        size += len(patch)
+    return files
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--chunk-bytes", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    random.seed(42)
+    analyzer = get_patch_analyzer()
+    sizes = [100_000, 500_000, 1_000_000, 2_000_000, 5_000_000, 10_000_000, 20_000_000, 50_000_000]
+
+    with ProcessPoolExecutor(args.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        # Warm up the workers so process start-up is not counted
+        list(pool.map(analyze_chunk, [analyzer] * args.workers, [[]] * args.workers))
+
+        print(f"workers: {args.workers}, chunk: {args.chunk_bytes} bytes")
+        print(f"{'PR size':>10} {'files':>6} {'inline ms':>10} {'pool ms':>10} {'speedup':>8}")
+        crossover = None
+        for total in sizes:
+            files = make_pr(total)
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                inline_result = analyze_chunk(analyzer, files)
+            inline = (time.perf_counter() - start) / args.repeat
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                chunks = chunk_files(files, args.chunk_bytes)
+                pooled_result = []
+                for result in pool.map(analyze_chunk, [analyzer] * len(chunks), chunks):
+                    pooled_result.extend(result)
+            pooled = (time.perf_counter() - start) / args.repeat
+
+            assert pooled_result == inline_result
+            if crossover is None and pooled < inline:
+                crossover = total
+            print(f"{total / 1e6:>8.1f}MB {len(files):>6} {inline * 1000:>10.1f} {pooled * 1000:>10.1f} {inline / pooled:>7.2f}x")
+
+    if crossover:
+        print(f"pool is faster from ~{crossover / 1e6:.1f} MB of patches")
+    else:
+        print("pool was not faster at any tested size")
+
+if __name__ == "__main__":
+    main()
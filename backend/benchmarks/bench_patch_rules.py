@@ -0,0 +1,69 @@
+"""
+Benchmark for patch analysis.
+
+Compares the keyword-indexed PatchAnalyzer with the previous checks (one
+substring scan per rule plus lowercased copies of the patch).
+
+    cd backend && python -m benchmarks.bench_patch_rules --lines 200000
+"""
+import argparse
+import random
+import time
+
+from app.services.patch_rules import get_patch_analyzer
+
+def make_patch(lines: int) -> str:
+    out = []
+    new_line = 1
+    for hunk in range(lines // 50):
+        out.append(f"@@ -{new_line},50 +{new_line},50 @@ function block{hunk}() {{")
+        for i in range(50):
+            kind = random.random()
+            if kind < 0.45:
+                out.append(f"+    const value{i} = compute(value{i - 1}, options);")
+            elif kind < 0.55:
+                out.append(f"-    const value{i} = legacyCompute(value{i - 1});")
+            else:
+                out.append(f"     return render(value{i}, props.children);")
+        new_line += 50
+    out.append("+    // TODO: remove once the API is stable")
+    out.append("+    try {")
+    return "\n".join(out)
+
+def legacy_checks(patch: str) -> int:
+    issues = 0
+    if 'console.log' in patch:
+        issues += 1
+    if 'TODO' in patch or 'FIXME' in patch:
+        issues += 1
+    if 'try' in patch.lower():
+        if 'except' not in patch.lower() and 'catch' not in patch.lower():
+            issues += 1
+    return issues
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(42)
+    patch = make_patch(args.lines)
+    analyzer = get_patch_analyzer()
+
+    legacy = timed(lambda: legacy_checks(patch), args.repeat)
+    indexed = timed(lambda: analyzer.analyze("bundle.js", patch), args.repeat)
+
+    print(f"patch: {len(patch) / 1e6:.1f} MB, {args.lines} lines, {len(analyzer.rules)} rules")
+    print(f"legacy checks: {legacy * 1000:8.2f} ms/patch")
+    print(f"keyword index: {indexed * 1000:8.2f} ms/patch")
+    print(f"speedup:       {legacy / indexed:8.2f}x")
+
+if __name__ == "__main__":
+    main()
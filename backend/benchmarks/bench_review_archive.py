@@ -0,0 +1,178 @@
+"""
+Retention benchmark: review queries on a table holding every semester of
+reviews against the same queries once the old ones are archived.
+
+Loads synthetic reviews spread over --days days into a temporary SQLite
+database; all but the most recent are posted, rejected or superseded.
+Then:
+
+- times the dashboard's list queries over ASGI in-process (newest page,
+  pending queue, by repo, by author, by branch type)
+- archives reviews older than --retention-days, reporting throughput
+  and the database and archive file sizes
+- times the same queries again, and detail fetches of live and archived
+  reviews; archived details must equal what the API returned before
+
+    cd backend && python -m benchmarks.bench_review_archive --reviews 200000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+# Settings are cached on first use
+ARCHIVE_DIR = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ.setdefault("GITHUB_TOKEN", "bench")
+os.environ.setdefault("GITHUB_WEBHOOK_SECRET", "bench")
+os.environ["RUN_WORKER_IN_PROCESS"] = "false"
+os.environ["METRICS_ENABLED"] = "false"
+os.environ["REVIEW_ARCHIVE_DIR"] = ARCHIVE_DIR
+
+import httpx
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.main import create_app
+from app.database import Base, get_async_db
+from app.models import PRReview, ArchivedReview, utcnow
+from app.services.review_archive import ReviewArchiver
+from .bench_review_storage import load_compact, make_reviews, table_sizes
+
+FINAL_STATUSES = ("POSTED", "REJECTED", "SUPERSEDED")
+QUERY_RUNS = 20
+
+def spread_reviews(count: int, days: int):
+    """make_reviews, spread evenly over the last `days` days; the last two weeks are still pending"""
+    now = utcnow()
+    for i, review in enumerate(make_reviews(count)):
+        created_at = now - timedelta(days=days) + timedelta(days=days) * i / count
+        review["created_at"] = created_at
+        review["status"] = "PENDING" if now - created_at < timedelta(days=14) else random.choice(FINAL_STATUSES)
+        yield review
+
+def hot_queries():
+    return {
+        "newest page": {},
+        "pending queue": {"status": "pending"},
+        "by repo": {"repo": "class-7/project-107"},
+        "by author": {"author": "student42"},
+        "by branch type": {"branch_type": "hotfix"},
+    }
+
+async def time_queries(client: httpx.AsyncClient):
+    """Median ms of each list query"""
+    results = {}
+    for name, params in hot_queries().items():
+        timings = []
+        for _ in range(QUERY_RUNS):
+            start = time.perf_counter()
+            response = await client.get("/api/reviews", params={"limit": 50, **params})
+            timings.append(time.perf_counter() - start)
+            response.raise_for_status()
+        results[name] = statistics.median(timings) * 1000
+    return results
+
+async def time_details(client: httpx.AsyncClient, ids, expected=None):
+    """Median ms of detail fetches; checks them against expected when given"""
+    timings, bodies = [], {}
+    for review_id in ids:
+        start = time.perf_counter()
+        response = await client.get(f"/api/reviews/{review_id}")
+        timings.append(time.perf_counter() - start)
+        response.raise_for_status()
+        bodies[review_id] = response.json()
+        if expected is not None:
+            assert bodies[review_id] == expected[review_id], f"review {review_id} differs after archiving"
+    return statistics.median(timings) * 1000, bodies
+
+def database_bytes(engine) -> int:
+    with engine.connect() as connection:
+        connection.exec_driver_sql("VACUUM")
+    return sum(table_sizes(engine).values())
+
+async def run(args, path: str):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    random.seed(42)
+    load_compact(engine, spread_reviews(args.reviews, args.days))
+    size_before = database_bytes(engine)
+
+    cutoff = utcnow() - timedelta(days=args.retention_days)
+    with engine.connect() as connection:
+        old_ids = [row.id for row in connection.execute(
+            select(PRReview.id).where(PRReview.created_at < cutoff, PRReview.status.in_(FINAL_STATUSES))
+        )]
+        live_ids = [row.id for row in connection.execute(select(PRReview.id).where(PRReview.created_at >= cutoff))]
+    sample_old = random.sample(old_ids, min(200, len(old_ids)))
+    sample_live = random.sample(live_ids, min(200, len(live_ids)))
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def get_db():
+        async with session_factory() as session:
+            yield session
+
+    app = create_app()
+    app.dependency_overrides[get_async_db] = get_db
+    results = {"reviews": args.reviews, "size_before": size_before}
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            await time_queries(client)  # warm up
+            results["queries_before"] = await time_queries(client)
+            results["old_before"], expected = await time_details(client, sample_old)
+            results["live_before"], _ = await time_details(client, sample_live)
+
+            start = time.perf_counter()
+            with Session(engine) as db:
+                results["archived"] = ReviewArchiver(db, ARCHIVE_DIR).archive(cutoff)
+            results["archive_seconds"] = time.perf_counter() - start
+            await async_engine.dispose()
+
+            results["queries_after"] = await time_queries(client)
+            results["old_after"], _ = await time_details(client, sample_old, expected)
+            results["live_after"], _ = await time_details(client, sample_live)
+    finally:
+        await async_engine.dispose()
+
+    results["size_after"] = database_bytes(engine)
+    results["archive_bytes"] = sum(
+        os.path.getsize(os.path.join(ARCHIVE_DIR, name)) for name in os.listdir(ARCHIVE_DIR)
+    )
+    with engine.connect() as connection:
+        results["files"] = connection.execute(text(
+            f"SELECT COUNT(DISTINCT archive_file) FROM {ArchivedReview.__tablename__}"
+        )).scalar()
+    engine.dispose()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reviews", type=int, default=200_000)
+    parser.add_argument("--days", type=int, default=730, help="Span of creation dates")
+    parser.add_argument("--retention-days", type=int, default=120)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = asyncio.run(run(args, os.path.join(directory, "reviews.db")))
+
+    mb = 1024 * 1024
+    print(f"{results['reviews']:,} reviews over {args.days} days, retention {args.retention_days} days")
+    print(f"archived {results['archived']:,} in {results['archive_seconds']:.1f} s "
+          f"({results['archived'] / results['archive_seconds']:,.0f}/s) into {results['files']} files")
+    print(f"database {results['size_before'] / mb:.1f} MB -> {results['size_after'] / mb:.1f} MB, "
+          f"archive files {results['archive_bytes'] / mb:.1f} MB")
+    print("list queries (median ms)     before    after")
+    for name, before in results["queries_before"].items():
+        print(f"  {name:24s}  {before:8.2f} {results['queries_after'][name]:8.2f}")
+    print(f"  {'detail, live review':24s}  {results['live_before']:8.2f} {results['live_after']:8.2f}")
+    print(f"  {'detail, archived review':24s}  {results['old_before']:8.2f} {results['old_after']:8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Serialization benchmark for the review list endpoint: the validated path
+(ORM rows or column tuples through response_model and the stdlib JSON
+encoder) against FAST_SERIALIZATION (dicts from column tuples, encoded
+with orjson).
+
+For each size, loads that many synthetic reviews into a temporary SQLite
+database, then:
+
+- pages through all of them with GET /api/reviews (limit 200), with and
+  without include_details, in both modes, over ASGI in-process
+- serializes the list projection of all rows in one go, to isolate the
+  per-row validation and encoding from the queries
+
+Both modes must return the same JSON; the first page of each is compared.
+
+    cd backend && python -m benchmarks.bench_review_serialization --reviews 1000,10000,100000
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import tempfile
+import time
+
+# Settings are cached on first use
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ.setdefault("GITHUB_TOKEN", "bench")
+os.environ.setdefault("GITHUB_WEBHOOK_SECRET", "bench")
+os.environ["RUN_WORKER_IN_PROCESS"] = "false"
+os.environ["METRICS_ENABLED"] = "false"
+
+import httpx
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.main import create_app
+from app.config import get_settings
+from app.database import Base, get_async_db
+from app.routes.reviews import LIST_COLUMNS, get_all_reviews
+from app.utils.serialization import FastJSONResponse
+from .bench_review_storage import load_compact, make_reviews
+
+PAGE_SIZE = 200
+
+# The database dependency is overridden per size, so the lifespan never runs
+app = create_app()
+
+async def page_through(client: httpx.AsyncClient, include_details: bool):
+    """Fetch every page; returns (seconds, rows, first page)"""
+    params = {"limit": PAGE_SIZE, "include_details": str(include_details).lower()}
+    rows, first = 0, None
+    start = time.perf_counter()
+    while True:
+        response = await client.get("/api/reviews", params=params)
+        response.raise_for_status()
+        page = response.json()
+        rows += len(page)
+        first = first if first is not None else page
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        params["cursor"] = cursor
+    return time.perf_counter() - start, rows, first
+
+async def serialize_all(session_factory):
+    """Seconds to serialize every list row at once, validated and fast"""
+    async with session_factory() as db:
+        rows = (await db.execute(select(*LIST_COLUMNS))).all()
+
+    route = next(route for route in app.routes if getattr(route, "endpoint", None) is get_all_reviews)
+    # Collect up front so neither timing pays for the other's garbage
+    gc.collect()
+    start = time.perf_counter()
+    content = await serialize_response(field=route.response_field, response_content=rows, is_coroutine=True)
+    validated_body = JSONResponse(content).body
+    validated = time.perf_counter() - start
+
+    gc.collect()
+    start = time.perf_counter()
+    fast_body = FastJSONResponse([row._asdict() for row in rows]).body
+    fast = time.perf_counter() - start
+
+    assert json.loads(validated_body) == json.loads(fast_body), "list payloads differ"
+    return validated, fast
+
+async def run_size(count: int, directory: str):
+    path = os.path.join(directory, f"reviews-{count}.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    random.seed(42)
+    load_compact(engine, make_reviews(count))
+    engine.dispose()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = get_db
+    settings = get_settings()
+    results = {}
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            # Warm up both paths before timing either
+            for fast in (False, True):
+                settings.fast_serialization = fast
+                await client.get("/api/reviews", params={"limit": 1, "include_details": "true"})
+            for include_details in (False, True):
+                pages = {}
+                for fast in (False, True):
+                    settings.fast_serialization = fast
+                    pages[fast] = await page_through(client, include_details)
+                assert pages[False][2] == pages[True][2], "first pages differ"
+                results["details" if include_details else "list"] = (pages[False][:2], pages[True][:2])
+        results["serialize"] = await serialize_all(session_factory)
+    finally:
+        settings.fast_serialization = False
+        app.dependency_overrides.pop(get_async_db, None)
+        await async_engine.dispose()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reviews", default="1000,10000,100000", help="Comma-separated database sizes")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for count in (int(size) for size in args.reviews.split(",")):
+            results = asyncio.run(run_size(count, directory))
+            print(f"\n{count:,} reviews")
+            for mode in ("list", "details"):
+                (validated, rows), (fast, _) = results[mode]
+                print(f"  paging ({mode:7s}, {rows // PAGE_SIZE + (rows % PAGE_SIZE > 0)} pages): "
+                      f"validated {validated:7.2f} s ({rows / validated:8,.0f} rows/s), "
+                      f"fast {fast:7.2f} s ({rows / fast:8,.0f} rows/s), {validated / fast:4.1f}x")
+            validated, fast = results["serialize"]
+            print(f"  serialize list rows only:  validated {validated * 1000:8.1f} ms, "
+                  f"fast {fast * 1000:8.1f} ms, {validated / fast:4.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Storage benchmark for review feedback and expectations.
+
+Loads the same synthetic reviews into two SQLite databases: one with the
+legacy layout (full feedback and expectations JSON on every pr_reviews
+row) and one with rule snapshots plus interned feedback items, then
+compares the on-disk size of each and the bytes rewritten when a review
+is re-run with unchanged feedback.
+
+    cd backend && DATABASE_URL=sqlite:// python -m benchmarks.bench_review_storage --reviews 1000000
+
+Rows are bulk-inserted with Core statements that mirror what the ORM
+listener writes, so a million reviews load in minutes. Summaries are left
+empty in both layouts since their storage did not change.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, text
+
+from app.database import Base
+from app.models import (
+    PRReview, RuleSnapshot, FeedbackTemplate, ReviewFeedbackEntry, content_hash, _template_hash
+)
+from app.services.branch_rules import BranchRulesService
+from app.services.patch_rules import DEFAULT_PATCH_RULES
+
+BATCH = 20_000
+
+def expectations_by_type():
+    return {
+        pattern.rstrip("/*"): {
+            "branch_type": pattern.rstrip("/*"),
+            "description": rule["description"],
+            **rule["expectations"]
+        }
+        for pattern, rule in BranchRulesService.DEFAULT_RULES.items()
+    }
+
+def make_feedback(expectations):
+    """Feedback shaped like ReviewEngine.analyze_pr output"""
+    items = []
+    description_length = random.randint(0, 200)
+    min_length = expectations.get("min_description_length", 30)
+    if description_length < min_length:
+        items.append({
+            "category": "Description", "severity": "warning",
+            "message": f"PR description is too short ({description_length} chars). "
+                       f"Expected at least {min_length} characters.",
+            "line_number": None, "file_path": None
+        })
+    else:
+        items.append({
+            "category": "Description", "severity": "info",
+            "message": "PR description meets length requirements.",
+            "line_number": None, "file_path": None
+        })
+
+    for _ in range(random.choice([0, 0, 1, 2, 3])):
+        rule = random.choice(DEFAULT_PATCH_RULES)
+        items.append({
+            "category": rule.category, "severity": rule.severity, "message": rule.message,
+            "line_number": random.randint(1, 400),
+            "file_path": f"src/module{random.randint(1, 60)}/file{random.randint(1, 40)}.js"
+        })
+
+    if expectations.get("require_tests"):
+        if random.random() < 0.4:
+            items.append({
+                "category": "Testing", "severity": "error",
+                "message": "No test files found. Tests are required for this branch type.",
+                "line_number": None, "file_path": None
+            })
+        else:
+            items.append({
+                "category": "Testing", "severity": "info", "message": "Test files included ✓",
+                "line_number": None, "file_path": None
+            })
+
+    for check in expectations.get("checks", []):
+        items.append({
+            "category": "Best Practices", "severity": "info", "message": f"Verify: {check}",
+            "line_number": None, "file_path": None
+        })
+    return items
+
+def make_reviews(count):
+    rule_sets = list(expectations_by_type().values())
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        expectations = random.choice(rule_sets)
+        yield {
+            "pr_number": i % 500 + 1,
+            "repo_full_name": f"class-{i % 40}/project-{i % 300}",
+            "branch_name": f"{expectations['branch_type']}/task-{i % 97}",
+            "branch_type": expectations["branch_type"],
+            "pr_title": f"Implement task {i % 97}",
+            "pr_author": f"student{i % 2000}",
+            "review_summary": "",
+            "status": "PENDING",
+            "created_at": start + timedelta(seconds=i * 30),
+            "pr_url": f"https://github.com/class-{i % 40}/project-{i % 300}/pull/{i % 500 + 1}",
+            "commit_sha": f"{i:040x}",
+            "feedback": make_feedback(expectations),
+            "expectations": expectations,
+        }
+
+def load_legacy(engine, reviews):
+    rows = []
+    with engine.begin() as connection:
+        for review_id, review in enumerate(reviews, 1):
+            row = {k: v for k, v in review.items() if k not in ("feedback", "expectations")}
+            row.update(id=review_id, review_feedback=review["feedback"], expectations_applied=review["expectations"])
+            rows.append(row)
+            if len(rows) >= BATCH:
+                connection.execute(insert(PRReview.__table__), rows)
+                rows = []
+        if rows:
+            connection.execute(insert(PRReview.__table__), rows)
+
+def load_compact(engine, reviews):
+    snapshots, templates = {}, {}
+    rows, entries = [], []
+
+    def flush(connection):
+        connection.execute(insert(PRReview.__table__), rows)
+        if entries:
+            connection.execute(insert(ReviewFeedbackEntry.__table__), entries)
+        rows.clear()
+        entries.clear()
+
+    with engine.begin() as connection:
+        for review_id, review in enumerate(reviews, 1):
+            snapshot_hash = content_hash(review["expectations"])
+            if snapshot_hash not in snapshots:
+                snapshots[snapshot_hash] = review["expectations"]
+                connection.execute(insert(RuleSnapshot.__table__), [{"hash": snapshot_hash, "expectations": review["expectations"]}])
+
+            row = {k: v for k, v in review.items() if k not in ("feedback", "expectations")}
+            row.update(id=review_id, rule_snapshot_hash=snapshot_hash, feedback_hash=content_hash(review["feedback"]))
+            rows.append(row)
+
+            for position, item in enumerate(review["feedback"]):
+                template_hash = _template_hash(item)
+                if template_hash not in templates:
+                    templates[template_hash] = len(templates) + 1
+                    connection.execute(insert(FeedbackTemplate.__table__), [{
+                        "id": templates[template_hash], "hash": template_hash, "category": item["category"],
+                        "severity": item["severity"], "message": item["message"]
+                    }])
+                entries.append({
+                    "review_id": review_id, "position": position, "template_id": templates[template_hash],
+                    "line_number": item["line_number"], "file_path": item["file_path"]
+                })
+
+            if len(rows) >= BATCH:
+                flush(connection)
+        if rows:
+            flush(connection)
+    return len(snapshots), len(templates)
+
+def table_sizes(engine):
+    with engine.connect() as connection:
+        return dict(connection.execute(text("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name")).all())
+
+def rewrite_bytes(review):
+    """Bytes of review content rewritten when a review is re-run unchanged"""
+    legacy = len(json.dumps(review["feedback"])) + len(json.dumps(review["expectations"]))
+    # Compact layout: same feedback hash and snapshot hash, nothing rewritten
+    return legacy, 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reviews", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = {}
+        for layout, loader in (("legacy", load_legacy), ("compact", load_compact)):
+            random.seed(42)
+            engine = create_engine(f"sqlite:///{os.path.join(directory, layout)}.db")
+            Base.metadata.create_all(engine)
+
+            start = time.perf_counter()
+            extra = loader(engine, make_reviews(args.reviews))
+            elapsed = time.perf_counter() - start
+
+            with engine.connect() as connection:
+                connection.exec_driver_sql("VACUUM")
+            results[layout] = (table_sizes(engine), elapsed, extra)
+            engine.dispose()
+
+    random.seed(42)
+    sample = [rewrite_bytes(review) for review in make_reviews(min(args.reviews, 10_000))]
+    legacy_rewrite = sum(legacy for legacy, _ in sample) / len(sample)
+
+    print(f"reviews: {args.reviews:,}")
+    for layout, (sizes, elapsed, extra) in results.items():
+        total = sum(sizes.values())
+        review_tables = {name: size for name, size in sizes.items() if size and name != "sqlite_schema"}
+        print(f"\n{layout} layout: {total / 1e6:,.1f} MB ({total / args.reviews:,.0f} B/review), loaded in {elapsed:,.1f} s")
+        if extra:
+            print(f"  rule snapshots: {extra[0]}, feedback templates: {extra[1]}")
+        for name, size in sorted(review_tables.items(), key=lambda item: -item[1])[:8]:
+            print(f"  {name:40s} {size / 1e6:10.1f} MB")
+
+    legacy_total = sum(results["legacy"][0].values())
+    compact_total = sum(results["compact"][0].values())
+    print(f"\nsize reduction: {(1 - compact_total / legacy_total) * 100:.1f}%")
+    print(f"content rewritten by an unchanged re-review: {legacy_rewrite:,.0f} B (legacy) vs 0 B (compact)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Startup benchmark for the API and worker processes.
+
+Each measurement runs in a fresh interpreter, as a new uvicorn worker or
+reload would:
+
+- import time of app.main and app.worker, and the number of modules loaded
+- time to first request: from starting uvicorn to the first 200 from /health
+
+The database is a temporary SQLite file, migrated to head before timing
+starts. Pass --no-migrate for trees that still create tables themselves,
+and --in-process-worker to include starting the job worker.
+
+    cd backend && python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+IMPORT_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start, len(sys.modules))
+"""
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def time_import(module: str, env) -> tuple:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET.format(module=module)],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout.split()
+    return float(output[0]), int(output[1])
+
+def time_to_first_request(target: str, factory: bool, env, timeout: float = 60.0) -> float:
+    port = free_port()
+    command = [sys.executable, "-m", "uvicorn", target, "--port", str(port), "--log-level", "warning"]
+    if factory:
+        command.append("--factory")
+
+    start = time.perf_counter()
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(process.stderr.read().decode())
+            try:
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+                connection.request("GET", "/health")
+                if connection.getresponse().status == 200:
+                    return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.005)
+        raise TimeoutError("no response from /health")
+    finally:
+        process.terminate()
+        process.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target", default="app.main:create_app", help="uvicorn application")
+    parser.add_argument("--no-factory", dest="factory", action="store_false", help="target is an app, not a factory")
+    parser.add_argument("--no-migrate", dest="migrate", action="store_false")
+    parser.add_argument("--in-process-worker", action="store_true", help="start the job worker with the API")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{directory}/startup.db",
+        GITHUB_TOKEN="startup",
+        GITHUB_WEBHOOK_SECRET="startup",
+        RUN_WORKER_IN_PROCESS=str(args.in_process_worker).lower(),
+        PYTHONDONTWRITEBYTECODE="0",
+    )
+    env.pop("DATABASE_ASYNC_URL", None)
+    if args.migrate:
+        subprocess.run([sys.executable, "-m", "app.migrate"], env=env, check=True)
+
+    # One untimed round so every measurement reads compiled bytecode
+    time_import("app.main", env)
+    time_import("app.worker", env)
+
+    results = {"import app.main": [], "import app.worker": [], "first request": []}
+    modules = {}
+    for _ in range(args.runs):
+        for module in ("app.main", "app.worker"):
+            seconds, modules[module] = time_import(module, env)
+            results[f"import {module}"].append(seconds)
+        results["first request"].append(time_to_first_request(args.target, args.factory, env))
+
+    for name, values in results.items():
+        module = name.split(" ")[-1]
+        loaded = f", {modules[module]} modules" if module in modules else ""
+        print(f"{name:18s} median {statistics.median(values) * 1000:7.1f} ms, "
+              f"min {min(values) * 1000:7.1f} ms{loaded}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Load test of the webhook pipeline: /webhook/github -> job queue ->
+ReviewEngine -> database, against a local fake GitHub API.
+
+Replays a webhook trace (generated, or loaded with --trace) at its own
+pace, as signed deliveries. Sends are open-loop: latency is measured
+from each delivery's scheduled time, so a slow server cannot hide its
+queueing. The API runs in-process over ASGI with its job workers, while
+the fake GitHub is served over HTTP on localhost. Reports:
+
+- webhook latency p50/p95/p99
+- end-to-end latency, from the delivery of a commit to its stored review
+- database queries per webhook, and worker queries per review (including
+  queue polling)
+- GitHub calls per review
+
+    cd backend && python -m benchmarks.bench_webhook_pipeline --rate 20 --duration 30
+    cd backend && python -m benchmarks.bench_webhook_pipeline --check
+
+--check compares the results with benchmarks/webhook_thresholds.json
+and exits with status 1 when any of them is exceeded. The thresholds
+were set for the default trace on SQLite. Pass --database-url to run
+against an empty Postgres database instead of a temporary SQLite file.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+import httpx
+from sqlalchemy import create_engine, event, func, select
+
+from .fake_github import FakeGitHub
+from .webhook_trace import generate_trace, load_trace, save_trace, webhook_payload, sign
+
+THRESHOLDS = os.path.join(os.path.dirname(__file__), "webhook_thresholds.json")
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))]
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+async def replay(client: httpx.AsyncClient, fake: FakeGitHub, events: List[Dict[str, Any]], speed: float, secret: str):
+    """Send every delivery at its offset; returns (latencies, statuses, send times by head SHA)"""
+    latencies, statuses, sent_at = [], Counter(), {}
+    start = time.perf_counter()
+
+    async def deliver(trace_event: Dict[str, Any]):
+        scheduled = start + trace_event["offset"] / speed
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+
+        if trace_event.get("head_sha"):
+            fake.push(trace_event["repo"], trace_event["number"], trace_event["head_sha"],
+                      trace_event["author"], trace_event["branch"])
+            sent_at[trace_event["head_sha"]] = datetime.now(timezone.utc).replace(tzinfo=None)
+
+        body = json.dumps(webhook_payload(trace_event)).encode()
+        try:
+            response = await client.post("/webhook/github", content=body, headers={
+                "Content-Type": "application/json",
+                "X-GitHub-Event": trace_event["event"],
+                "X-GitHub-Delivery": str(uuid.uuid4()),
+                "X-Hub-Signature-256": sign(body, secret),
+            })
+            statuses[response.status_code] += 1
+        except httpx.HTTPError as error:
+            statuses[type(error).__name__] += 1
+        latencies.append(time.perf_counter() - scheduled)
+
+    await asyncio.gather(*(deliver(trace_event) for trace_event in events))
+    return latencies, statuses, sent_at, time.perf_counter() - start
+
+async def wait_for_queue(engine, timeout: float) -> bool:
+    from app.models import BackgroundJob, JobStatus
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with engine.connect() as connection:
+            busy = connection.execute(select(func.count()).select_from(BackgroundJob).where(
+                BackgroundJob.status.in_([JobStatus.QUEUED, JobStatus.RUNNING])
+            )).scalar()
+        if not busy:
+            return True
+        await asyncio.sleep(0.25)
+    return False
+
+async def run(args, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # Settings are cached on first use, so the environment has to be
+    # complete before the app is imported
+    fake = FakeGitHub(latency=args.github_latency_ms / 1000)
+    os.environ["GITHUB_API_URL"] = fake.start()
+    # Never the deployment's own database or credentials
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/loadtest.db"
+    os.environ.pop("DATABASE_ASYNC_URL", None)
+    os.environ["GITHUB_TOKEN"] = "loadtest"
+    os.environ["GITHUB_WEBHOOK_SECRET"] = "loadtest-secret"
+    os.environ["RUN_WORKER_IN_PROCESS"] = "true"
+    os.environ["GITHUB_HTTP2"] = "false"
+    os.environ["REVIEW_DEBOUNCE_SECONDS"] = str(args.debounce)
+
+    from app.main import create_app
+    from app.config import get_settings
+    from app.database import get_engine, get_async_engine
+    from app.migrate import upgrade_database
+    from app.models import PRReview, BackgroundJob
+    from app.routes.webhook import verify_signature
+
+    settings = get_settings()
+    assert verify_signature(b"{}", sign(b"{}", settings.github_webhook_secret))
+    upgrade_database(settings)
+    app = create_app(settings)
+
+    try:
+        async with app.router.lifespan_context(app):
+            # The API uses the async engine and the workers the sync one; the
+            # harness reads results over its own engine so it is not counted
+            api_queries, worker_queries = QueryCounter(get_async_engine().sync_engine), QueryCounter(get_engine())
+            results_engine = create_engine(settings.database_url)
+
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest") as client:
+                latencies, statuses, sent_at, elapsed = await replay(
+                    client, fake, events, args.speed, settings.github_webhook_secret
+                )
+            drained = await wait_for_queue(results_engine, args.drain_timeout)
+    finally:
+        fake.stop()
+
+    with results_engine.connect() as connection:
+        reviews = connection.execute(select(PRReview.commit_sha, PRReview.created_at)).all()
+        jobs = dict(connection.execute(
+            select(BackgroundJob.status, func.count()).group_by(BackgroundJob.status)
+        ).all())
+
+    review_latencies = []
+    for commit_sha, created_at in reviews:
+        if commit_sha in sent_at and created_at is not None:
+            created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None) if created_at.tzinfo else created_at
+            review_latencies.append((created_at - sent_at[commit_sha]).total_seconds())
+
+    github_calls = sum(count for kind, count in fake.calls.items() if not kind.startswith("POST"))
+    return {
+        "deliveries": len(events),
+        "elapsed_s": round(elapsed, 2),
+        "throughput_per_s": round(len(events) / elapsed, 1) if elapsed else None,
+        "statuses": {str(status): count for status, count in statuses.items()},
+        "webhook_errors": sum(count for status, count in statuses.items() if not str(status).startswith("2")),
+        "webhook_latency_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "webhook_latency_p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "webhook_latency_p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "reviews": len(reviews),
+        "review_latency_p50_s": round(percentile(review_latencies, 50) or 0, 3),
+        "review_latency_p95_s": round(percentile(review_latencies, 95) or 0, 3),
+        "review_latency_p99_s": round(percentile(review_latencies, 99) or 0, 3),
+        "db_queries_per_webhook": round(api_queries.count / len(events), 2),
+        "worker_queries_per_review": round(worker_queries.count / len(reviews), 1) if reviews else None,
+        "github_calls_per_review": round(github_calls / len(reviews), 2) if reviews else None,
+        "github_calls": dict(fake.calls),
+        "jobs": {getattr(status, "value", status): count for status, count in jobs.items()},
+        "queue_drained": drained,
+    }
+
+def check_thresholds(results: Dict[str, Any], path: str) -> List[str]:
+    with open(path) as f:
+        thresholds = json.load(f)
+    failures = []
+    for metric, limit in thresholds.items():
+        value = results.get(metric)
+        if value is None or value > limit:
+            failures.append(f"{metric} = {value} (limit {limit})")
+    if not results["queue_drained"]:
+        failures.append("job queue did not drain")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trace", help="Replay a saved trace (JSON lines) instead of generating one")
+    parser.add_argument("--save-trace", help="Write the replayed trace to this file")
+    parser.add_argument("--repos", type=int, default=50)
+    parser.add_argument("--prs-per-repo", type=int, default=3)
+    parser.add_argument("--rate", type=float, default=20.0, help="Deliveries per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of trace to generate")
+    parser.add_argument("--burst-probability", type=float, default=0.1)
+    parser.add_argument("--burst-size", type=int, default=5)
+    parser.add_argument("--noise", type=float, default=0.2, help="Share of deliveries the pipeline ignores")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier")
+    parser.add_argument("--debounce", type=float, default=1.0, help="REVIEW_DEBOUNCE_SECONDS for the run")
+    parser.add_argument("--github-latency-ms", type=float, default=20.0, help="Added to every fake GitHub response")
+    parser.add_argument("--drain-timeout", type=float, default=120.0)
+    parser.add_argument("--database-url", help="Empty database to run against (default: temporary SQLite)")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--check", nargs="?", const=THRESHOLDS, help="Fail when a threshold is exceeded")
+    args = parser.parse_args()
+
+    if args.trace:
+        events = load_trace(args.trace)
+    else:
+        events = generate_trace(
+            args.repos, args.prs_per_repo, args.rate, args.duration,
+            args.burst_probability, args.burst_size, args.noise, args.seed
+        )
+    if args.save_trace:
+        save_trace(args.save_trace, events)
+
+    results = asyncio.run(run(args, events))
+
+    print(f"deliveries: {results['deliveries']:,} in {results['elapsed_s']} s ({results['throughput_per_s']}/s), statuses {results['statuses']}")
+    print(f"webhook latency: p50 {results['webhook_latency_p50_ms']} ms, p95 {results['webhook_latency_p95_ms']} ms, p99 {results['webhook_latency_p99_ms']} ms")
+    print(f"reviews: {results['reviews']:,}, end-to-end p50 {results['review_latency_p50_s']} s, p95 {results['review_latency_p95_s']} s, p99 {results['review_latency_p99_s']} s")
+    print(f"db queries per webhook: {results['db_queries_per_webhook']}, worker queries per review: {results['worker_queries_per_review']}")
+    print(f"github calls per review: {results['github_calls_per_review']} {results['github_calls']}")
+    print(f"jobs: {results['jobs']}" + ("" if results["queue_drained"] else " (queue did not drain)"))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.check:
+        failures = check_thresholds(results, args.check)
+        for failure in failures:
+            print(f"FAIL {failure}")
+        if failures:
+            sys.exit(1)
+        print("all thresholds met")
+
+if __name__ == "__main__":
+    main()
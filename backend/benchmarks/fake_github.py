@@ -0,0 +1,147 @@
+"""
+Local stand-in for the GitHub REST API, used by the load tests.
+
+Serves the endpoints the review pipeline calls: pull requests, their
+files and raw diff, and PR comments. Responses are built from the
+recorded fixtures in benchmarks/fixtures. Each PR's head commit is set
+by the trace replayer through push(). Every response carries an ETag, so
+the client's conditional requests come back as 304s the way they do
+against GitHub. Calls are counted per endpoint.
+
+The rate-limit headers always report a full budget, so the test measures
+the pipeline and not GitHub's hourly limit.
+"""
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+def load_fixture(name: str) -> Any:
+    with open(os.path.join(FIXTURES, name)) as f:
+        return json.load(f)
+
+class FakeGitHub:
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self._pull = load_fixture("pull.json")
+        self._files = load_fixture("pull_files.json")
+        self._heads: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        self._comment_ids = 0
+        self._server: Optional[uvicorn.Server] = None
+        self.app = self._build_app()
+
+    def push(self, repo_full_name: str, number: int, head_sha: str, author: str, branch: str):
+        """Make head_sha the PR's current head commit"""
+        self._heads[(repo_full_name, number)] = {"sha": head_sha, "author": author, "branch": branch}
+
+    def pull(self, repo_full_name: str, number: int) -> Optional[Dict[str, Any]]:
+        head = self._heads.get((repo_full_name, number))
+        if head is None:
+            return None
+        files = self.files(repo_full_name, number)
+        pull = copy.deepcopy(self._pull)
+        pull.update(
+            url=f"https://api.github.com/repos/{repo_full_name}/pulls/{number}",
+            html_url=f"https://github.com/{repo_full_name}/pull/{number}",
+            number=number,
+            additions=sum(file["additions"] for file in files),
+            deletions=sum(file["deletions"] for file in files),
+            changed_files=len(files)
+        )
+        pull["user"]["login"] = head["author"]
+        pull["head"].update(ref=head["branch"], sha=head["sha"])
+        return pull
+
+    def files(self, repo_full_name: str, number: int) -> List[Dict[str, Any]]:
+        # Every push changes half of the files, so re-reviews hit the
+        # analysis cache for the rest
+        head_sha = self._heads[(repo_full_name, number)]["sha"]
+        files = []
+        for index, fixture in enumerate(self._files):
+            version = head_sha if index % 2 == 0 else "base"
+            blob = f"{repo_full_name}#{number}:{fixture['filename']}:{version}"
+            files.append({**fixture, "sha": hashlib.sha1(blob.encode()).hexdigest()})
+        return files
+
+    def diff(self, repo_full_name: str, number: int) -> str:
+        parts = []
+        for file in self.files(repo_full_name, number):
+            name = file["filename"]
+            parts.append(f"diff --git a/{name} b/{name}\n--- a/{name}\n+++ b/{name}\n{file['patch']}\n")
+        return "".join(parts)
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        def respond(request: Request, kind: str, body: str, media_type: str = "application/json") -> Response:
+            etag = '"' + hashlib.sha1(body.encode()).hexdigest() + '"'
+            headers = {
+                "ETag": etag,
+                "X-RateLimit-Limit": "5000",
+                "X-RateLimit-Remaining": "5000",
+                "X-RateLimit-Reset": str(int(time.time()) + 3600),
+            }
+            if request.headers.get("If-None-Match") == etag:
+                self.calls[f"{kind} (304)"] += 1
+                return Response(status_code=304, headers=headers)
+            self.calls[kind] += 1
+            return Response(body, media_type=media_type, headers=headers)
+
+        @app.middleware("http")
+        async def simulate_latency(request: Request, call_next):
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return await call_next(request)
+
+        @app.get("/repos/{owner}/{repo}/pulls/{number}")
+        async def get_pull(owner: str, repo: str, number: int, request: Request):
+            pull = self.pull(f"{owner}/{repo}", number)
+            if pull is None:
+                return Response('{"message": "Not Found"}', status_code=404, media_type="application/json")
+            if request.headers.get("Accept") == "application/vnd.github.diff":
+                return respond(request, "GET pull diff", self.diff(f"{owner}/{repo}", number), "text/plain")
+            return respond(request, "GET pull", json.dumps(pull))
+
+        @app.get("/repos/{owner}/{repo}/pulls/{number}/files")
+        async def get_pull_files(owner: str, repo: str, number: int, request: Request):
+            if (f"{owner}/{repo}", number) not in self._heads:
+                return Response('{"message": "Not Found"}', status_code=404, media_type="application/json")
+            return respond(request, "GET pull files", json.dumps(self.files(f"{owner}/{repo}", number)))
+
+        @app.get("/repos/{owner}/{repo}/issues/{number}/comments")
+        async def get_comments(owner: str, repo: str, number: int, request: Request):
+            return respond(request, "GET issue comments", "[]")
+
+        @app.post("/repos/{owner}/{repo}/issues/{number}/comments")
+        async def create_comment(owner: str, repo: str, number: int, request: Request):
+            self._comment_ids += 1
+            self.calls["POST issue comment"] += 1
+            return {"id": self._comment_ids, "body": (await request.json())["body"]}
+
+        return app
+
+    def start(self, port: int = 0) -> str:
+        """Serve on localhost in a background thread, returning the base URL"""
+        config = uvicorn.Config(self.app, host="127.0.0.1", port=port, log_level="warning", lifespan="off")
+        self._server = uvicorn.Server(config)
+        threading.Thread(target=self._server.run, daemon=True).start()
+        while not self._server.started:
+            time.sleep(0.01)
+        port = self._server.servers[0].sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    def stop(self):
+        if self._server:
+            self._server.should_exit = True
@@ -0,0 +1,126 @@
+"""
+Webhook traces for the load tests: generation, storage and signed payloads.
+
+A trace is a list of events, each with an offset in seconds from the start
+of the replay. Traces can be saved as JSON lines and replayed again. That
+is also the format to use when converting deliveries recorded from a real
+webhook.
+"""
+import copy
+import hashlib
+import hmac
+import json
+import random
+from typing import Dict, Any, List
+
+from .fake_github import load_fixture
+
+# Deliveries the pipeline ignores, sent in the share given by `noise`
+NOISE_EVENTS = [
+    ("pull_request", "labeled"),
+    ("pull_request", "edited"),
+    ("pull_request", "closed"),
+    ("push", None),
+    ("check_suite", "completed"),
+]
+
+def generate_trace(
+    repos: int = 50,
+    prs_per_repo: int = 3,
+    rate: float = 20.0,
+    duration: float = 30.0,
+    burst_probability: float = 0.1,
+    burst_size: int = 5,
+    noise: float = 0.2,
+    seed: int = 42
+) -> List[Dict[str, Any]]:
+    """
+    Poisson arrivals at `rate` deliveries per second, with bursts.
+
+    A PR's first delivery is `opened`, later ones are `synchronize` with a
+    new head commit. With burst_probability an arrival turns into a burst:
+    either a student pushing burst_size times within a couple of seconds,
+    or a deadline wave of burst_size different PRs at once.
+    """
+    rng = random.Random(seed)
+    prs = [(f"class-{r % 10:02d}/project-{r:03d}", number) for r in range(repos) for number in range(1, prs_per_repo + 1)]
+    events = []
+
+    def pr_event(offset: float, repo: str, number: int):
+        events.append({
+            "offset": round(offset, 4),
+            "event": "pull_request",
+            "repo": repo,
+            "number": number,
+            "author": "student" + repo.rsplit("-", 1)[1],
+            "branch": ("feature/", "bugfix/", "hotfix/", "docs/")[number % 4] + f"task-{number}"
+        })
+
+    offset = rng.expovariate(rate)
+    while offset < duration:
+        if rng.random() < noise:
+            event, action = rng.choice(NOISE_EVENTS)
+            repo, number = rng.choice(prs)
+            events.append({"offset": round(offset, 4), "event": event, "action": action, "repo": repo, "number": number})
+        elif rng.random() < burst_probability:
+            if rng.random() < 0.5:
+                repo, number = rng.choice(prs)
+                for i in range(burst_size):
+                    pr_event(offset + i * rng.uniform(0.1, 0.5), repo, number)
+            else:
+                for repo, number in rng.sample(prs, min(burst_size, len(prs))):
+                    pr_event(offset + rng.uniform(0, 1), repo, number)
+        else:
+            pr_event(offset, *rng.choice(prs))
+        offset += rng.expovariate(rate)
+
+    events.sort(key=lambda event: event["offset"])
+
+    # Actions and head commits follow the replay order of each PR
+    pushes: Dict[tuple, int] = {}
+    for event in events:
+        if "action" not in event:  # Noise deliveries come with their action
+            key = (event["repo"], event["number"])
+            count = pushes.get(key, 0)
+            pushes[key] = count + 1
+            event["action"] = "opened" if count == 0 else "synchronize"
+            event["head_sha"] = hashlib.sha1(f"{key[0]}#{key[1]}:{count}".encode()).hexdigest()
+    return events
+
+def save_trace(path: str, events: List[Dict[str, Any]]):
+    with open(path, "w") as f:
+        for event in events:
+            f.write(json.dumps(event) + "\n")
+
+def load_trace(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+_template = None
+
+def webhook_payload(event: Dict[str, Any]) -> Dict[str, Any]:
+    """GitHub delivery body for a trace event, from the recorded payload"""
+    global _template
+    if _template is None:
+        _template = load_fixture("webhook_pull_request.json")
+
+    if event["event"] != "pull_request":
+        return {
+            "action": event["action"],
+            "repository": copy.deepcopy(_template["repository"]),
+            "sender": copy.deepcopy(_template["sender"])
+        }
+
+    payload = copy.deepcopy(_template)
+    repo, number = event["repo"], event["number"]
+    pr = payload["pull_request"]
+    payload.update(action=event["action"], number=number)
+    payload["repository"].update(full_name=repo, name=repo.split("/")[1])
+    pr.update(number=number, html_url=f"https://github.com/{repo}/pull/{number}")
+    pr["user"]["login"] = event.get("author", pr["user"]["login"])
+    pr["head"].update(ref=event.get("branch", pr["head"]["ref"]), sha=event.get("head_sha", pr["head"]["sha"]))
+    return payload
+
+def sign(body: bytes, secret: str) -> str:
+    """X-Hub-Signature-256 value, the HMAC scheme verify_signature checks"""
+    return "sha256=" + hmac.new(secret.encode(), msg=body, digestmod=hashlib.sha256).hexdigest()
@@ -0,0 +1,63 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine
+
+from app.config import get_settings
+from app.database import Base
+from app.models import POSTGRES_SEARCH_SCHEMA  # also registers the tables on Base.metadata
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logging", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+def database_url() -> str:
+    return config.get_main_option("sqlalchemy.url") or get_settings().database_url
+
+def include_name(name, type_, parent_names) -> bool:
+    # Created by migration 0004 on PostgreSQL only, not in the models
+    return name not in POSTGRES_SEARCH_SCHEMA
+
+def run_migrations_offline():
+    """Emit the SQL to stdout (alembic upgrade --sql)"""
+    context.configure(
+        url=database_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        # Called from app.migrate with a connection of its own
+        _run(connection)
+        return
+    engine = create_engine(database_url())
+    try:
+        with engine.connect() as connection:
+            _run(connection)
+    finally:
+        engine.dispose()
+
+def _run(connection):
+    # Batch mode lets ALTERs run on SQLite, which rebuilds the table
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=connection.dialect.name == "sqlite",
+        compare_type=True,
+        include_name=include_name
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,68 @@
+"""baseline schema
+
+The two tables the project started with, as create_all() made them
+before the review pipeline work. Databases created before Alembic are
+stamped at this revision by app.migrate instead of running it, and
+0001a adds whatever their create_all() left out.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16 23:43:06.708337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('branch_rules',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('branch_pattern', sa.String(), nullable=False),
+    sa.Column('description', sa.String(), nullable=False),
+    sa.Column('expectations', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('branch_pattern')
+    )
+    op.create_index(op.f('ix_branch_rules_id'), 'branch_rules', ['id'], unique=False)
+
+    op.create_table('pr_reviews',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('pr_number', sa.Integer(), nullable=False),
+    sa.Column('repo_full_name', sa.String(), nullable=False),
+    sa.Column('branch_name', sa.String(), nullable=False),
+    sa.Column('branch_type', sa.String(), nullable=False),
+    sa.Column('pr_title', sa.String(), nullable=False),
+    sa.Column('pr_author', sa.String(), nullable=False),
+    sa.Column('review_feedback', sa.JSON(), nullable=False),
+    sa.Column('review_summary', sa.Text(), nullable=False),
+    sa.Column('expectations_applied', sa.JSON(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'APPROVED', 'REJECTED', 'POSTED', name='reviewstatus'), nullable=True),
+    sa.Column('instructor_notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('reviewed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('posted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('pr_url', sa.String(), nullable=False),
+    sa.Column('commit_sha', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_pr_reviews_id'), 'pr_reviews', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_pr_reviews_id'), table_name='pr_reviews')
+    op.drop_table('pr_reviews')
+    op.drop_index(op.f('ix_branch_rules_id'), table_name='branch_rules')
+    op.drop_table('branch_rules')
+    # PostgreSQL keeps enum types after their tables are dropped
+    sa.Enum(name='reviewstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,333 @@
+"""review pipeline schema
+
+The tables, columns, indexes and constraints the review pipeline work
+added to the baseline before schema management moved to Alembic: the
+job queue, the analysis cache, review stats and events, rule snapshots
+and interned feedback, and the new pr_reviews columns.
+
+Databases from before Alembic were built at whichever version last
+started them, by create_all() and later by create_schema(), which also
+added new columns and indexes to existing tables. Such a database can
+hold any mix of these objects; each one is only added when it is
+missing. On SQLite, create_schema() enforced unique constraints with
+unique indexes, which are replaced by the constraints here.
+
+Revision ID: 0001a
+Revises: 0001
+Create Date: 2026-10-17 02:14:37.530186
+
+"""
+from typing import Any, Dict, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001a'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 0001 created reviewstatus with the first four
+REVIEW_STATUSES = ('PENDING', 'APPROVED', 'REJECTED', 'POSTED', 'POSTING', 'POST_FAILED', 'SUPERSEDED')
+JOB_STATUSES = ('QUEUED', 'RUNNING', 'DONE', 'DEAD', 'SUPERSEDED')
+review_status = sa.Enum(*REVIEW_STATUSES, name='reviewstatus').with_variant(
+    postgresql.ENUM(*REVIEW_STATUSES, name='reviewstatus', create_type=False), 'postgresql'
+)
+
+UNIQUE_REVIEW = 'uq_pr_reviews_repo_pr_commit'
+REVIEW_INDEXES = {
+    'ix_pr_reviews_created_at_id': ['created_at', 'id'],
+    'ix_pr_reviews_status_created_at': ['status', 'created_at', 'id'],
+    'ix_pr_reviews_repo_created_at': ['repo_full_name', 'created_at', 'id'],
+    'ix_pr_reviews_author_created_at': ['pr_author', 'created_at', 'id'],
+    'ix_pr_reviews_branch_type_created_at': ['branch_type', 'created_at', 'id'],
+}
+
+
+def review_columns():
+    return [
+        sa.Column('rule_snapshot_hash', sa.String(length=40), nullable=True),
+        sa.Column('feedback_hash', sa.String(length=40), nullable=True),
+        sa.Column('error_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('warning_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('github_comment_id', sa.BigInteger(), nullable=True),
+        sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+    ]
+
+
+def existing_schema() -> Dict[str, Dict[str, Any]]:
+    """Columns (name: nullable), index and unique constraint names of each table"""
+    if op.get_context().as_sql:
+        # Offline SQL cannot look; it starts from the tables 0001 creates
+        baseline = ('review_feedback', 'expectations_applied')
+        return {
+            'branch_rules': {'columns': {}, 'indexes': set(), 'uniques': set()},
+            'pr_reviews': {'columns': {name: False for name in baseline}, 'indexes': set(), 'uniques': set()},
+        }
+    inspector = sa.inspect(op.get_bind())
+    return {
+        table: {
+            'columns': {column['name']: column['nullable'] for column in inspector.get_columns(table)},
+            'indexes': {index['name'] for index in inspector.get_indexes(table)},
+            'uniques': {unique['name'] for unique in inspector.get_unique_constraints(table)},
+        }
+        for table in inspector.get_table_names()
+    }
+
+
+def ensure_table(schema, name, columns, constraints=(), indexes=(), unique_columns=()):
+    """Create the table, or add the columns and indexes an older create_all() left out"""
+    existing = schema.get(name)
+    if existing is None:
+        op.create_table(name, *columns, *constraints)
+    else:
+        missing = [column for column in columns if column.name not in existing['columns']]
+        unique_indexes = [
+            column for column in unique_columns
+            if column in existing['columns']
+            and f'{name}_{column}_key' in existing['indexes'] - existing['uniques']
+        ]
+        if missing or unique_indexes:
+            with op.batch_alter_table(name) as batch:
+                for column in missing:
+                    batch.add_column(column)
+                    if column.name in unique_columns:
+                        batch.create_unique_constraint(f'{name}_{column.name}_key', [column.name])
+                for column in unique_indexes:
+                    batch.drop_index(f'{name}_{column}_key')
+                    batch.create_unique_constraint(f'{name}_{column}_key', [column])
+    for index_name, index_columns in indexes:
+        if existing is None or index_name not in existing['indexes']:
+            op.create_index(index_name, name, index_columns, unique=False)
+
+
+def upgrade() -> None:
+    schema = existing_schema()
+    if op.get_context().dialect.name == 'postgresql':
+        # Existing type values stay; only the missing ones are added
+        for status in REVIEW_STATUSES[4:]:
+            op.execute(f"ALTER TYPE reviewstatus ADD VALUE IF NOT EXISTS '{status}'")
+        if 'background_jobs' in schema:
+            op.execute("ALTER TYPE jobstatus ADD VALUE IF NOT EXISTS 'SUPERSEDED'")
+
+    ensure_table(schema, 'rule_snapshots', [
+        sa.Column('hash', sa.String(length=40), nullable=False),
+        sa.Column('expectations', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    ], [sa.PrimaryKeyConstraint('hash')])
+    upgrade_pr_reviews(schema)
+
+    ensure_table(schema, 'feedback_templates', [
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('hash', sa.String(length=40), nullable=False),
+        sa.Column('category', sa.String(), nullable=False),
+        sa.Column('severity', sa.String(), nullable=False),
+        sa.Column('message', sa.Text(), nullable=False),
+    ], [sa.PrimaryKeyConstraint('id'), sa.UniqueConstraint('hash')])
+    ensure_table(schema, 'review_feedback_items', [
+        sa.Column('review_id', sa.Integer(), nullable=False),
+        sa.Column('position', sa.SmallInteger(), nullable=False),
+        sa.Column('template_id', sa.Integer(), nullable=False),
+        sa.Column('line_number', sa.Integer(), nullable=True),
+        sa.Column('file_path', sa.String(), nullable=True),
+    ], [
+        sa.ForeignKeyConstraint(['review_id'], ['pr_reviews.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['template_id'], ['feedback_templates.id'], ),
+        sa.PrimaryKeyConstraint('review_id', 'position'),
+    ])
+    ensure_table(schema, 'background_jobs', [
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('coalesce_key', sa.String(), nullable=True),
+        sa.Column('delivery_id', sa.String(length=64), nullable=True),
+        sa.Column('status', sa.Enum(*JOB_STATUSES, name='jobstatus'), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('max_attempts', sa.Integer(), nullable=False),
+        sa.Column('run_after', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('locked_by', sa.String(), nullable=True),
+        sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    ], [sa.PrimaryKeyConstraint('id'), sa.UniqueConstraint('delivery_id')], [
+        ('ix_background_jobs_coalesce_key', ['coalesce_key']),
+        ('ix_background_jobs_id', ['id']),
+        ('ix_background_jobs_status_run_after', ['status', 'run_after']),
+    ], unique_columns=('delivery_id',))
+    ensure_table(schema, 'file_analysis_cache', [
+        sa.Column('blob_sha', sa.String(), nullable=False),
+        sa.Column('rules_version', sa.String(), nullable=False),
+        sa.Column('feedback', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('last_used_at', sa.DateTime(timezone=True), nullable=False),
+    ], [sa.PrimaryKeyConstraint('blob_sha', 'rules_version')], [
+        ('ix_file_analysis_cache_last_used_at', ['last_used_at']),
+    ])
+    ensure_table(schema, 'review_stats', [
+        sa.Column('repo_full_name', sa.String(), nullable=False),
+        sa.Column('branch_type', sa.String(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('status', review_status, nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+    ], [sa.PrimaryKeyConstraint('repo_full_name', 'branch_type', 'day', 'status')])
+    ensure_table(schema, 'review_events', [
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('review_id', sa.Integer(), nullable=False),
+        sa.Column('event_type', sa.String(), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    ], [sa.PrimaryKeyConstraint('id')], [
+        ('ix_review_events_created_at', ['created_at']),
+    ])
+
+    if op.get_context().dialect.name != 'postgresql':
+        # Enums are VARCHARs there, sized for the statuses of their day
+        widened = (('background_jobs', sa.Enum(*JOB_STATUSES, name='jobstatus')), ('review_stats', review_status))
+        for table, status_type in widened:
+            if table in schema:
+                with op.batch_alter_table(table) as batch:
+                    batch.alter_column('status', existing_type=sa.String(), type_=status_type)
+
+
+def upgrade_pr_reviews(schema):
+    existing = schema['pr_reviews']
+    columns = existing['columns']
+    if UNIQUE_REVIEW not in existing['uniques'] and not op.get_context().as_sql:
+        drop_duplicate_reviews(schema)
+
+    with op.batch_alter_table('pr_reviews') as batch:
+        for column in review_columns():
+            if column.name not in columns:
+                batch.add_column(column)
+        if 'rule_snapshot_hash' not in columns:
+            batch.create_foreign_key(
+                'pr_reviews_rule_snapshot_hash_fkey', 'rule_snapshots', ['rule_snapshot_hash'], ['hash']
+            )
+        # Legacy JSON, empty for reviews stored as snapshots and interned items
+        for name in ('review_feedback', 'expectations_applied'):
+            if not columns[name]:
+                batch.alter_column(name, existing_type=sa.JSON(), nullable=True)
+        if op.get_context().dialect.name != 'postgresql':
+            # A VARCHAR sized for the baseline statuses
+            batch.alter_column('status', existing_type=sa.String(length=8), type_=review_status)
+        # Replaced by the unique constraint, which serves the same lookups
+        if 'ix_pr_reviews_repo_pr_number' in existing['indexes']:
+            batch.drop_index('ix_pr_reviews_repo_pr_number')
+        if UNIQUE_REVIEW in existing['indexes'] - existing['uniques']:
+            batch.drop_index(UNIQUE_REVIEW)
+        if UNIQUE_REVIEW not in existing['uniques']:
+            batch.create_unique_constraint(UNIQUE_REVIEW, ['repo_full_name', 'pr_number', 'commit_sha'])
+
+    for name, index_columns in REVIEW_INDEXES.items():
+        if name not in existing['indexes']:
+            op.create_index(name, 'pr_reviews', index_columns, unique=False)
+    if not op.get_context().as_sql:
+        backfill_review_counts()
+
+
+def backfill_review_counts(batch_size=500):
+    """
+    Count the errors and warnings of reviews stored before the counts were.
+    Their columns were added as 0; the legacy feedback JSON still holds
+    the items.
+    """
+    bind = op.get_bind()
+    reviews = sa.table(
+        'pr_reviews', sa.column('id'), sa.column('review_feedback', sa.JSON()),
+        sa.column('error_count'), sa.column('warning_count')
+    )
+    update = reviews.update().where(reviews.c.id == sa.bindparam('review_id')).values(
+        error_count=sa.bindparam('errors'), warning_count=sa.bindparam('warnings')
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(reviews.c.id, reviews.c.review_feedback)
+            .where(reviews.c.id > last_id, reviews.c.review_feedback.isnot(None),
+                   reviews.c.error_count == 0, reviews.c.warning_count == 0)
+            .order_by(reviews.c.id).limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        counts = []
+        for row in rows:
+            severities = [item.get('severity') for item in row.review_feedback or []]
+            if 'error' in severities or 'warning' in severities:
+                counts.append({
+                    'review_id': row.id,
+                    'errors': severities.count('error'),
+                    'warnings': severities.count('warning'),
+                })
+        if counts:
+            bind.execute(update, counts)
+
+
+def drop_duplicate_reviews(schema):
+    """
+    Keep one review per (repo, PR, commit) so the unique constraint holds:
+    the one an instructor acted on, else the newest. Redelivered webhooks
+    could store a commit twice before the constraint existed.
+    """
+    bind = op.get_bind()
+    reviews = sa.table(
+        'pr_reviews', sa.column('id'), sa.column('repo_full_name'), sa.column('pr_number'),
+        sa.column('commit_sha'), sa.column('status')
+    )
+    key = (reviews.c.repo_full_name, reviews.c.pr_number, reviews.c.commit_sha)
+    duplicated = sa.select(*key).group_by(*key).having(sa.func.count() > 1).subquery()
+    rows = bind.execute(sa.select(reviews.c.id, reviews.c.status, *key).join(duplicated, sa.and_(
+        reviews.c.repo_full_name == duplicated.c.repo_full_name,
+        reviews.c.pr_number == duplicated.c.pr_number,
+        reviews.c.commit_sha == duplicated.c.commit_sha
+    ))).all()
+    if not rows:
+        return
+
+    groups = {}
+    for row in rows:
+        groups.setdefault((row.repo_full_name, row.pr_number, row.commit_sha), []).append(row)
+    stale = []
+    for group in groups.values():
+        keep = max(group, key=lambda row: (row.status not in (None, 'PENDING'), row.id))
+        stale += [row.id for row in group if row.id != keep.id]
+
+    if 'review_feedback_items' in schema:
+        items = sa.table('review_feedback_items', sa.column('review_id'))
+        bind.execute(items.delete().where(items.c.review_id.in_(stale)))
+    bind.execute(reviews.delete().where(reviews.c.id.in_(stale)))
+    if 'review_stats' in schema:
+        # Emptied so 0002 counts the remaining reviews again
+        bind.execute(sa.table('review_stats').delete())
+
+
+def downgrade() -> None:
+    op.drop_index('ix_review_events_created_at', table_name='review_events')
+    op.drop_table('review_events')
+    op.drop_table('review_stats')
+    op.drop_index('ix_file_analysis_cache_last_used_at', table_name='file_analysis_cache')
+    op.drop_table('file_analysis_cache')
+    op.drop_index('ix_background_jobs_status_run_after', table_name='background_jobs')
+    op.drop_index('ix_background_jobs_id', table_name='background_jobs')
+    op.drop_index('ix_background_jobs_coalesce_key', table_name='background_jobs')
+    op.drop_table('background_jobs')
+    op.drop_table('review_feedback_items')
+    op.drop_table('feedback_templates')
+
+    for name in REVIEW_INDEXES:
+        op.drop_index(name, table_name='pr_reviews')
+    # review_feedback and expectations_applied stay nullable: reviews stored
+    # since hold their content in the dropped tables and have no JSON
+    with op.batch_alter_table('pr_reviews') as batch:
+        batch.drop_constraint(UNIQUE_REVIEW, type_='unique')
+        batch.drop_constraint('pr_reviews_rule_snapshot_hash_fkey', type_='foreignkey')
+        for column in reversed(review_columns()):
+            batch.drop_column(column.name)
+    op.drop_table('rule_snapshots')
+    # PostgreSQL cannot drop enum values; reviewstatus keeps the new ones
+    sa.Enum(name='jobstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,216 @@
+"""seed default branch rules and review stats
+
+Both ran on every API and worker startup before. Seeding is an
+on-conflict insert and the backfill only fills an empty review_stats
+table, so this is safe on databases that already have both. The rules
+are copied here as they were at this revision; adding or changing a
+default rule later needs a migration of its own.
+
+Revision ID: 0002
+Revises: 0001a
+Create Date: 2026-10-16 23:58:41.120583
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# BranchRulesService.DEFAULT_RULES as of this revision
+DEFAULT_RULES = [
+    {
+        'branch_pattern': 'main',
+        'description': 'Main production branch - highest standards',
+        'expectations': {
+            'min_description_length': 100,
+            'require_tests': True,
+            'max_files_changed': 10,
+            'require_documentation': True,
+            'code_quality_threshold': 0.95,
+            'checks': [
+                'All tests passing',
+                'Code reviewed by at least 2 developers',
+                'No breaking changes',
+                'Changelog updated',
+                'Version number bumped',
+                'Documentation complete',
+                'Performance tested',
+                'Security reviewed',
+            ],
+        },
+    },
+    {
+        'branch_pattern': 'develop',
+        'description': 'Development integration branch - testing and integration focus',
+        'expectations': {
+            'min_description_length': 60,
+            'require_tests': True,
+            'max_files_changed': 25,
+            'require_documentation': True,
+            'code_quality_threshold': 0.85,
+            'checks': [
+                'All unit tests passing',
+                'Integration tests included',
+                'No merge conflicts with main',
+                'Code follows project conventions',
+                'Breaking changes documented',
+                'Dependencies updated if needed',
+                'CI/CD pipeline passes',
+            ],
+        },
+    },
+    {
+        'branch_pattern': 'feature/*',
+        'description': 'Feature branches for new functionality',
+        'expectations': {
+            'min_description_length': 50,
+            'require_tests': True,
+            'max_files_changed': 20,
+            'require_documentation': True,
+            'code_quality_threshold': 0.7,
+            'checks': [
+                'Code follows naming conventions',
+                'Includes unit tests',
+                'Documentation updated',
+                'No console.log or debug statements',
+                'Error handling implemented',
+            ],
+        },
+    },
+    {
+        'branch_pattern': 'bugfix/*',
+        'description': 'Bug fix branches',
+        'expectations': {
+            'min_description_length': 30,
+            'require_tests': True,
+            'max_files_changed': 10,
+            'require_documentation': False,
+            'code_quality_threshold': 0.8,
+            'checks': [
+                'Bug description is clear',
+                'Includes regression test',
+                'Root cause identified',
+                'No unrelated changes',
+            ],
+        },
+    },
+    {
+        'branch_pattern': 'hotfix/*',
+        'description': 'Critical production fixes - highest urgency',
+        'expectations': {
+            'min_description_length': 40,
+            'require_tests': True,
+            'max_files_changed': 5,
+            'require_documentation': True,
+            'code_quality_threshold': 0.9,
+            'checks': [
+                'Critical issue documented',
+                'Minimal code changes',
+                'Tested in production-like environment',
+                'Rollback plan documented',
+                'Monitoring added',
+            ],
+        },
+    },
+    {
+        'branch_pattern': 'release/*',
+        'description': 'Release preparation branches',
+        'expectations': {
+            'min_description_length': 80,
+            'require_tests': True,
+            'max_files_changed': 15,
+            'require_documentation': True,
+            'code_quality_threshold': 0.9,
+            'checks': [
+                'Version number updated',
+                'Changelog complete',
+                'All tests passing',
+                'Documentation reviewed',
+                'Migration scripts tested',
+                'Deployment plan ready',
+            ],
+        },
+    },
+    {
+        'branch_pattern': 'docs/*',
+        'description': 'Documentation updates',
+        'expectations': {
+            'min_description_length': 20,
+            'require_tests': False,
+            'max_files_changed': 15,
+            'require_documentation': False,
+            'code_quality_threshold': 0.5,
+            'checks': [
+                'Documentation is clear',
+                'No broken links',
+                'Proper formatting',
+                'Examples provided where needed',
+            ],
+        },
+    },
+    {
+        'branch_pattern': 'default',
+        'description': 'Default rules for other branches',
+        'expectations': {
+            'min_description_length': 30,
+            'require_tests': False,
+            'max_files_changed': 30,
+            'require_documentation': False,
+            'code_quality_threshold': 0.6,
+            'checks': [
+                'Code is readable',
+                'No obvious errors',
+                'Follows basic conventions',
+            ],
+        },
+    },
+]
+
+branch_rules = sa.table(
+    'branch_rules', sa.column('branch_pattern', sa.String), sa.column('description', sa.String),
+    sa.column('expectations', sa.JSON)
+)
+COUNTED_COLUMNS = ('repo_full_name', 'branch_type', 'created_at', 'status')
+pr_reviews = sa.table('pr_reviews', sa.column('id'), *(sa.column(name) for name in COUNTED_COLUMNS))
+review_stats = sa.table(
+    'review_stats', *(sa.column(name) for name in ('repo_full_name', 'branch_type', 'day', 'status', 'count'))
+)
+
+
+def upgrade() -> None:
+    seed_default_rules()
+    backfill_review_stats()
+
+
+def seed_default_rules():
+    """Insert the default rules that are missing; existing patterns keep their edits"""
+    insert = postgresql.insert if op.get_context().dialect.name == 'postgresql' else sqlite.insert
+    op.execute(insert(branch_rules).values(DEFAULT_RULES).on_conflict_do_nothing(index_elements=['branch_pattern']))
+
+
+def backfill_review_stats():
+    """ReviewStatsService.rebuild() as of this revision, for databases that predate review_stats"""
+    day = sa.func.date(pr_reviews.c.created_at)
+    # Only fills an empty table
+    op.execute(review_stats.insert().from_select(
+        ['repo_full_name', 'branch_type', 'day', 'status', 'count'],
+        sa.select(
+            pr_reviews.c.repo_full_name, pr_reviews.c.branch_type, day, pr_reviews.c.status, sa.func.count()
+        ).where(
+            ~sa.exists().select_from(review_stats)
+        ).group_by(pr_reviews.c.repo_full_name, pr_reviews.c.branch_type, day, pr_reviews.c.status)
+    ))
+
+
+def downgrade() -> None:
+    # Rules may have been edited since; they are left in place
+    pass
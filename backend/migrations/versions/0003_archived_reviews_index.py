@@ -0,0 +1,45 @@
+"""archived reviews index
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:12:40.518304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Created with pr_reviews in 0001, the last three added in 0001a
+REVIEW_STATUSES = ('PENDING', 'APPROVED', 'REJECTED', 'POSTED', 'POSTING', 'POST_FAILED', 'SUPERSEDED')
+review_status = sa.Enum(*REVIEW_STATUSES, name='reviewstatus').with_variant(
+    postgresql.ENUM(*REVIEW_STATUSES, name='reviewstatus', create_type=False), 'postgresql'
+)
+
+
+def upgrade() -> None:
+    op.create_table('archived_reviews',
+    sa.Column('review_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('archive_file', sa.String(), nullable=False),
+    sa.Column('member_offset', sa.BigInteger(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('repo_full_name', sa.String(), nullable=False),
+    sa.Column('branch_type', sa.String(), nullable=False),
+    sa.Column('status', review_status, nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('archived_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('review_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('archived_reviews')
@@ -0,0 +1,57 @@
+"""review search indexes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 01:05:12.804113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Must match SEARCH_CONFIG and the weights in app.services.review_search
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', pr_title), 'A') || "
+    "setweight(to_tsvector('english', review_summary), 'B')"
+)
+
+
+def upgrade() -> None:
+    op.create_index('ix_review_feedback_items_template_review', 'review_feedback_items', ['template_id', 'review_id'])
+    if op.get_context().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute(f'ALTER TABLE pr_reviews ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED')
+    op.create_index('ix_pr_reviews_search_vector', 'pr_reviews', ['search_vector'], postgresql_using='gin')
+    op.create_index(
+        'ix_feedback_templates_message_search', 'feedback_templates',
+        [sa.text("to_tsvector('english', message)")], postgresql_using='gin'
+    )
+    op.create_index(
+        'ix_pr_reviews_author_trgm', 'pr_reviews', ['pr_author'],
+        postgresql_using='gin', postgresql_ops={'pr_author': 'gin_trgm_ops'}
+    )
+    op.create_index(
+        'ix_pr_reviews_branch_trgm', 'pr_reviews', ['branch_name'],
+        postgresql_using='gin', postgresql_ops={'branch_name': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name == 'postgresql':
+        op.drop_index('ix_pr_reviews_branch_trgm', table_name='pr_reviews')
+        op.drop_index('ix_pr_reviews_author_trgm', table_name='pr_reviews')
+        op.drop_index('ix_feedback_templates_message_search', table_name='feedback_templates')
+        op.drop_index('ix_pr_reviews_search_vector', table_name='pr_reviews')
+        op.drop_column('pr_reviews', 'search_vector')
+    op.drop_index('ix_review_feedback_items_template_review', table_name='review_feedback_items')
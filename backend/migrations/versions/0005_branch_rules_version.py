@@ -0,0 +1,32 @@
+"""branch rules version
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 03:21:08.446915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    table = op.create_table('branch_rules_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # The one row BranchRulesService reads and bumps
+    op.bulk_insert(table, [{'id': 1, 'version': 0}])
+
+
+def downgrade() -> None:
+    op.drop_table('branch_rules_version')
@@ -1,10 +1,11 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import { reviewsAPI } from "../services/api";
 import ReviewCard from "./ReviewCard";
-import ReviewDetail from "./ReviewDetail";
+import ReviewDetail, { FEEDBACK_PAGE_SIZE } from "./ReviewDetail";
 
 function Dashboard() {
   const [reviews, setReviews] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [selectedReview, setSelectedReview] = useState(null);
   const [filter, setFilter] = useState("pending");
   const [stats, setStats] = useState({
@@ -15,23 +16,75 @@ function Dashboard() {
   });
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const [selectedIds, setSelectedIds] = useState([]);
+  const [bulkSubmitting, setBulkSubmitting] = useState(false);
+  const [bulkError, setBulkError] = useState(null);
+  const filterRef = useRef(filter);
 
   useEffect(() => {
+    filterRef.current = filter;
+    setSelectedIds([]);
     fetchReviews();
     fetchStats();
   }, [filter]);
 
+  // Load once, then apply changes pushed by the server
+  useEffect(() => {
+    const source = reviewsAPI.subscribeToEvents(handleReviewEvent);
+    return () => source.close();
+  }, []);
+
+  const handleReviewEvent = (type, data) => {
+    if (type === "reset") {
+      fetchReviews();
+    } else {
+      const changed = data.review;
+      const visible =
+        type !== "review_deleted" &&
+        (!filterRef.current || changed.status === filterRef.current);
+
+      setReviews((current) => {
+        const rest = current.filter((review) => review.id !== changed.id);
+        if (!visible) return rest;
+        if (rest.length === current.length) return [changed, ...current];
+        return current.map((review) =>
+          review.id === changed.id ? changed : review
+        );
+      });
+    }
+    fetchStats();
+  };
+
+  // Also called from the event subscription, which keeps the first
+  // render's closure: read the current tab from filterRef, not filter
   const fetchReviews = async () => {
+    const requested = filterRef.current;
     setLoading(true);
     setError(null);
+    setNextCursor(null);
     try {
-      const response = await reviewsAPI.getAllReviews(filter);
+      const response = await reviewsAPI.getAllReviews(requested);
+      // A newer fetch for another tab owns the list now
+      if (requested !== filterRef.current) return;
       setReviews(response.data);
+      setNextCursor(response.headers["x-next-cursor"] || null);
     } catch (err) {
       setError("Failed to fetch reviews");
       console.error(err);
     } finally {
-      setLoading(false);
+      if (requested === filterRef.current) setLoading(false);
+    }
+  };
+
+  const fetchMoreReviews = async () => {
+    try {
+      const response = await reviewsAPI.getAllReviews(filter, nextCursor);
+      if (filter !== filterRef.current) return;
+      setReviews((current) => [...current, ...response.data]);
+      setNextCursor(response.headers["x-next-cursor"] || null);
+    } catch (err) {
+      setError("Failed to fetch reviews");
+      console.error(err);
     }
   };
 
@@ -44,22 +97,65 @@ function Dashboard() {
     }
   };
 
-  const handleReviewClick = (review) => {
-    setSelectedReview(review);
+  const handleReviewClick = async (review) => {
+    // The list only carries summary fields; load feedback for the modal
+    try {
+      const response = await reviewsAPI.getReview(review.id, {
+        feedback_limit: FEEDBACK_PAGE_SIZE,
+      });
+      setSelectedReview(response.data);
+    } catch (err) {
+      setError("Failed to fetch review");
+      console.error(err);
+    }
+  };
+
+  const toggleSelected = (reviewId) => {
+    setSelectedIds((current) =>
+      current.includes(reviewId)
+        ? current.filter((id) => id !== reviewId)
+        : [...current, reviewId]
+    );
+  };
+
+  const handleBulkDecision = async (decision) => {
+    setBulkSubmitting(true);
+    setBulkError(null);
+    try {
+      const response = await reviewsAPI.makeBulkDecision(
+        selectedIds.map((reviewId) => ({ review_id: reviewId, decision }))
+      );
+      const failed = response.data.filter((result) => !result.ok);
+      setSelectedIds(failed.map((result) => result.review_id));
+      if (failed.length > 0) {
+        setBulkError(
+          `${failed.length} of ${response.data.length} reviews could not be updated`
+        );
+      }
+    } catch (err) {
+      setBulkError(`Failed to ${decision} reviews`);
+      console.error(err);
+    } finally {
+      setBulkSubmitting(false);
+    }
   };
 
+  const isDecidableTab = filter === "pending" || filter === "post_failed";
+
   const handleCloseDetail = () => {
     setSelectedReview(null);
-    fetchReviews();
-    fetchStats();
   };
 
   const getStatusColor = (status) => {
     switch (status) {
       case "pending":
         return "bg-yellow-100 text-yellow-800";
+      case "posting":
+        return "bg-blue-100 text-blue-800";
       case "posted":
         return "bg-green-100 text-green-800";
+      case "post_failed":
+        return "bg-orange-100 text-orange-800";
       case "rejected":
         return "bg-red-100 text-red-800";
       default:
@@ -217,7 +313,7 @@ function Dashboard() {
         <div className="bg-white shadow rounded-lg mb-6">
           <div className="border-b border-gray-200">
             <nav className="-mb-px flex space-x-8 px-6" aria-label="Tabs">
-              {["pending", "posted", "rejected"].map((status) => (
+              {["pending", "posting", "posted", "post_failed", "rejected"].map((status) => (
                 <button
                   key={status}
                   onClick={() => setFilter(status)}
@@ -227,13 +323,41 @@ function Dashboard() {
                       : "border-transparent text-gray-500 hover:text-gray-700 hover:border-gray-300"
                   } whitespace-nowrap py-4 px-1 border-b-2 font-medium text-sm capitalize`}
                 >
-                  {status}
+                  {status.replace("_", " ")}
                 </button>
               ))}
             </nav>
           </div>
         </div>
 
+        {/* Bulk Actions */}
+        {selectedIds.length > 0 && (
+          <div className="bg-white shadow rounded-lg mb-6 px-6 py-4 flex items-center justify-between">
+            <span className="text-sm text-gray-700">
+              {selectedIds.length} selected
+              {bulkError && (
+                <span className="ml-3 text-red-600">{bulkError}</span>
+              )}
+            </span>
+            <div className="flex gap-3">
+              <button
+                onClick={() => handleBulkDecision("approve")}
+                disabled={bulkSubmitting}
+                className="bg-green-600 text-white px-4 py-2 rounded-md text-sm hover:bg-green-700 disabled:bg-gray-400"
+              >
+                ✓ Approve selected
+              </button>
+              <button
+                onClick={() => handleBulkDecision("reject")}
+                disabled={bulkSubmitting}
+                className="bg-red-600 text-white px-4 py-2 rounded-md text-sm hover:bg-red-700 disabled:bg-gray-400"
+              >
+                ✗ Reject selected
+              </button>
+            </div>
+          </div>
+        )}
+
         {/* Reviews List */}
         {loading ? (
           <div className="text-center py-12">
@@ -273,10 +397,23 @@ function Dashboard() {
                 key={review.id}
                 review={review}
                 onClick={() => handleReviewClick(review)}
+                selected={selectedIds.includes(review.id)}
+                onSelect={isDecidableTab ? toggleSelected : null}
               />
             ))}
           </div>
         )}
+
+        {!loading && nextCursor && (
+          <div className="text-center mb-8">
+            <button
+              onClick={fetchMoreReviews}
+              className="px-4 py-2 text-sm font-medium text-gray-700 bg-white border border-gray-300 rounded-md shadow-sm hover:bg-gray-50"
+            >
+              Load more
+            </button>
+          </div>
+        )}
       </main>
 
       {/* Review Detail Modal */}
@@ -1,6 +1,6 @@
 import React from "react";
 
-function ReviewCard({ review, onClick }) {
+function ReviewCard({ review, onClick, selected, onSelect }) {
   const getSeverityColor = (severity) => {
     switch (severity) {
       case "error":
@@ -17,18 +17,16 @@ function ReviewCard({ review, onClick }) {
   const getStatusBadge = (status) => {
     const colors = {
       pending: "bg-yellow-100 text-yellow-800",
+      posting: "bg-blue-100 text-blue-800",
       posted: "bg-green-100 text-green-800",
+      post_failed: "bg-orange-100 text-orange-800",
       rejected: "bg-red-100 text-red-800",
     };
     return colors[status] || "bg-gray-100 text-gray-800";
   };
 
-  const errorCount = review.review_feedback.filter(
-    (f) => f.severity === "error"
-  ).length;
-  const warningCount = review.review_feedback.filter(
-    (f) => f.severity === "warning"
-  ).length;
+  const errorCount = review.error_count;
+  const warningCount = review.warning_count;
 
   return (
     <div
@@ -56,6 +54,15 @@ function ReviewCard({ review, onClick }) {
             #{review.pr_number} by {review.pr_author}
           </p>
         </div>
+        {onSelect && (
+          <input
+            type="checkbox"
+            checked={selected}
+            onClick={(e) => e.stopPropagation()}
+            onChange={() => onSelect(review.id)}
+            className="h-4 w-4 text-indigo-600 border-gray-300 rounded"
+          />
+        )}
       </div>
 
       <div className="mt-4 flex items-center gap-4 text-sm">
@@ -1,11 +1,18 @@
 import React, { useState } from "react";
 import { reviewsAPI } from "../services/api";
 
+export const FEEDBACK_PAGE_SIZE = 200;
+
 function ReviewDetail({ review, onClose }) {
   const [decision, setDecision] = useState("");
+  const [feedback, setFeedback] = useState(review.review_feedback);
+  const [loadingFeedback, setLoadingFeedback] = useState(false);
+  const feedbackTotal = review.feedback_total ?? feedback.length;
   const [notes, setNotes] = useState("");
   const [submitting, setSubmitting] = useState(false);
   const [error, setError] = useState(null);
+  const isDecidable =
+    review.status === "pending" || review.status === "post_failed";
 
   const handleSubmit = async (action) => {
     setSubmitting(true);
@@ -22,6 +29,23 @@ function ReviewDetail({ review, onClose }) {
     }
   };
 
+  const loadMoreFeedback = async () => {
+    setLoadingFeedback(true);
+    try {
+      const response = await reviewsAPI.getReview(review.id, {
+        fields: "review_feedback",
+        feedback_offset: feedback.length,
+        feedback_limit: FEEDBACK_PAGE_SIZE,
+      });
+      setFeedback((current) => [...current, ...response.data.review_feedback]);
+    } catch (err) {
+      setError("Failed to load more feedback");
+      console.error(err);
+    } finally {
+      setLoadingFeedback(false);
+    }
+  };
+
   const getSeverityIcon = (severity) => {
     switch (severity) {
       case "error":
@@ -118,6 +142,10 @@ function ReviewDetail({ review, onClose }) {
                     ? "bg-yellow-100 text-yellow-800"
                     : review.status === "posted"
                     ? "bg-green-100 text-green-800"
+                    : review.status === "posting"
+                    ? "bg-blue-100 text-blue-800"
+                    : review.status === "post_failed"
+                    ? "bg-orange-100 text-orange-800"
                     : "bg-red-100 text-red-800"
                 }`}
               >
@@ -166,9 +194,14 @@ function ReviewDetail({ review, onClose }) {
         <div className="mb-6">
           <h4 className="text-lg font-semibold text-gray-900 mb-3">
             Detailed Feedback
+            {feedbackTotal > feedback.length && (
+              <span className="ml-2 text-sm font-normal text-gray-500">
+                ({feedback.length} of {feedbackTotal})
+              </span>
+            )}
           </h4>
           <div className="space-y-3 max-h-96 overflow-y-auto">
-            {review.review_feedback.map((item, index) => (
+            {feedback.map((item, index) => (
               <div
                 key={index}
                 className="flex items-start p-3 bg-white border border-gray-200 rounded-lg"
@@ -202,6 +235,15 @@ function ReviewDetail({ review, onClose }) {
                 </div>
               </div>
             ))}
+            {feedbackTotal > feedback.length && (
+              <button
+                onClick={loadMoreFeedback}
+                disabled={loadingFeedback}
+                className="w-full text-sm text-indigo-600 hover:text-indigo-800 py-2 disabled:text-gray-400"
+              >
+                {loadingFeedback ? "Loading..." : "Show more feedback"}
+              </button>
+            )}
           </div>
         </div>
 
@@ -235,8 +277,8 @@ function ReviewDetail({ review, onClose }) {
           </div>
         </div>
 
-        {/* Instructor Actions (only for pending reviews) */}
-        {review.status === "pending" && (
+        {/* Instructor Actions (pending reviews, or approvals GitHub rejected) */}
+        {isDecidable && (
           <div className="border-t pt-6">
             <h4 className="text-lg font-semibold text-gray-900 mb-3">
               Instructor Decision
@@ -281,7 +323,7 @@ function ReviewDetail({ review, onClose }) {
         )}
 
         {/* Show instructor notes if review was already processed */}
-        {review.status !== "pending" && review.instructor_notes && (
+        {!isDecidable && review.instructor_notes && (
           <div className="border-t pt-6">
             <h4 className="text-lg font-semibold text-gray-900 mb-3">
               Instructor Notes
@@ -11,15 +11,17 @@ const api = axios.create({
 });
 
 export const reviewsAPI = {
-  // Get all reviews
-  getAllReviews: (status = null) => {
-    const params = status ? { status } : {};
+  // Get one page of reviews; the next page's cursor is in the X-Next-Cursor header
+  getAllReviews: (status = null, cursor = null) => {
+    const params = {};
+    if (status) params.status = status;
+    if (cursor) params.cursor = cursor;
     return api.get("/api/reviews", { params });
   },
 
-  // Get single review
-  getReview: (reviewId) => {
-    return api.get(`/api/reviews/${reviewId}`);
+  // Get single review; params can select fields and page the feedback
+  getReview: (reviewId, params = {}) => {
+    return api.get(`/api/reviews/${reviewId}`, { params });
   },
 
   // Instructor decision
@@ -30,10 +32,28 @@ export const reviewsAPI = {
     });
   },
 
+  // Decide many reviews at once; returns one result per decision
+  makeBulkDecision: (decisions) => {
+    return api.post("/api/reviews/decisions", { decisions });
+  },
+
   // Get statistics
   getStats: () => {
     return api.get("/api/reviews/stats/summary");
   },
+
+  // Live review changes; EventSource reconnects and resumes on its own
+  subscribeToEvents: (onEvent) => {
+    const source = new EventSource(`${API_BASE_URL}/api/reviews/events`);
+    ["review_created", "review_updated", "status_changed", "review_deleted", "reset"].forEach(
+      (type) => {
+        source.addEventListener(type, (event) => {
+          onEvent(type, JSON.parse(event.data));
+        });
+      }
+    );
+    return source;
+  },
 };
 
 export default api;